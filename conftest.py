@@ -9,10 +9,13 @@ IMPORTANTE:
   Ejemplo: http://localhost:8080/api/users (con JWT token)
 """
 import os
+import json
 import pytest
 import requests
-from typing import Dict, Optional
+from dataclasses import asdict
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
+from utils.token_cache import get_token
 
 # Load environment variables
 load_dotenv()
@@ -63,34 +66,43 @@ def jwt_token() -> Optional[str]:
         "username": DEFAULT_USERNAME,
         "password": DEFAULT_PASSWORD
     }
+    failure = {}
 
-    try:
-        response = requests.post(
-            auth_url,
-            json=payload,
-            timeout=TEST_TIMEOUT,
-            headers={"Content-Type": "application/json"}
-        )
-
-        if response.status_code == 200:
-            data = response.json()
-            token = data.get("jwtToken")
-            if token:
-                print(f"\n✅ Authentication successful")
-                print(f"   Auth URL: {auth_url}")
-                return token
-
-        # Si hay error, retornar None (los tests se saltarán)
-        print(f"\n⚠️  WARNING: Autenticación falló (Status {response.status_code})")
-        print(f"   Auth URL: {auth_url}")
-        print(f"   Los tests que requieren autenticación se saltarán")
-        return None
+    def login() -> Optional[str]:
+        try:
+            response = requests.post(
+                auth_url,
+                json=payload,
+                timeout=TEST_TIMEOUT,
+                headers={"Content-Type": "application/json"}
+            )
+
+            if response.status_code == 200:
+                token = response.json().get("jwtToken")
+                if token:
+                    return token
+            failure["status"] = response.status_code
+            return None
+        except requests.exceptions.RequestException as e:
+            # Incluye el JSONDecodeError de requests (cuerpo no JSON)
+            failure["error"] = e
+            return None
 
-    except requests.exceptions.RequestException as e:
-        print(f"\n⚠️  WARNING: Error al conectar con autenticación: {e}")
+    # Token compartido entre workers de xdist (un solo login por identidad)
+    token, _ = get_token(auth_url, DEFAULT_USERNAME, DEFAULT_PASSWORD, login)
+    if token:
+        print(f"\n✅ Authentication successful")
         print(f"   Auth URL: {auth_url}")
-        print(f"   Los tests que requieren autenticación se saltarán")
-        return None
+        return token
+
+    # Si hay error, retornar None (los tests se saltarán)
+    if "error" in failure:
+        print(f"\n⚠️  WARNING: Error al conectar con autenticación: {failure['error']}")
+    else:
+        print(f"\n⚠️  WARNING: Autenticación falló (Status {failure.get('status')})")
+    print(f"   Auth URL: {auth_url}")
+    print(f"   Los tests que requieren autenticación se saltarán")
+    return None
 
 
 @pytest.fixture(scope="session")
@@ -137,6 +149,58 @@ def service_urls() -> Dict[str, str]:
     }
 
 
+@pytest.fixture(scope="session")
+def entity_pool():
+    """
+    Pool de entidades de solo lectura para tests de integración.
+    Se llena bajo demanda y se limpia al final de la sesión.
+    """
+    from utils.api_utils import make_request, wait_until_visible
+    from utils.entity_pool import EntityPool
+
+    pool = EntityPool(
+        send=lambda method, service, endpoint, data: make_request(method, endpoint, data=data, service_name=service),
+        wait=wait_until_visible
+    )
+    yield pool
+    pool.cleanup()
+
+
+@pytest.fixture(scope="session")
+def e2e_entity_pool(jwt_token: Optional[str]):
+    """
+    Pool de entidades de solo lectura para tests E2E (a través del API Gateway).
+    Los tests deben saltarse si no hay token antes de usarlo.
+    """
+    from utils.api_utils import make_e2e_request, wait_until_visible
+    from utils.entity_pool import EntityPool
+
+    pool = EntityPool(
+        send=lambda method, service, endpoint, data: make_e2e_request(
+            method, endpoint, data=data, service_name=service, jwt_token=jwt_token
+        ),
+        wait=lambda service, endpoint: wait_until_visible(service, endpoint, jwt_token=jwt_token)
+    )
+    yield pool
+    pool.cleanup()
+
+
+@pytest.fixture(autouse=True)
+def perf_budget(request):
+    """
+    Registrar las llamadas HTTP del test (make_request / make_e2e_request).
+    Con @pytest.mark.perf_budget el presupuesto se comprueba al terminar el test.
+    """
+    from utils.api_utils import add_request_observer, remove_request_observer
+    from utils.perf_budget import PerfRecorder
+
+    recorder = PerfRecorder()
+    request.node.perf_recorder = recorder
+    add_request_observer(recorder.record)
+    yield recorder
+    remove_request_observer(recorder.record)
+
+
 def pytest_configure(config):
     """Register custom markers"""
     config.addinivalue_line("markers", "e2e: End-to-end tests")
@@ -144,4 +208,109 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "slow: Slow running tests")
     config.addinivalue_line("markers", "auth: Tests requiring authentication")
     config.addinivalue_line("markers", "smoke: Smoke tests for quick validation")
+    config.addinivalue_line("markers", "perf_budget(call_ms, total_ms, endpoints, mode): Latency budget for HTTP calls")
+
+
+# Resultados de presupuesto por test (ver pytest_runtest_makereport)
+_perf_results: List[Dict] = []
 
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Comprobar el presupuesto de latencia de los tests marcados con perf_budget"""
+    outcome = yield
+    report = outcome.get_result()
+    recorder = getattr(item, "perf_recorder", None)
+    if report.when != "call" or recorder is None:
+        return
+
+    from utils.perf_budget import PerfBudget
+
+    marker = item.get_closest_marker("perf_budget")
+    budget = PerfBudget.from_marker(marker) if marker else None
+    violations = recorder.violations(budget) if budget else []
+    _perf_results.append({
+        "nodeid": item.nodeid,
+        "budget": asdict(budget) if budget else None,
+        "total_ms": recorder.total_ms,
+        "violations": violations,
+        # Referencia: incluye también las llamadas del teardown
+        "calls": recorder.calls,
+    })
+    if not violations:
+        return
+
+    message = "Presupuesto de latencia superado:\n  " + "\n  ".join(violations)
+    if budget.mode == "fail" and report.passed:
+        report.outcome = "failed"
+        report.longrepr = message
+    else:
+        report.sections.append(("perf_budget", message))
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Listar los tests que superaron su presupuesto de latencia"""
+    exceeded = [result for result in _perf_results if result["violations"]]
+    if not exceeded:
+        return
+    terminalreporter.section("perf budget")
+    for result in exceeded:
+        mode = result["budget"]["mode"].upper()
+        terminalreporter.write_line(f"{mode} {result['nodeid']}: {'; '.join(result['violations'])}")
+
+
+
+def _report_dir(config) -> str:
+    """Directorio del reporte HTML (--html) o reports/ por defecto"""
+    html_path = getattr(config.option, "htmlpath", None)
+    return os.path.dirname(html_path) if html_path else "reports"
+
+
+def _sidecar_path(config, name: str) -> str:
+    """Ruta de un JSON junto al reporte HTML; con pytest-xdist, uno por worker"""
+    worker_id = os.getenv("PYTEST_XDIST_WORKER")
+    filename = f"{name}_{worker_id}.json" if worker_id else f"{name}.json"
+    return os.path.join(_report_dir(config), filename)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Guardar las latencias de propagación y los resultados de perf_budget"""
+    _write_propagation_latencies(session)
+    _write_perf_budget(session)
+
+
+def _write_perf_budget(session) -> None:
+    """Latencias por endpoint y presupuesto de cada test"""
+    from utils.perf_budget import summarize_endpoints
+
+    if not _perf_results:
+        return
+    calls = [call for result in _perf_results for call in result["calls"]]
+    tests = [{key: value for key, value in result.items() if key != "calls"} for result in _perf_results]
+    path = _sidecar_path(session.config, "perf_budget")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"endpoints": summarize_endpoints(calls), "tests": tests}, f, indent=2)
+
+
+def _write_propagation_latencies(session) -> None:
+    """Latencias de propagación medidas por wait_until_visible"""
+    from utils.api_utils import get_propagation_latencies
+
+    latencies = get_propagation_latencies()
+    if not latencies:
+        return
+
+    report_dir = _report_dir(session.config)
+    os.makedirs(report_dir, exist_ok=True)
+
+    elapsed = sorted(entry["elapsed"] for entry in latencies)
+    summary = {
+        "count": len(elapsed),
+        "not_visible": sum(1 for entry in latencies if not entry["visible"]),
+        "mean": round(sum(elapsed) / len(elapsed), 4),
+        "max": elapsed[-1],
+        "p95": elapsed[min(int(len(elapsed) * 0.95), len(elapsed) - 1)],
+    }
+    with open(_sidecar_path(session.config, "propagation_latency"), "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "samples": latencies}, f, indent=2)
@@ -4,7 +4,8 @@ Pruebas E2E para el Favourite Service a través del API Gateway.
 import pytest
 from urllib.parse import quote
 from utils.api_utils import make_e2e_request
-from utils.helpers import generate_user_data, generate_category_data, generate_product_data, generate_favourite_data
+from utils.entity_chains import create_e2e_chains
+from utils.helpers import generate_product_data, generate_favourite_data
 
 
 @pytest.mark.e2e
@@ -16,20 +17,8 @@ class TestE2EFavouriteService:
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201]
-        user_id = user_response.json()["userId"]
-        
-        category_data = generate_category_data()
-        category_response = make_e2e_request("POST", "/api/categories", data=category_data, service_name="product", jwt_token=jwt_token)
-        assert category_response.status_code in [200, 201]
-        category_id = category_response.json()["categoryId"]
-        
-        product_data = generate_product_data(category_id)
-        product_response = make_e2e_request("POST", "/api/products", data=product_data, service_name="product", jwt_token=jwt_token)
-        assert product_response.status_code in [200, 201]
-        product_id = product_response.json()["productId"]
+        chain = create_e2e_chains(jwt_token, product=True)
+        user_id, category_id, product_id = chain["user_id"], chain["category_id"], chain["product_id"]
         
         try:
             favourite_data = generate_favourite_data(user_id, product_id)
@@ -56,15 +45,8 @@ class TestE2EFavouriteService:
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201]
-        user_id = user_response.json()["userId"]
-        
-        category_data = generate_category_data()
-        category_response = make_e2e_request("POST", "/api/categories", data=category_data, service_name="product", jwt_token=jwt_token)
-        assert category_response.status_code in [200, 201]
-        category_id = category_response.json()["categoryId"]
+        chain = create_e2e_chains(jwt_token, product=False)
+        user_id, category_id = chain["user_id"], chain["category_id"]
         
         created_favourites = []
         
@@ -109,20 +91,8 @@ class TestE2EFavouriteService:
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201]
-        user_id = user_response.json()["userId"]
-        
-        category_data = generate_category_data()
-        category_response = make_e2e_request("POST", "/api/categories", data=category_data, service_name="product", jwt_token=jwt_token)
-        assert category_response.status_code in [200, 201]
-        category_id = category_response.json()["categoryId"]
-        
-        product_data = generate_product_data(category_id)
-        product_response = make_e2e_request("POST", "/api/products", data=product_data, service_name="product", jwt_token=jwt_token)
-        assert product_response.status_code in [200, 201]
-        product_id = product_response.json()["productId"]
+        chain = create_e2e_chains(jwt_token, product=True)
+        user_id, category_id, product_id = chain["user_id"], chain["category_id"], chain["product_id"]
         
         try:
             favourite_data = generate_favourite_data(user_id, product_id)
@@ -152,20 +122,8 @@ class TestE2EFavouriteService:
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201]
-        user_id = user_response.json()["userId"]
-        
-        category_data = generate_category_data()
-        category_response = make_e2e_request("POST", "/api/categories", data=category_data, service_name="product", jwt_token=jwt_token)
-        assert category_response.status_code in [200, 201]
-        category_id = category_response.json()["categoryId"]
-        
-        product_data = generate_product_data(category_id)
-        product_response = make_e2e_request("POST", "/api/products", data=product_data, service_name="product", jwt_token=jwt_token)
-        assert product_response.status_code in [200, 201]
-        product_id = product_response.json()["productId"]
+        chain = create_e2e_chains(jwt_token, product=True)
+        user_id, category_id, product_id = chain["user_id"], chain["category_id"], chain["product_id"]
         
         try:
             favourite_data = generate_favourite_data(user_id, product_id)
@@ -196,20 +154,8 @@ class TestE2EFavouriteService:
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201]
-        user_id = user_response.json()["userId"]
-        
-        category_data = generate_category_data()
-        category_response = make_e2e_request("POST", "/api/categories", data=category_data, service_name="product", jwt_token=jwt_token)
-        assert category_response.status_code in [200, 201]
-        category_id = category_response.json()["categoryId"]
-        
-        product_data = generate_product_data(category_id)
-        product_response = make_e2e_request("POST", "/api/products", data=product_data, service_name="product", jwt_token=jwt_token)
-        assert product_response.status_code in [200, 201]
-        product_id = product_response.json()["productId"]
+        chain = create_e2e_chains(jwt_token, product=True)
+        user_id, category_id, product_id = chain["user_id"], chain["category_id"], chain["product_id"]
         
         try:
             favourite_data = generate_favourite_data(user_id, product_id)
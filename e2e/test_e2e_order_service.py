@@ -3,6 +3,7 @@ Pruebas E2E para el Order Service a través del API Gateway.
 """
 import pytest
 from utils.api_utils import make_e2e_request
+from utils.json_stream import CollectionStream
 from utils.helpers import generate_user_data, generate_cart_data, generate_order_data
 
 
@@ -32,17 +33,13 @@ class TestE2EOrderService:
                 assert retrieved_cart["cartId"] == cart_id
                 assert retrieved_cart.get("userId") == user_id
             
-            all_carts_response = make_e2e_request("GET", "/api/carts", service_name="order", jwt_token=jwt_token)
+            all_carts_response = make_e2e_request("GET", "/api/carts", service_name="order", jwt_token=jwt_token, stream=True)
             assert all_carts_response.status_code == 200
-            carts_data = all_carts_response.json()
-            carts_list = carts_data.get("collection", []) if isinstance(carts_data, dict) else carts_data
-            cart_ids = [c.get("cartId") for c in carts_list if isinstance(c, dict)]
-            assert isinstance(cart_ids, list)
-            
-            if cart_id in cart_ids:
-                cart_in_list = next((c for c in carts_list if c.get("cartId") == cart_id), None)
-                if cart_in_list:
-                    assert cart_in_list.get("userId") == user_id
+            cart_in_list = CollectionStream(all_carts_response).find(
+                lambda c: isinstance(c, dict) and c.get("cartId") == cart_id
+            )
+            if cart_in_list:
+                assert cart_in_list.get("userId") == user_id
             
             delete_response = make_e2e_request("DELETE", f"/api/carts/{cart_id}", service_name="order", jwt_token=jwt_token)
             assert delete_response.status_code in [200, 204]
@@ -120,14 +117,12 @@ class TestE2EOrderService:
                 assert order_response.status_code in [200, 201]
                 created_orders.append(order_response.json())
             
-            all_orders_response = make_e2e_request("GET", "/api/orders", service_name="order", jwt_token=jwt_token)
+            all_orders_response = make_e2e_request("GET", "/api/orders", service_name="order", jwt_token=jwt_token, stream=True)
             assert all_orders_response.status_code == 200
-            orders_data = all_orders_response.json()
-            orders_list = orders_data.get("collection", []) if isinstance(orders_data, dict) else orders_data
-            all_order_ids = [o.get("orderId") for o in orders_list if isinstance(o, dict)]
+            missing_ids = CollectionStream(all_orders_response).missing("orderId", [c["orderId"] for c in created_orders])
             
             for created_order in created_orders:
-                assert created_order["orderId"] in all_order_ids
+                assert created_order["orderId"] not in missing_ids
                 specific_order_response = make_e2e_request("GET", f"/api/orders/{created_order['orderId']}", service_name="order", jwt_token=jwt_token)
                 assert specific_order_response.status_code == 200
                 assert specific_order_response.json()["orderId"] == created_order["orderId"]
@@ -221,14 +216,12 @@ class TestE2EOrderService:
                 update_response = make_e2e_request("PUT", f"/api/orders/{order['orderId']}", data=update_data, service_name="order", jwt_token=jwt_token)
                 assert update_response.status_code == 200
             
-            all_orders_response = make_e2e_request("GET", "/api/orders", service_name="order", jwt_token=jwt_token)
+            all_orders_response = make_e2e_request("GET", "/api/orders", service_name="order", jwt_token=jwt_token, stream=True)
             assert all_orders_response.status_code == 200
-            orders_data = all_orders_response.json()
-            orders_list = orders_data.get("collection", []) if isinstance(orders_data, dict) else orders_data
-            order_ids_in_response = [o.get("orderId") for o in orders_list if isinstance(o, dict)]
+            missing_ids = CollectionStream(all_orders_response).missing("orderId", [c["orderId"] for c in created_orders])
             
             for created_order in created_orders:
-                assert created_order["orderId"] in order_ids_in_response
+                assert created_order["orderId"] not in missing_ids
                 check_response = make_e2e_request("GET", f"/api/orders/{created_order['orderId']}", service_name="order", jwt_token=jwt_token)
                 assert check_response.status_code == 200
                 assert check_response.json()["orderId"] == created_order["orderId"]
@@ -1,43 +1,40 @@
 """
 Pruebas E2E para el Payment Service a través del API Gateway.
 """
-import time
 import pytest
-from utils.api_utils import make_e2e_request
-from utils.helpers import generate_user_data, generate_cart_data, generate_order_data, generate_payment_data
+from utils.api_utils import make_e2e_request, status_changed, wait_until_visible
+from utils.json_stream import CollectionStream
+from utils.helpers import generate_cart_data, generate_order_data, generate_payment_data
 
 
 @pytest.mark.e2e
 class TestE2EPaymentService:
     """Pruebas E2E para el Payment Service - 5 tests"""
 
-    def test_e2e_complete_payment_workflow(self, jwt_token):
+    def test_e2e_complete_payment_workflow(self, jwt_token, e2e_entity_pool):
         """E2E Test 1: Flujo completo de pago"""
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201], f"Error al crear usuario: {user_response.text}"
-        user_id = user_response.json()["userId"]
-        time.sleep(1.0)
+        user_id = e2e_entity_pool.get("user")["id"]
 
         try:
             cart_data = generate_cart_data(user_id)
             cart_response = make_e2e_request("POST", "/api/carts", data=cart_data, service_name="order", jwt_token=jwt_token)
             assert cart_response.status_code in [200, 201], f"Error al crear carrito: {cart_response.text}"
             cart_id = cart_response.json()["cartId"]
-            time.sleep(1.0)
+            wait_until_visible("order", f"/api/carts/{cart_id}", jwt_token=jwt_token)
 
             order_data = generate_order_data(cart_id)
             order_response = make_e2e_request("POST", "/api/orders", data=order_data, service_name="order", jwt_token=jwt_token)
             assert order_response.status_code in [200, 201], f"Error al crear orden: {order_response.text}"
             order_id = order_response.json()["orderId"]
-            time.sleep(1.0)
+            order_snapshot = wait_until_visible("order", f"/api/orders/{order_id}", jwt_token=jwt_token)
 
             status_response = make_e2e_request("PATCH", f"/api/orders/{order_id}/status", service_name="order", jwt_token=jwt_token)
             assert status_response.status_code in [200, 204, 400], f"Error al cambiar estado de orden: {status_response.text}"
-            time.sleep(0.5)
+            if status_response.status_code != 400:
+                wait_until_visible("order", f"/api/orders/{order_id}", predicate=status_changed(order_snapshot), jwt_token=jwt_token)
 
             payment_data = generate_payment_data(order_id)
             payment_response = make_e2e_request("POST", "/api/payments", data=payment_data, service_name="payment", jwt_token=jwt_token)
@@ -54,18 +51,13 @@ class TestE2EPaymentService:
                 make_e2e_request("DELETE", f"/api/orders/{order_id}", service_name="order", jwt_token=jwt_token)
             if 'cart_id' in locals():
                 make_e2e_request("DELETE", f"/api/carts/{cart_id}", service_name="order", jwt_token=jwt_token)
-            make_e2e_request("DELETE", f"/api/users/{user_id}", service_name="user", jwt_token=jwt_token)
 
-    def test_e2e_payment_status_flow(self, jwt_token):
+    def test_e2e_payment_status_flow(self, jwt_token, e2e_entity_pool):
         """E2E Test 2: Flujo completo de estados de pago"""
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201], f"Error al crear usuario: {user_response.text}"
-        user_id = user_response.json()["userId"]
-        time.sleep(1.0)
+        user_id = e2e_entity_pool.get("user")["id"]
 
         try:
             cart_data = generate_cart_data(user_id)
@@ -78,9 +70,11 @@ class TestE2EPaymentService:
             assert order_response.status_code in [200, 201], f"Error al crear orden: {order_response.text}"
             order_id = order_response.json()["orderId"]
 
+            order_snapshot = wait_until_visible("order", f"/api/orders/{order_id}", jwt_token=jwt_token)
             status_response = make_e2e_request("PATCH", f"/api/orders/{order_id}/status", service_name="order", jwt_token=jwt_token)
             assert status_response.status_code in [200, 204, 400], f"Error al cambiar estado de orden: {status_response.text}"
-            time.sleep(0.2)
+            if status_response.status_code != 400:
+                wait_until_visible("order", f"/api/orders/{order_id}", predicate=status_changed(order_snapshot), jwt_token=jwt_token)
 
             payment_data = generate_payment_data(order_id)
             payment_response = make_e2e_request("POST", "/api/payments", data=payment_data, service_name="payment", jwt_token=jwt_token)
@@ -103,17 +97,13 @@ class TestE2EPaymentService:
                 make_e2e_request("DELETE", f"/api/orders/{order_id}", service_name="order", jwt_token=jwt_token)
             if 'cart_id' in locals():
                 make_e2e_request("DELETE", f"/api/carts/{cart_id}", service_name="order", jwt_token=jwt_token)
-            make_e2e_request("DELETE", f"/api/users/{user_id}", service_name="user", jwt_token=jwt_token)
 
-    def test_e2e_multiple_payments_management(self, jwt_token):
+    def test_e2e_multiple_payments_management(self, jwt_token, e2e_entity_pool):
         """E2E Test 3: Gestión de múltiples pagos"""
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201], f"Error al crear usuario: {user_response.text}"
-        user_id = user_response.json()["userId"]
+        user_id = e2e_entity_pool.get("user")["id"]
         
         created_orders = []
         created_payments = []
@@ -124,16 +114,17 @@ class TestE2EPaymentService:
                 cart_response = make_e2e_request("POST", "/api/carts", data=cart_data, service_name="order", jwt_token=jwt_token)
                 assert cart_response.status_code in [200, 201], f"Error al crear carrito: {cart_response.text}"
                 cart_id = cart_response.json()["cartId"]
-                time.sleep(0.3)
+                wait_until_visible("order", f"/api/carts/{cart_id}", jwt_token=jwt_token)
 
                 order_data = generate_order_data(cart_id)
                 order_response = make_e2e_request("POST", "/api/orders", data=order_data, service_name="order", jwt_token=jwt_token)
                 assert order_response.status_code in [200, 201], f"Error al crear orden: {order_response.text}"
                 order_id = order_response.json()["orderId"]
-                time.sleep(0.3)
+                order_snapshot = wait_until_visible("order", f"/api/orders/{order_id}", jwt_token=jwt_token)
 
                 status_response = make_e2e_request("PATCH", f"/api/orders/{order_id}/status", service_name="order", jwt_token=jwt_token)
                 assert status_response.status_code in [200, 204], f"Error al cambiar estado de orden: {status_response.text}"
+                wait_until_visible("order", f"/api/orders/{order_id}", predicate=status_changed(order_snapshot), jwt_token=jwt_token)
                 created_orders.append({"orderId": order_id, "cartId": cart_id})
             
             for order_info in created_orders:
@@ -142,14 +133,12 @@ class TestE2EPaymentService:
                 assert payment_response.status_code in [200, 201], f"Error al crear payment: {payment_response.text}"
                 created_payments.append(payment_response.json())
             
-            all_payments_response = make_e2e_request("GET", "/api/payments", service_name="payment", jwt_token=jwt_token)
+            all_payments_response = make_e2e_request("GET", "/api/payments", service_name="payment", jwt_token=jwt_token, stream=True)
             assert all_payments_response.status_code == 200
-            payments_data = all_payments_response.json()
-            payments_list = payments_data.get("collection", []) if isinstance(payments_data, dict) else payments_data
-            all_payment_ids = [p.get("paymentId") for p in payments_list if isinstance(p, dict)]
+            missing_ids = CollectionStream(all_payments_response).missing("paymentId", [c["paymentId"] for c in created_payments])
             
             for created_payment in created_payments:
-                assert created_payment["paymentId"] in all_payment_ids
+                assert created_payment["paymentId"] not in missing_ids
                 get_payment_response = make_e2e_request("GET", f"/api/payments/{created_payment['paymentId']}", service_name="payment", jwt_token=jwt_token)
                 assert get_payment_response.status_code == 200
                 assert get_payment_response.json()["paymentId"] == created_payment["paymentId"]
@@ -159,18 +148,13 @@ class TestE2EPaymentService:
             for order_info in created_orders:
                 make_e2e_request("DELETE", f"/api/orders/{order_info['orderId']}", service_name="order", jwt_token=jwt_token)
                 make_e2e_request("DELETE", f"/api/carts/{order_info['cartId']}", service_name="order", jwt_token=jwt_token)
-            make_e2e_request("DELETE", f"/api/users/{user_id}", service_name="user", jwt_token=jwt_token)
 
-    def test_e2e_payment_retrieval_and_verification(self, jwt_token):
+    def test_e2e_payment_retrieval_and_verification(self, jwt_token, e2e_entity_pool):
         """E2E Test 4: Recuperación y verificación completa de pago"""
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201], f"Error al crear usuario: {user_response.text}"
-        user_id = user_response.json()["userId"]
-        time.sleep(1.0)
+        user_id = e2e_entity_pool.get("user")["id"]
 
         try:
             cart_data = generate_cart_data(user_id)
@@ -183,9 +167,11 @@ class TestE2EPaymentService:
             assert order_response.status_code in [200, 201], f"Error al crear orden: {order_response.text}"
             order_id = order_response.json()["orderId"]
 
+            order_snapshot = wait_until_visible("order", f"/api/orders/{order_id}", jwt_token=jwt_token)
             status_response = make_e2e_request("PATCH", f"/api/orders/{order_id}/status", service_name="order", jwt_token=jwt_token)
             assert status_response.status_code in [200, 204, 400], f"Error al cambiar estado de orden: {status_response.text}"
-            time.sleep(0.2)
+            if status_response.status_code != 400:
+                wait_until_visible("order", f"/api/orders/{order_id}", predicate=status_changed(order_snapshot), jwt_token=jwt_token)
 
             payment_data = generate_payment_data(order_id)
             payment_response = make_e2e_request("POST", "/api/payments", data=payment_data, service_name="payment", jwt_token=jwt_token)
@@ -208,18 +194,13 @@ class TestE2EPaymentService:
                 make_e2e_request("DELETE", f"/api/orders/{order_id}", service_name="order", jwt_token=jwt_token)
             if 'cart_id' in locals():
                 make_e2e_request("DELETE", f"/api/carts/{cart_id}", service_name="order", jwt_token=jwt_token)
-            make_e2e_request("DELETE", f"/api/users/{user_id}", service_name="user", jwt_token=jwt_token)
 
-    def test_e2e_payment_lifecycle_complete(self, jwt_token):
+    def test_e2e_payment_lifecycle_complete(self, jwt_token, e2e_entity_pool):
         """E2E Test 5: Ciclo de vida completo de pago"""
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201], f"Error al crear usuario: {user_response.text}"
-        user_id = user_response.json()["userId"]
-        time.sleep(1.0)
+        user_id = e2e_entity_pool.get("user")["id"]
 
         try:
             cart_data = generate_cart_data(user_id)
@@ -232,9 +213,11 @@ class TestE2EPaymentService:
             assert order_response.status_code in [200, 201], f"Error al crear orden: {order_response.text}"
             order_id = order_response.json()["orderId"]
 
+            order_snapshot = wait_until_visible("order", f"/api/orders/{order_id}", jwt_token=jwt_token)
             status_response = make_e2e_request("PATCH", f"/api/orders/{order_id}/status", service_name="order", jwt_token=jwt_token)
             assert status_response.status_code in [200, 204, 400], f"Error al cambiar estado de orden: {status_response.text}"
-            time.sleep(0.2)
+            if status_response.status_code != 400:
+                wait_until_visible("order", f"/api/orders/{order_id}", predicate=status_changed(order_snapshot), jwt_token=jwt_token)
 
             payment_data = generate_payment_data(order_id)
             payment_response = make_e2e_request("POST", "/api/payments", data=payment_data, service_name="payment", jwt_token=jwt_token)
@@ -263,4 +246,3 @@ class TestE2EPaymentService:
                 make_e2e_request("DELETE", f"/api/orders/{order_id}", service_name="order", jwt_token=jwt_token)
             if 'cart_id' in locals():
                 make_e2e_request("DELETE", f"/api/carts/{cart_id}", service_name="order", jwt_token=jwt_token)
-            make_e2e_request("DELETE", f"/api/users/{user_id}", service_name="user", jwt_token=jwt_token)
@@ -3,6 +3,7 @@ Pruebas E2E para el Product Service a través del API Gateway.
 """
 import pytest
 from utils.api_utils import make_e2e_request
+from utils.json_stream import CollectionStream
 from utils.helpers import generate_category_data, generate_product_data
 
 
@@ -52,14 +53,12 @@ class TestE2EProductService:
                 assert product_response.status_code in [200, 201]
                 created_products.append(product_response.json())
             
-            all_products_response = make_e2e_request("GET", "/api/products", service_name="product", jwt_token=jwt_token)
+            all_products_response = make_e2e_request("GET", "/api/products", service_name="product", jwt_token=jwt_token, stream=True)
             assert all_products_response.status_code == 200
-            products_data = all_products_response.json()
-            products_list = products_data.get("collection", []) if isinstance(products_data, dict) else products_data
-            product_ids = [p.get("productId") for p in products_list if isinstance(p, dict)]
+            missing_ids = CollectionStream(all_products_response).missing("productId", [c["productId"] for c in created_products])
             
             for created_product in created_products:
-                assert created_product["productId"] in product_ids
+                assert created_product["productId"] not in missing_ids
         finally:
             for product in created_products:
                 make_e2e_request("DELETE", f"/api/products/{product['productId']}", service_name="product", jwt_token=jwt_token)
@@ -122,12 +121,10 @@ class TestE2EProductService:
             update_response = make_e2e_request("PUT", "/api/categories", data=updated_category, service_name="product", jwt_token=jwt_token)
             assert update_response.status_code == 200
             
-            all_categories_response = make_e2e_request("GET", "/api/categories", service_name="product", jwt_token=jwt_token)
+            all_categories_response = make_e2e_request("GET", "/api/categories", service_name="product", jwt_token=jwt_token, stream=True)
             assert all_categories_response.status_code == 200
-            categories_data = all_categories_response.json()
-            categories_list = categories_data.get("collection", []) if isinstance(categories_data, dict) else categories_data
-            category_ids = [c.get("categoryId") for c in categories_list if isinstance(c, dict)]
-            assert category_id in category_ids
+            missing_ids = CollectionStream(all_categories_response).missing("categoryId", [category_id])
+            assert category_id not in missing_ids
         finally:
             make_e2e_request("DELETE", f"/api/categories/{category_id}", service_name="product", jwt_token=jwt_token)
 
@@ -163,7 +160,7 @@ class TestE2EProductService:
             delete_response = make_e2e_request("DELETE", f"/api/products/{product_id}", service_name="product", jwt_token=jwt_token)
             assert delete_response.status_code in [200, 204]
             
-            get_after_delete = make_e2e_request("GET", f"/api/products/{product_id}", service_name="product", jwt_token=jwt_token)
+            get_after_delete = make_e2e_request("GET", f"/api/products/{product_id}", service_name="product", jwt_token=jwt_token, expect_404=True)
             assert get_after_delete.status_code in [404, 400]
         finally:
             if 'product_id' in locals():
@@ -3,9 +3,9 @@ Pruebas E2E para el Shipping Service a través del API Gateway.
 """
 import pytest
 from utils.api_utils import make_e2e_request
+from utils.entity_chains import create_e2e_chains
 from utils.helpers import (
-    generate_user_data, generate_category_data, generate_product_data,
-    generate_cart_data, generate_order_data, generate_shipping_data
+    generate_product_data, generate_cart_data, generate_order_data, generate_shipping_data
 )
 
 
@@ -18,32 +18,11 @@ class TestE2EShippingService:
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201]
-        user_id = user_response.json()["userId"]
-        
-        category_data = generate_category_data()
-        category_response = make_e2e_request("POST", "/api/categories", data=category_data, service_name="product", jwt_token=jwt_token)
-        assert category_response.status_code in [200, 201]
-        category_id = category_response.json()["categoryId"]
-        
-        product_data = generate_product_data(category_id)
-        product_response = make_e2e_request("POST", "/api/products", data=product_data, service_name="product", jwt_token=jwt_token)
-        assert product_response.status_code in [200, 201]
-        product_id = product_response.json()["productId"]
+        chain = create_e2e_chains(jwt_token, product=True, order=True)
+        user_id, category_id, product_id = chain["user_id"], chain["category_id"], chain["product_id"]
+        cart_id, order_id = chain["cart_id"], chain["order_id"]
         
         try:
-            cart_data = generate_cart_data(user_id)
-            cart_response = make_e2e_request("POST", "/api/carts", data=cart_data, service_name="order", jwt_token=jwt_token)
-            assert cart_response.status_code in [200, 201]
-            cart_id = cart_response.json()["cartId"]
-            
-            order_data = generate_order_data(cart_id)
-            order_response = make_e2e_request("POST", "/api/orders", data=order_data, service_name="order", jwt_token=jwt_token)
-            assert order_response.status_code in [200, 201]
-            order_id = order_response.json()["orderId"]
-            
             shipping_data = generate_shipping_data(order_id, product_id)
             shipping_response = make_e2e_request("POST", "/api/shippings", data=shipping_data, service_name="shipping", jwt_token=jwt_token)
             assert shipping_response.status_code in [200, 201]
@@ -71,15 +50,8 @@ class TestE2EShippingService:
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201]
-        user_id = user_response.json()["userId"]
-        
-        category_data = generate_category_data()
-        category_response = make_e2e_request("POST", "/api/categories", data=category_data, service_name="product", jwt_token=jwt_token)
-        assert category_response.status_code in [200, 201]
-        category_id = category_response.json()["categoryId"]
+        chain = create_e2e_chains(jwt_token, product=False)
+        user_id, category_id = chain["user_id"], chain["category_id"]
         
         created_shippings = []
         
@@ -131,32 +103,11 @@ class TestE2EShippingService:
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201]
-        user_id = user_response.json()["userId"]
-        
-        category_data = generate_category_data()
-        category_response = make_e2e_request("POST", "/api/categories", data=category_data, service_name="product", jwt_token=jwt_token)
-        assert category_response.status_code in [200, 201]
-        category_id = category_response.json()["categoryId"]
-        
-        product_data = generate_product_data(category_id)
-        product_response = make_e2e_request("POST", "/api/products", data=product_data, service_name="product", jwt_token=jwt_token)
-        assert product_response.status_code in [200, 201]
-        product_id = product_response.json()["productId"]
+        chain = create_e2e_chains(jwt_token, product=True, order=True)
+        user_id, category_id, product_id = chain["user_id"], chain["category_id"], chain["product_id"]
+        cart_id, order_id = chain["cart_id"], chain["order_id"]
         
         try:
-            cart_data = generate_cart_data(user_id)
-            cart_response = make_e2e_request("POST", "/api/carts", data=cart_data, service_name="order", jwt_token=jwt_token)
-            assert cart_response.status_code in [200, 201]
-            cart_id = cart_response.json()["cartId"]
-            
-            order_data = generate_order_data(cart_id)
-            order_response = make_e2e_request("POST", "/api/orders", data=order_data, service_name="order", jwt_token=jwt_token)
-            assert order_response.status_code in [200, 201]
-            order_id = order_response.json()["orderId"]
-            
             shipping_data = generate_shipping_data(order_id, product_id)
             shipping_response = make_e2e_request("POST", "/api/shippings", data=shipping_data, service_name="shipping", jwt_token=jwt_token)
             assert shipping_response.status_code in [200, 201]
@@ -189,32 +140,11 @@ class TestE2EShippingService:
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201]
-        user_id = user_response.json()["userId"]
-        
-        category_data = generate_category_data()
-        category_response = make_e2e_request("POST", "/api/categories", data=category_data, service_name="product", jwt_token=jwt_token)
-        assert category_response.status_code in [200, 201]
-        category_id = category_response.json()["categoryId"]
-        
-        product_data = generate_product_data(category_id)
-        product_response = make_e2e_request("POST", "/api/products", data=product_data, service_name="product", jwt_token=jwt_token)
-        assert product_response.status_code in [200, 201]
-        product_id = product_response.json()["productId"]
+        chain = create_e2e_chains(jwt_token, product=True, order=True)
+        user_id, category_id, product_id = chain["user_id"], chain["category_id"], chain["product_id"]
+        cart_id, order_id = chain["cart_id"], chain["order_id"]
         
         try:
-            cart_data = generate_cart_data(user_id)
-            cart_response = make_e2e_request("POST", "/api/carts", data=cart_data, service_name="order", jwt_token=jwt_token)
-            assert cart_response.status_code in [200, 201]
-            cart_id = cart_response.json()["cartId"]
-            
-            order_data = generate_order_data(cart_id)
-            order_response = make_e2e_request("POST", "/api/orders", data=order_data, service_name="order", jwt_token=jwt_token)
-            assert order_response.status_code in [200, 201]
-            order_id = order_response.json()["orderId"]
-            
             shipping_data = generate_shipping_data(order_id, product_id, quantity=3)
             shipping_response = make_e2e_request("POST", "/api/shippings", data=shipping_data, service_name="shipping", jwt_token=jwt_token)
             assert shipping_response.status_code in [200, 201]
@@ -243,32 +173,11 @@ class TestE2EShippingService:
         if not jwt_token:
             pytest.skip("JWT token not available")
         
-        user_data = generate_user_data()
-        user_response = make_e2e_request("POST", "/api/users", data=user_data, service_name="user", jwt_token=jwt_token)
-        assert user_response.status_code in [200, 201]
-        user_id = user_response.json()["userId"]
-        
-        category_data = generate_category_data()
-        category_response = make_e2e_request("POST", "/api/categories", data=category_data, service_name="product", jwt_token=jwt_token)
-        assert category_response.status_code in [200, 201]
-        category_id = category_response.json()["categoryId"]
-        
-        product_data = generate_product_data(category_id)
-        product_response = make_e2e_request("POST", "/api/products", data=product_data, service_name="product", jwt_token=jwt_token)
-        assert product_response.status_code in [200, 201]
-        product_id = product_response.json()["productId"]
+        chain = create_e2e_chains(jwt_token, product=True, order=True)
+        user_id, category_id, product_id = chain["user_id"], chain["category_id"], chain["product_id"]
+        cart_id, order_id = chain["cart_id"], chain["order_id"]
         
         try:
-            cart_data = generate_cart_data(user_id)
-            cart_response = make_e2e_request("POST", "/api/carts", data=cart_data, service_name="order", jwt_token=jwt_token)
-            assert cart_response.status_code in [200, 201]
-            cart_id = cart_response.json()["cartId"]
-            
-            order_data = generate_order_data(cart_id)
-            order_response = make_e2e_request("POST", "/api/orders", data=order_data, service_name="order", jwt_token=jwt_token)
-            assert order_response.status_code in [200, 201]
-            order_id = order_response.json()["orderId"]
-            
             shipping_data = generate_shipping_data(order_id, product_id)
             shipping_response = make_e2e_request("POST", "/api/shippings", data=shipping_data, service_name="shipping", jwt_token=jwt_token)
             assert shipping_response.status_code in [200, 201]
@@ -289,7 +198,7 @@ class TestE2EShippingService:
             delete_response = make_e2e_request("DELETE", f"/api/shippings/{order_id}/{product_id}", service_name="shipping", jwt_token=jwt_token)
             assert delete_response.status_code in [200, 204]
             
-            get_after_delete = make_e2e_request("GET", f"/api/shippings/{order_id}/{product_id}", service_name="shipping", jwt_token=jwt_token)
+            get_after_delete = make_e2e_request("GET", f"/api/shippings/{order_id}/{product_id}", service_name="shipping", jwt_token=jwt_token, expect_404=True)
             assert get_after_delete.status_code == 404
         finally:
             if 'order_id' in locals() and 'product_id' in locals():
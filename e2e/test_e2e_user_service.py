@@ -3,6 +3,7 @@ Pruebas E2E para el User Service a través del API Gateway.
 """
 import pytest
 from utils.api_utils import make_e2e_request
+from utils.json_stream import CollectionStream
 from utils.helpers import generate_user_data, generate_address_data
 
 
@@ -101,12 +102,10 @@ class TestE2EUserService:
             assert verified_data["lastName"] == "NewLastName"
             assert verified_data["imageUrl"] == "https://example.com/new-image.jpg"
             
-            all_users_response = make_e2e_request("GET", "/api/users", service_name="user", jwt_token=jwt_token)
+            all_users_response = make_e2e_request("GET", "/api/users", service_name="user", jwt_token=jwt_token, stream=True)
             assert all_users_response.status_code == 200
-            users_data = all_users_response.json()
-            users_list = users_data.get("collection", []) if isinstance(users_data, dict) else users_data
-            user_ids = [u.get("userId") for u in users_list if isinstance(u, dict)]
-            assert user_id in user_ids
+            missing_ids = CollectionStream(all_users_response).missing("userId", [user_id])
+            assert user_id not in missing_ids
         finally:
             make_e2e_request("DELETE", f"/api/users/{user_id}", service_name="user", jwt_token=jwt_token)
 
@@ -123,14 +122,12 @@ class TestE2EUserService:
                 assert user_response.status_code in [200, 201]
                 created_users.append(user_response.json())
             
-            all_users_response = make_e2e_request("GET", "/api/users", service_name="user", jwt_token=jwt_token)
+            all_users_response = make_e2e_request("GET", "/api/users", service_name="user", jwt_token=jwt_token, stream=True)
             assert all_users_response.status_code == 200
-            users_data = all_users_response.json()
-            users_list = users_data.get("collection", []) if isinstance(users_data, dict) else users_data
-            all_user_ids = [u.get("userId") for u in users_list if isinstance(u, dict)]
+            missing_ids = CollectionStream(all_users_response).missing("userId", [c["userId"] for c in created_users])
             
             for created_user in created_users:
-                assert created_user["userId"] in all_user_ids
+                assert created_user["userId"] not in missing_ids
                 get_user_response = make_e2e_request("GET", f"/api/users/{created_user['userId']}", service_name="user", jwt_token=jwt_token)
                 assert get_user_response.status_code == 200
                 retrieved_user = get_user_response.json()
@@ -171,7 +168,7 @@ class TestE2EUserService:
             delete_user_response = make_e2e_request("DELETE", f"/api/users/{user_id}", service_name="user", jwt_token=jwt_token)
             assert delete_user_response.status_code in [200, 204]
             
-            get_after_delete = make_e2e_request("GET", f"/api/users/{user_id}", service_name="user", jwt_token=jwt_token)
+            get_after_delete = make_e2e_request("GET", f"/api/users/{user_id}", service_name="user", jwt_token=jwt_token, expect_404=True)
             assert get_after_delete.status_code in [404, 400]
         except:
             if 'address_id' in locals():
@@ -60,7 +60,7 @@ class TestAPIGatewayService:
         assert health_response.status_code == 200
         
         # Probar endpoint info si está disponible
-        info_response = make_request("GET", "/actuator/info")
+        info_response = make_request("GET", "/actuator/info", expect_404=True)
         assert info_response.status_code in [200, 404]
 
 
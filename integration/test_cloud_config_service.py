@@ -29,7 +29,7 @@ class TestCloudConfigService:
 
     def test_2_config_server_status(self):
         """Test 2: Config server status endpoint"""
-        response = make_request("GET", "/actuator/env")
+        response = make_request("GET", "/actuator/env", expect_404=True)
         assert response.status_code in [200, 404]
 
     def test_3_service_discovery_integration(self):
@@ -44,7 +44,7 @@ class TestCloudConfigService:
         health_response = make_request("GET", "/actuator/health")
         assert health_response.status_code == 200
         
-        info_response = make_request("GET", "/actuator/info")
+        info_response = make_request("GET", "/actuator/info", expect_404=True)
         assert info_response.status_code in [200, 404]
 
     def test_5_service_availability(self):
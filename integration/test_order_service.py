@@ -7,6 +7,7 @@ from utils.helpers import generate_user_data, generate_cart_data, generate_order
 
 
 @pytest.mark.integration
+@pytest.mark.perf_budget
 class TestOrderService:
     """Pruebas para el Order Service - 5 tests"""
 
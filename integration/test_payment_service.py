@@ -2,13 +2,14 @@
 Pruebas de integración para el Payment Service.
 """
 import pytest
-from utils.api_utils import make_request, set_current_service
+from utils.api_utils import make_request, set_current_service, status_changed, wait_until_visible
 from utils.helpers import (
-    generate_user_data, generate_cart_data, generate_order_data, generate_payment_data
+    generate_cart_data, generate_order_data, generate_payment_data
 )
 
 
 @pytest.mark.integration
+@pytest.mark.perf_budget
 class TestPaymentService:
     """Pruebas para el Payment Service - 5 tests"""
 
@@ -17,32 +18,13 @@ class TestPaymentService:
         set_current_service("payment-service")
 
     @pytest.fixture
-    def create_test_user(self):
-        """Fixture para crear un usuario de prueba."""
-        import time
-        set_current_service("user-service")
-        user_data = generate_user_data()
-        response = make_request("POST", "/api/users", data=user_data)
-        assert response.status_code in [200, 201], f"Error al crear usuario: {response.text}"
-
-        created_user = response.json()
-        user_id = created_user.get("userId")
-
-        # Wait for user to be fully propagated
-        time.sleep(1.0)
-
-        yield {"id": user_id, "data": created_user}
-
-        set_current_service("user-service")
-        try:
-            make_request("DELETE", f"/api/users/{user_id}")
-        except:
-            pass
+    def create_test_user(self, entity_pool):
+        """Fixture para obtener un usuario de prueba (compartido, solo lectura)."""
+        return entity_pool.get("user")
 
     @pytest.fixture
     def create_test_cart(self, create_test_user):
         """Fixture para crear un carrito de prueba."""
-        import time
         set_current_service("order-service")
         user = create_test_user
         cart_data = generate_cart_data(user["id"])
@@ -54,7 +36,7 @@ class TestPaymentService:
         cart_id = created_cart.get("cartId")
 
         # Wait for cart to be fully propagated
-        time.sleep(1.0)
+        wait_until_visible("order-service", f"/api/carts/{cart_id}")
 
         yield {"id": cart_id, "data": created_cart, "user": user}
 
@@ -67,7 +49,6 @@ class TestPaymentService:
     @pytest.fixture
     def create_test_order(self, create_test_cart):
         """Fixture para crear una orden de prueba."""
-        import time
         set_current_service("order-service")
         cart = create_test_cart
         order_data = generate_order_data(cart["id"])
@@ -79,14 +60,15 @@ class TestPaymentService:
         order_id = created_order.get("orderId")
 
         # Wait for order to be fully propagated
-        time.sleep(1.0)
+        order_snapshot = wait_until_visible("order-service", f"/api/orders/{order_id}")
 
         # Change order status to CONFIRMED (required for payment processing)
         patch_response = make_request("PATCH", f"/api/orders/{order_id}/status")
         # Accept 400 if order is already in a final state
         assert patch_response.status_code in [200, 204, 400], f"Error al cambiar estado de orden: {patch_response.text}"
 
-        time.sleep(0.5)
+        if patch_response.status_code != 400:
+            wait_until_visible("order-service", f"/api/orders/{order_id}", predicate=status_changed(order_snapshot))
 
         yield {"id": order_id, "data": created_order, "cart": cart}
 
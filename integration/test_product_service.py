@@ -7,6 +7,7 @@ from utils.helpers import generate_category_data, generate_product_data
 
 
 @pytest.mark.integration
+@pytest.mark.perf_budget
 class TestProductService:
     """Pruebas para el Product Service - 5 tests"""
 
@@ -44,7 +44,7 @@ class TestProxyService:
     def test_2_get_all_authentications(self):
         """Test 2: GET ALL - Not applicable for authentication, test invalid endpoint"""
         # Authentication no tiene endpoint "get all", probamos endpoint inválido
-        response = make_request("GET", "/api/authenticate")
+        response = make_request("GET", "/api/authenticate", expect_404=True)
         # Debe retornar 404 o 405 (method not allowed)
         assert response.status_code in [404, 405, 400]
 
@@ -62,14 +62,14 @@ class TestProxyService:
         """Test 4: UPDATE - Not applicable for authentication, test unsupported method"""
         # Authentication no soporta UPDATE
         payload = {"username": "admin", "password": "admin123"}
-        response = make_request("PUT", "/api/authenticate", data=payload)
+        response = make_request("PUT", "/api/authenticate", data=payload, expect_404=True)
         # Debe retornar 404 o 405
         assert response.status_code in [404, 405, 400]
 
     def test_5_delete_authentication(self):
         """Test 5: DELETE - Not applicable for authentication, test unsupported method"""
         # Authentication no soporta DELETE
-        response = make_request("DELETE", "/api/authenticate")
+        response = make_request("DELETE", "/api/authenticate", expect_404=True)
         # Debe retornar 404 o 405
         assert response.status_code in [404, 405, 400]
 
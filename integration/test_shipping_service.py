@@ -4,12 +4,13 @@ Pruebas de integración para el Shipping Service.
 import pytest
 from utils.api_utils import make_request, set_current_service
 from utils.helpers import (
-    generate_user_data, generate_cart_data, generate_order_data,
-    generate_category_data, generate_product_data, generate_shipping_data
+    generate_cart_data, generate_order_data,
+    generate_product_data, generate_shipping_data
 )
 
 
 @pytest.mark.integration
+@pytest.mark.perf_budget
 class TestShippingService:
     """Pruebas para el Shipping Service - 5 tests"""
 
@@ -18,39 +19,14 @@ class TestShippingService:
         set_current_service("shipping-service")
 
     @pytest.fixture
-    def create_test_user(self):
-        """Fixture para crear un usuario de prueba."""
-        set_current_service("user-service")
-        user_data = generate_user_data()
-        response = make_request("POST", "/api/users", data=user_data)
-        assert response.status_code in [200, 201], f"Error al crear usuario: {response.text}"
-
-        created_user = response.json()
-        user_id = created_user.get("userId")
-
-        yield {"id": user_id, "data": created_user}
-
-        set_current_service("user-service")
-        make_request("DELETE", f"/api/users/{user_id}")
+    def create_test_user(self, entity_pool):
+        """Fixture para obtener un usuario de prueba (compartido, solo lectura)."""
+        return entity_pool.get("user")
 
     @pytest.fixture
-    def create_test_category(self):
-        """Fixture para crear una categoría de prueba."""
-        set_current_service("product-service")
-        category_data = generate_category_data()
-        response = make_request("POST", "/api/categories", data=category_data)
-        assert response.status_code in [200, 201], f"Error al crear categoría: {response.text}"
-
-        created_category = response.json()
-        category_id = created_category.get("categoryId")
-
-        yield {"id": category_id, "data": created_category}
-
-        set_current_service("product-service")
-        try:
-            make_request("DELETE", f"/api/categories/{category_id}")
-        except:
-            pass
+    def create_test_category(self, entity_pool):
+        """Fixture para obtener una categoría de prueba (compartida, solo lectura)."""
+        return entity_pool.get("category")
 
     @pytest.fixture
     def create_test_product(self, create_test_category):
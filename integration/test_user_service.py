@@ -8,6 +8,7 @@ from utils.helpers import generate_user_data
 
 
 @pytest.mark.integration
+@pytest.mark.perf_budget
 class TestUserService:
     """Pruebas para el User Service - 5 tests"""
 
@@ -0,0 +1,145 @@
+"""
+Motor de limpieza en paralelo para los recursos creados durante las pruebas de carga.
+
+Los recursos se borran por niveles según sus dependencias (pagos antes que órdenes,
+órdenes antes que carritos, etc.). Dentro de cada nivel los DELETE se lanzan en
+paralelo con un pool acotado de greenlets, los fallos transitorios se reintentan
+y lo que no se pudo borrar se registra en un manifiesto JSON por proceso
+(cleanup_manifest_<pid>.json), para que los workers no se pisen entre sí.
+"""
+import json
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+from gevent.lock import Semaphore
+from gevent.pool import Pool
+
+
+CLEANUP_CONCURRENCY = int(os.getenv("CLEANUP_CONCURRENCY", "10"))
+CLEANUP_MAX_RETRIES = int(os.getenv("CLEANUP_MAX_RETRIES", "3"))
+CLEANUP_MANIFEST = os.getenv("CLEANUP_MANIFEST", "reports/load_tests/cleanup_manifest.json")
+
+# Códigos que justifican reintentar el DELETE
+TRANSIENT_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Niveles de borrado: cada nivel depende solo de los anteriores
+# (clave en created_resources, endpoint, nombre en las estadísticas de Locust)
+CLEANUP_TIERS: List[List[Tuple[str, str, str]]] = [
+    [
+        ("payment_ids", "/payment-service/api/payments/{}", "Cleanup Payment"),
+        ("product_ids", "/product-service/api/products/{}", "Cleanup Product"),
+        ("address_ids", "/user-service/api/address/{}", "Cleanup Address"),
+    ],
+    [
+        ("order_ids", "/order-service/api/orders/{}", "Cleanup Order"),
+        ("category_ids", "/product-service/api/categories/{}", "Cleanup Category"),
+    ],
+    [
+        ("cart_ids", "/order-service/api/carts/{}", "Cleanup Cart"),
+    ],
+    [
+        ("user_ids", "/user-service/api/users/{}", "Cleanup User"),
+    ],
+]
+
+# Recursos no borrados de todos los usuarios virtuales del proceso
+_failed_resources: List[Dict[str, Any]] = []
+_manifest_lock = Semaphore()
+
+
+class CleanupEngine:
+    """Borrado por niveles y en paralelo de los recursos de un usuario virtual."""
+
+    def __init__(
+        self,
+        client,
+        headers: Dict[str, str],
+        concurrency: int = CLEANUP_CONCURRENCY,
+        max_retries: int = CLEANUP_MAX_RETRIES,
+        manifest_path: str = CLEANUP_MANIFEST
+    ):
+        self.client = client
+        self.headers = headers
+        self.concurrency = max(concurrency, 1)
+        self.max_retries = max_retries
+        self.manifest_path = manifest_path
+
+    def _delete(self, path: str, name: str) -> Dict[str, Any]:
+        """Borrar un recurso reintentando los fallos transitorios."""
+        error = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.client.delete(path, headers=self.headers, name=name, catch_response=True) as response:
+                    # 404: el recurso ya no existe, no hay nada que limpiar
+                    if response.status_code in (200, 202, 204, 404):
+                        response.success()
+                        return {}
+                    error = f"Status {response.status_code}"
+                    retryable = response.status_code in TRANSIENT_STATUS_CODES
+                    if retryable and attempt < self.max_retries:
+                        # Los intentos intermedios no cuentan como fallo en las estadísticas
+                        response.success()
+                    else:
+                        response.failure(error)
+                        if not retryable:
+                            break
+            except Exception as e:
+                error = str(e)
+            if attempt < self.max_retries:
+                time.sleep(0.2 * (2 ** attempt))
+        return {"path": path, "error": error}
+
+    def run(self, resources: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        """
+        Borrar todos los recursos indicados.
+
+        Args:
+            resources: Diccionario con el formato de BaseLocustUser.created_resources
+
+        Returns:
+            Lista de recursos que no se pudieron borrar
+        """
+        failed: List[Dict[str, Any]] = []
+        pool = Pool(self.concurrency)
+
+        for tier in CLEANUP_TIERS:
+            jobs = []
+            for key, template, name in tier:
+                for resource_id in resources.get(key, []):
+                    job = pool.spawn(self._delete, template.format(resource_id), name)
+                    jobs.append((key, resource_id, job))
+            pool.join()
+
+            for key, resource_id, job in jobs:
+                result = job.value if job.successful() else {"error": str(job.exception)}
+                if result:
+                    failed.append({"type": key, "id": resource_id, **result})
+
+        if failed:
+            self._write_manifest(failed)
+        return failed
+
+    def _process_manifest_path(self) -> str:
+        """Manifiesto del proceso: cada worker escribe el suyo (cleanup_manifest_<pid>.json)."""
+        root, ext = os.path.splitext(self.manifest_path)
+        return f"{root}_{os.getpid()}{ext or '.json'}"
+
+    def _write_manifest(self, failed: List[Dict[str, Any]]) -> None:
+        """Añadir los fallos al manifiesto JSON del proceso."""
+        with _manifest_lock:
+            _failed_resources.extend(failed)
+            path = self._process_manifest_path()
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump({
+                        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                        "pid": os.getpid(),
+                        "failed_count": len(_failed_resources),
+                        "resources": _failed_resources,
+                    }, f, indent=2)
+            except OSError as e:
+                print(f"Error al escribir el manifiesto de limpieza: {e}")
@@ -0,0 +1,147 @@
+"""
+Orquestador local de Locust en modo distribuido.
+
+Un solo proceso de Locust usa un único núcleo, así que el generador se satura
+antes que el sistema bajo prueba. Este orquestador arranca un master y un worker
+por núcleo (configurable); Locust reparte los usuarios de UserServiceUser,
+ProductServiceUser, OrderServiceUser, PaymentServiceUser y APIGatewayUser entre
+los workers según su peso. El master produce el reporte agregado (HTML y CSV) y
+performance.worker_stats añade un JSON con las estadísticas y la CPU de cada
+worker, que se resume al final.
+
+Uso:
+    python -m performance.distributed --users 200 --spawn-rate 20 --run-time 120
+    python -m performance.distributed --workers 4 --report-prefix reports/load_tests/load_200users
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+
+DEFAULT_LOCUSTFILE = "performance/locustfile.py"
+DEFAULT_MASTER_PORT = 5557
+# Tiempo máximo de espera a que se conecten todos los workers (segundos)
+WORKERS_MAX_WAIT = 60
+
+
+def build_master_command(args: argparse.Namespace) -> List[str]:
+    """Comando del master: headless, espera a todos los workers y escribe los reportes."""
+    command = [
+        sys.executable, "-m", "locust",
+        "-f", args.locustfile,
+        "--master",
+        "--master-bind-port", str(args.master_port),
+        "--expect-workers", str(args.workers),
+        "--expect-workers-max-wait", str(WORKERS_MAX_WAIT),
+        "--host", args.host,
+        "--users", str(args.users),
+        "--spawn-rate", str(args.spawn_rate),
+        "--run-time", f"{args.run_time}s",
+        "--headless",
+        "--html", f"{args.report_prefix}.html",
+        "--csv", args.report_prefix,
+        "--csv-full-history",
+        "--loglevel", "INFO",
+    ]
+    if args.user_classes:
+        command.extend(args.user_classes)
+    return command
+
+
+def build_worker_command(args: argparse.Namespace) -> List[str]:
+    """Comando de un worker conectado al master local."""
+    return [
+        sys.executable, "-m", "locust",
+        "-f", args.locustfile,
+        "--worker",
+        "--master-host", "127.0.0.1",
+        "--master-port", str(args.master_port),
+        "--loglevel", "WARNING",
+    ]
+
+
+def _stop(processes: List[subprocess.Popen], timeout: float = 10) -> None:
+    """Terminar los procesos que sigan vivos."""
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    deadline = time.monotonic() + timeout
+    for process in processes:
+        try:
+            process.wait(max(deadline - time.monotonic(), 0.1))
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def print_summary(path: str) -> None:
+    """Resumir el reporte por worker y señalar los generadores saturados."""
+    if not os.path.exists(path):
+        print("No se generaron estadísticas por worker")
+        return
+    with open(path, encoding="utf-8") as f:
+        report: Dict[str, Any] = json.load(f)
+
+    print(f"{'Worker':<40} {'Users':>6} {'Reqs':>8} {'Fails':>6} {'p95':>7} {'p99':>7} {'CPU max':>8}")
+    for worker in report["workers"]:
+        total = worker["total"]
+        flag = "  <- generador saturado" if worker["cpu"]["saturated"] else ""
+        print(
+            f"{worker['client_id'][:40]:<40} {worker['user_count']:>6} {total['num_requests']:>8} "
+            f"{total['num_failures']:>6} {total['p95']:>7} {total['p99']:>7} {worker['cpu']['max']:>7}%{flag}"
+        )
+    merged = report["merged"]["total"]
+    print(
+        f"{'Agregado':<40} {'':>6} {merged['num_requests']:>8} {merged['num_failures']:>6} "
+        f"{merged['p95']:>7} {merged['p99']:>7}"
+    )
+    if any(w["cpu"]["saturated"] for w in report["workers"]):
+        print("Advertencia: hay workers saturados; las latencias altas pueden venir del generador")
+
+
+def run(args: argparse.Namespace) -> int:
+    """Arrancar master y workers, esperar a que termine la prueba y resumir."""
+    directory = os.path.dirname(args.report_prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    worker_stats_path = f"{args.report_prefix}_workers.json"
+    env = dict(os.environ, WORKER_STATS_PATH=worker_stats_path)
+
+    print(f"Master en :{args.master_port} con {args.workers} workers ({args.locustfile})")
+    master = subprocess.Popen(build_master_command(args), env=env)
+    workers = [subprocess.Popen(build_worker_command(args), env=env) for _ in range(args.workers)]
+
+    try:
+        exit_code = master.wait()
+    except KeyboardInterrupt:
+        exit_code = 1
+    finally:
+        _stop([master] + workers)
+
+    print_summary(worker_stats_path)
+    print(f"Reporte agregado: {args.report_prefix}.html")
+    return exit_code
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ejecutar Locust con un master y varios workers locales")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Número de workers (default: núcleos de la máquina)")
+    parser.add_argument("--host", default=os.getenv("HOST", "http://localhost:8080"), help="Host bajo prueba")
+    parser.add_argument("--users", type=int, default=100, help="Usuarios virtuales totales (default: 100)")
+    parser.add_argument("--spawn-rate", type=float, default=10, help="Usuarios por segundo (default: 10)")
+    parser.add_argument("--run-time", type=int, default=60, help="Duración en segundos (default: 60)")
+    parser.add_argument("--locustfile", default=DEFAULT_LOCUSTFILE, help=f"Locustfile (default: {DEFAULT_LOCUSTFILE})")
+    parser.add_argument("--master-port", type=int, default=DEFAULT_MASTER_PORT, help=f"Puerto del master (default: {DEFAULT_MASTER_PORT})")
+    parser.add_argument("--report-prefix", default="reports/load_tests/distributed", help="Prefijo de los reportes HTML/CSV/JSON")
+    parser.add_argument("user_classes", nargs="*", help="Clases de usuario a ejecutar (default: todas las del locustfile)")
+    args = parser.parse_args()
+
+    sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Índice en memoria de entidades creadas durante las pruebas de carga.
+
+Se alimenta con cada creación exitosa de usuarios y categorías y se comparte
+entre todos los usuarios virtuales del proceso. Cuando una creación devuelve 409,
+el ID existente se resuelve con una búsqueda por clave (username, email o título)
+en lugar de descargar y parsear la colección completa de /api/users o
+/api/categories.
+
+Un ID resuelto pertenece a otro usuario virtual: se guarda en
+borrowed_resources, que la limpieza no borra, y al limpiar cada usuario retira
+del índice las entidades que borra.
+"""
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+
+ENTITY_INDEX_MAX = int(os.getenv("ENTITY_INDEX_MAX", "10000"))
+
+
+class EntityIndex:
+    """Índice clave -> ID por tipo de entidad, acotado (LRU)."""
+
+    def __init__(self, max_entries: int = ENTITY_INDEX_MAX):
+        self.max_entries = max_entries
+        self._entries: Dict[str, "OrderedDict[str, Any]"] = {}
+
+    def add(self, kind: str, keys: Iterable[Optional[str]], entity_id: Any) -> None:
+        """Registrar una entidad bajo todas sus claves."""
+        if entity_id is None:
+            return
+        entries = self._entries.setdefault(kind, OrderedDict())
+        for key in keys:
+            if key:
+                entries[key] = entity_id
+                entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def find(self, kind: str, keys: Iterable[Optional[str]]) -> Optional[Any]:
+        """Buscar el ID de una entidad por cualquiera de sus claves."""
+        entries = self._entries.get(kind)
+        if not entries:
+            return None
+        for key in keys:
+            if key and key in entries:
+                return entries[key]
+        return None
+
+    def discard(self, kind: str, entity_ids: Iterable[Any]) -> None:
+        """Retirar del índice las entidades borradas."""
+        entries = self._entries.get(kind)
+        if not entries:
+            return
+        entity_ids = set(entity_ids)
+        for key in [key for key, entity_id in entries.items() if entity_id in entity_ids]:
+            del entries[key]
+
+    def any(self, kind: str) -> Optional[Any]:
+        """ID de la entidad registrada más recientemente (None si no hay)."""
+        entries = self._entries.get(kind)
+        if not entries:
+            return None
+        return next(reversed(entries.values()))
+
+    def resolve(self, kind: str, keys: Iterable[Optional[str]]) -> Optional[Any]:
+        """Resolver un conflicto: la entidad exacta si se conoce, o cualquiera existente."""
+        keys = list(keys)
+        entity_id = self.find(kind, keys)
+        return entity_id if entity_id is not None else self.any(kind)
+
+
+def user_keys(user_data: Dict[str, Any]) -> list:
+    """Claves de un usuario: username y email."""
+    return [user_data.get("credential", {}).get("username"), user_data.get("email")]
+
+
+def category_keys(category_data: Dict[str, Any]) -> list:
+    """Claves de una categoría: título."""
+    return [category_data.get("categoryTitle")]
+
+
+# Índice compartido por todos los usuarios virtuales del proceso
+entity_index = EntityIndex()
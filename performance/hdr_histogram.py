@@ -0,0 +1,376 @@
+"""
+Histogramas log-lineales al estilo HdrHistogram y sus logs.
+
+Las estadísticas de Locust redondean los tiempos de respuesta en cubetas
+gruesas, así que p99.9 y p99.99 no son fiables. HdrHistogram registra valores
+enteros (aquí, microsegundos) con precisión relativa fija (3 dígitos
+significativos) en todo el rango, con memoria acotada, y dos histogramas se
+combinan sumando sus contadores.
+
+Los histogramas se serializan en el formato V2 comprimido de HdrHistogram y se
+escriben en logs de intervalos (formato 1.3), compatibles con las herramientas
+estándar (HistogramLogProcessor, HdrHistogramVisualizer). Los logs de varios
+workers y de varias ejecuciones se combinan con este mismo módulo:
+
+    python -m performance.hdr_histogram report reports/load_tests/hdr/*.hlog
+    python -m performance.hdr_histogram merge reports/load_tests/hdr/*.hlog --output merged.hlog
+"""
+import argparse
+import base64
+import math
+import re
+import struct
+import time
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+
+# Cookies del formato V2 (el bit 0x10 indica contadores de 8 bytes)
+_ENCODING_COOKIE = 0x1c849303 | 0x10
+_COMPRESSED_ENCODING_COOKIE = 0x1c849304 | 0x10
+_HEADER = struct.Struct(">iiiiqqd")
+
+LOG_FORMAT_VERSION = "1.3"
+DEFAULT_PERCENTILES = (50.0, 90.0, 99.0, 99.9, 99.99)
+
+
+class HdrHistogram:
+    """Histograma log-lineal de valores enteros con precisión relativa fija."""
+
+    def __init__(self, lowest: int = 1, highest: int = 3_600_000_000, significant_digits: int = 3):
+        if lowest < 1 or highest < 2 * lowest:
+            raise ValueError("Invalid histogram range")
+        self.lowest = lowest
+        self.highest = highest
+        self.significant_digits = significant_digits
+
+        largest_single_unit = 2 * 10 ** significant_digits
+        self.unit_magnitude = int(math.floor(math.log2(lowest)))
+        sub_bucket_count_magnitude = int(math.ceil(math.log2(largest_single_unit)))
+        self.sub_bucket_half_count_magnitude = max(sub_bucket_count_magnitude, 1) - 1
+        self.sub_bucket_count = 1 << (self.sub_bucket_half_count_magnitude + 1)
+        self.sub_bucket_half_count = self.sub_bucket_count // 2
+        self.sub_bucket_mask = (self.sub_bucket_count - 1) << self.unit_magnitude
+
+        # Contadores dispersos: índice -> número de valores
+        self.counts: Dict[int, int] = {}
+        self.total_count = 0
+        self.max_value = 0
+        self.min_value = 0
+
+    # --- Índices --------------------------------------------------------------
+
+    def _bucket_index(self, value: int) -> int:
+        pow2_ceiling = (value | self.sub_bucket_mask).bit_length()
+        return pow2_ceiling - self.unit_magnitude - (self.sub_bucket_half_count_magnitude + 1)
+
+    def _index(self, value: int) -> int:
+        bucket_index = self._bucket_index(value)
+        sub_bucket_index = value >> (bucket_index + self.unit_magnitude)
+        bucket_base = (bucket_index + 1) << self.sub_bucket_half_count_magnitude
+        return bucket_base + (sub_bucket_index - self.sub_bucket_half_count)
+
+    def _value_from_index(self, index: int) -> int:
+        bucket_index = (index >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self.sub_bucket_half_count
+            bucket_index = 0
+        return sub_bucket_index << (bucket_index + self.unit_magnitude)
+
+    def highest_equivalent_value(self, value: int) -> int:
+        """Mayor valor que cae en la misma cubeta que `value`."""
+        bucket_index = self._bucket_index(value)
+        sub_bucket_index = value >> (bucket_index + self.unit_magnitude)
+        if sub_bucket_index >= self.sub_bucket_count:
+            bucket_index += 1
+        size = 1 << (self.unit_magnitude + bucket_index)
+        lowest_equivalent = (value >> (bucket_index + self.unit_magnitude)) << (bucket_index + self.unit_magnitude)
+        return lowest_equivalent + size - 1
+
+    # --- Registro -------------------------------------------------------------
+
+    def record(self, value: int, count: int = 1) -> None:
+        """Registrar un valor (se recorta al rango del histograma)."""
+        value = min(max(int(value), 0), self.highest)
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        if self.total_count == 0 or value < self.min_value:
+            self.min_value = value
+        self.total_count += count
+        if value > self.max_value:
+            self.max_value = value
+
+    def record_corrected(self, value: int, expected_interval: int) -> None:
+        """
+        Registrar un valor corrigiendo la coordinated omission.
+
+        Si el valor supera el intervalo esperado entre peticiones, se añaden las
+        muestras que el generador no llegó a enviar mientras esperaba:
+        value - interval, value - 2 * interval, ... (igual que
+        recordValueWithExpectedInterval de HdrHistogram).
+        """
+        self.record(value)
+        if expected_interval <= 0 or value <= expected_interval:
+            return
+        missing = value - expected_interval
+        while missing >= expected_interval:
+            self.record(missing)
+            missing -= expected_interval
+
+    def add(self, other: "HdrHistogram") -> None:
+        """Sumar los contadores de otro histograma con la misma configuración."""
+        if (other.lowest, other.significant_digits) != (self.lowest, self.significant_digits):
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        if other.total_count:
+            if self.total_count == 0 or other.min_value < self.min_value:
+                self.min_value = other.min_value
+            self.max_value = max(self.max_value, other.max_value)
+            self.total_count += other.total_count
+
+    def reset(self) -> None:
+        self.counts.clear()
+        self.total_count = 0
+        self.max_value = 0
+        self.min_value = 0
+
+    # --- Consulta -------------------------------------------------------------
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """Valor en el percentil indicado (0-100)."""
+        if self.total_count == 0:
+            return 0
+        percentile = min(max(percentile, 0.0), 100.0)
+        count_at_percentile = max(int(percentile / 100.0 * self.total_count + 0.5), 1)
+        running = 0
+        for index in sorted(self.counts):
+            running += self.counts[index]
+            if running >= count_at_percentile:
+                value = self._value_from_index(index)
+                return value if percentile == 0 else min(self.highest_equivalent_value(value), self.max_value)
+        return self.max_value
+
+    def mean(self) -> float:
+        if self.total_count == 0:
+            return 0.0
+        total = sum(self._value_from_index(i) * c for i, c in self.counts.items())
+        return total / self.total_count
+
+    # --- Serialización (formato V2 de HdrHistogram) --------------------------
+
+    def encode(self) -> bytes:
+        """Serializar en formato V2 comprimido."""
+        payload = bytearray()
+        next_index = 0
+        for index in sorted(self.counts):
+            count = self.counts[index]
+            if count == 0:
+                continue
+            gap = index - next_index
+            if gap == 1:
+                _put_zigzag(payload, 0)
+            elif gap > 1:
+                # Las rachas de ceros se codifican como un contador negativo
+                _put_zigzag(payload, -gap)
+            _put_zigzag(payload, count)
+            next_index = index + 1
+
+        header = _HEADER.pack(
+            _ENCODING_COOKIE, len(payload), 0, self.significant_digits, self.lowest, self.highest, 1.0
+        )
+        compressed = zlib.compress(header + bytes(payload))
+        return struct.pack(">ii", _COMPRESSED_ENCODING_COOKIE, len(compressed)) + compressed
+
+    @classmethod
+    def decode(cls, data: bytes) -> "HdrHistogram":
+        """Reconstruir un histograma serializado con encode() (o por HdrHistogram)."""
+        cookie, length = struct.unpack_from(">ii", data)
+        if cookie & ~0xf0 != _COMPRESSED_ENCODING_COOKIE & ~0xf0:
+            raise ValueError("Not a compressed V2 HdrHistogram")
+        raw = zlib.decompress(data[8:8 + length])
+        cookie, payload_length, _, digits, lowest, highest, _ = _HEADER.unpack_from(raw)
+        if cookie & ~0xf0 != _ENCODING_COOKIE & ~0xf0:
+            raise ValueError("Not a V2 HdrHistogram payload")
+
+        histogram = cls(lowest, highest, digits)
+        position = _HEADER.size
+        end = position + payload_length
+        index = 0
+        while position < end:
+            count, position = _get_zigzag(raw, position)
+            if count < 0:
+                index -= count
+                continue
+            if count:
+                histogram.counts[index] = count
+                value = histogram._value_from_index(index)
+                if histogram.total_count == 0:
+                    histogram.min_value = value
+                histogram.total_count += count
+                histogram.max_value = histogram.highest_equivalent_value(value)
+            index += 1
+        return histogram
+
+
+def _put_zigzag(buffer: bytearray, value: int) -> None:
+    """ZigZag + LEB128 de 64 bits tal como lo codifica HdrHistogram."""
+    value = ((value << 1) ^ (value >> 63)) & 0xFFFFFFFFFFFFFFFF
+    for _ in range(8):
+        if value >> 7 == 0:
+            buffer.append(value)
+            return
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value & 0xFF)
+
+
+def _get_zigzag(data: bytes, position: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    for _ in range(8):
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            break
+    else:
+        value |= data[position] << 56
+        position += 1
+    return (value >> 1) ^ -(value & 1), position
+
+
+# --- Logs de histogramas ------------------------------------------------------
+
+def sanitize_tag(tag: str) -> str:
+    """Las etiquetas del log no admiten comas ni espacios."""
+    return re.sub(r"[\s,]+", "_", tag.strip())
+
+
+class HistogramLogWriter:
+    """Escritor de logs de intervalos (formato 1.3 de HdrHistogram)."""
+
+    def __init__(self, output: TextIO, start_time: Optional[float] = None, max_value_unit_ratio: float = 1000.0):
+        self.output = output
+        self.start_time = start_time if start_time is not None else time.time()
+        # Con valores en µs, el máximo del intervalo se escribe en ms
+        self.max_value_unit_ratio = max_value_unit_ratio
+
+    def write_header(self) -> None:
+        self.output.write(f"#[Histogram log format version {LOG_FORMAT_VERSION}]\n")
+        self.output.write(
+            f"#[StartTime: {self.start_time:.3f} (seconds since epoch), {time.ctime(self.start_time)}]\n"
+        )
+        self.output.write('"StartTimestamp","Interval_Length","Interval_Max","Interval_Compressed_Histogram"\n')
+
+    def write_interval(self, tag: str, start: float, end: float, histogram: HdrHistogram) -> None:
+        """Escribir un intervalo; start y end en segundos desde epoch."""
+        encoded = base64.b64encode(histogram.encode()).decode("ascii")
+        self.output.write(
+            f"Tag={sanitize_tag(tag)},{start - self.start_time:.3f},{end - start:.3f},"
+            f"{histogram.max_value / self.max_value_unit_ratio:.3f},{encoded}\n"
+        )
+        self.output.flush()
+
+
+def read_log(lines: Iterable[str]) -> Iterator[Tuple[Optional[str], float, float, HdrHistogram]]:
+    """
+    Leer los intervalos de un log: (tag, inicio, duración, histograma).
+
+    El inicio se devuelve en segundos desde epoch: los timestamps del log son
+    relativos a BaseTime o, si no hay, a StartTime (como HistogramLogReader).
+    """
+    start_time = base_time = None
+    for line in lines:
+        line = line.strip()
+        if line.startswith("#[StartTime:"):
+            start_time = float(line[len("#[StartTime:"):].split()[0])
+            continue
+        if line.startswith("#[BaseTime:"):
+            base_time = float(line[len("#[BaseTime:"):].split()[0])
+            continue
+        if not line or line.startswith("#") or line.startswith('"'):
+            continue
+        fields = line.split(",")
+        tag = None
+        if fields[0].startswith("Tag="):
+            tag = fields.pop(0)[4:]
+        start, length, _, encoded = fields[:4]
+        start = float(start)
+        offset = base_time if base_time is not None else start_time
+        # Los timestamps mayores de un año ya son absolutos
+        if offset is not None and start < 365 * 24 * 3600:
+            start += offset
+        yield tag, start, float(length), HdrHistogram.decode(base64.b64decode(encoded))
+
+
+def merge_logs(
+    paths: Iterable[str]
+) -> Tuple[Dict[Optional[str], HdrHistogram], Dict[Optional[str], Tuple[float, float]]]:
+    """
+    Combinar por etiqueta todos los intervalos de varios logs.
+
+    Returns:
+        (histogramas, rangos): el histograma combinado de cada etiqueta y el
+        intervalo (inicio mínimo, fin máximo) que cubren sus intervalos
+    """
+    merged: Dict[Optional[str], HdrHistogram] = {}
+    ranges: Dict[Optional[str], Tuple[float, float]] = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for tag, start, length, histogram in read_log(f):
+                if tag in merged:
+                    merged[tag].add(histogram)
+                    first, last = ranges[tag]
+                    ranges[tag] = (min(first, start), max(last, start + length))
+                else:
+                    merged[tag] = histogram
+                    ranges[tag] = (start, start + length)
+    return merged, ranges
+
+
+def format_report(histograms: Dict[Optional[str], HdrHistogram], percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> str:
+    """Tabla de percentiles en ms por etiqueta."""
+    percentiles = list(percentiles)
+    header = f"{'Tag':<60} {'Count':>9} " + " ".join(f"{'p' + format(p, 'g'):>9}" for p in percentiles) + f" {'Max':>9}"
+    rows: List[str] = [header]
+    for tag in sorted(histograms, key=lambda t: t or ""):
+        histogram = histograms[tag]
+        values = " ".join(f"{histogram.value_at_percentile(p) / 1000:>9.2f}" for p in percentiles)
+        rows.append(f"{(tag or '-')[:60]:<60} {histogram.total_count:>9} {values} {histogram.max_value / 1000:>9.2f}")
+    return "\n".join(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Combinar y resumir logs de histogramas HDR")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    report = subparsers.add_parser("report", help="Percentiles (ms) por etiqueta")
+    report.add_argument("logs", nargs="+", help="Logs .hlog a combinar")
+
+    merge = subparsers.add_parser("merge", help="Combinar varios logs en uno")
+    merge.add_argument("logs", nargs="+", help="Logs .hlog a combinar")
+    merge.add_argument("--output", required=True, help="Log combinado de salida")
+
+    args = parser.parse_args()
+    histograms, ranges = merge_logs(args.logs)
+
+    if args.command == "report":
+        print(format_report(histograms))
+        return
+
+    # Cada etiqueta se escribe como un intervalo que cubre todos los que combina
+    start_time = min((start for start, _ in ranges.values()), default=time.time())
+    with open(args.output, "w", encoding="utf-8") as f:
+        writer = HistogramLogWriter(f, start_time=start_time)
+        writer.write_header()
+        for tag, histogram in histograms.items():
+            start, end = ranges[tag]
+            writer.write_interval(tag or "merged", start, end, histogram)
+    print(f"Log combinado: {args.output} ({len(histograms)} etiquetas)")
+
+
+if __name__ == "__main__":
+    main()
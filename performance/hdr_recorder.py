@@ -0,0 +1,126 @@
+"""
+Registro de cada petición de Locust en histogramas HDR por endpoint.
+
+Se engancha al evento `request` que disparan los usuarios basados en
+LocustUserMixin (BaseLocustUser y FastBaseLocustUser) y registra cada tiempo de
+respuesta, en microsegundos, en dos histogramas por endpoint:
+- sin corregir
+- corregido por coordinated omission con el intervalo esperado entre peticiones
+  de un usuario (HDR_EXPECTED_INTERVAL_MS). Las peticiones de modelo abierto
+  (contexto con "open_model", ver performance.open_model) ya se lanzan sin esperar
+  a las respuestas y no se corrigen: el histograma corregido recibe el valor tal cual
+
+Cada HDR_LOG_INTERVAL segundos, y al terminar la prueba, los histogramas del
+intervalo se añaden a dos logs por proceso en HDR_LOG_DIR
+(`<inicio>_<pid>.hlog` y `<inicio>_<pid>.corrected.hlog`). Los logs de varios
+workers y ejecuciones se combinan con `python -m performance.hdr_histogram`.
+
+Configuración por entorno:
+- HDR_LOG_DIR: directorio de los logs (default: reports/load_tests/hdr)
+- HDR_LOG_INTERVAL: segundos por intervalo (default: 10)
+- HDR_EXPECTED_INTERVAL_MS: intervalo esperado entre peticiones de un usuario
+  virtual; por defecto el mínimo de wait_time (1000 ms), 0 desactiva la corrección
+"""
+import os
+import time
+from typing import Dict, Optional, TextIO
+
+import gevent
+from locust import events
+
+from performance.hdr_histogram import HdrHistogram, HistogramLogWriter
+
+
+HDR_LOG_DIR = os.getenv("HDR_LOG_DIR", "reports/load_tests/hdr")
+HDR_LOG_INTERVAL = float(os.getenv("HDR_LOG_INTERVAL", "10"))
+HDR_EXPECTED_INTERVAL_MS = float(os.getenv("HDR_EXPECTED_INTERVAL_MS", "1000"))
+
+
+class HdrRecorder:
+    """Histogramas del intervalo actual y sus logs."""
+
+    def __init__(self, log_dir: str = HDR_LOG_DIR, expected_interval_ms: float = HDR_EXPECTED_INTERVAL_MS):
+        self.log_dir = log_dir
+        self.expected_interval_us = int(expected_interval_ms * 1000)
+        self.raw: Dict[str, HdrHistogram] = {}
+        self.corrected: Dict[str, HdrHistogram] = {}
+        self.interval_start = time.time()
+        self._writers: Optional[Dict[str, HistogramLogWriter]] = None
+        self._files: Dict[str, TextIO] = {}
+
+    def record(self, request_type: str, name: str, response_time_ms: float, correct: bool = True) -> None:
+        tag = f"{request_type} {name}"
+        value = int(response_time_ms * 1000)
+        raw = self.raw.get(tag)
+        if raw is None:
+            raw = self.raw[tag] = HdrHistogram()
+            self.corrected[tag] = HdrHistogram()
+        raw.record(value)
+        self.corrected[tag].record_corrected(value, self.expected_interval_us if correct else 0)
+
+    def _open(self) -> Dict[str, HistogramLogWriter]:
+        """Crear los logs del proceso la primera vez que hay algo que escribir."""
+        if self._writers is None:
+            os.makedirs(self.log_dir, exist_ok=True)
+            base = os.path.join(self.log_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}")
+            self._writers = {}
+            for kind, path in (("raw", f"{base}.hlog"), ("corrected", f"{base}.corrected.hlog")):
+                self._files[kind] = open(path, "w", encoding="utf-8")
+                writer = HistogramLogWriter(self._files[kind], start_time=self.interval_start)
+                writer.write_header()
+                self._writers[kind] = writer
+        return self._writers
+
+    def flush(self) -> None:
+        """Escribir el intervalo actual y empezar uno nuevo."""
+        end = time.time()
+        if self.raw:
+            writers = self._open()
+            for tag in self.raw:
+                writers["raw"].write_interval(tag, self.interval_start, end, self.raw[tag])
+                writers["corrected"].write_interval(tag, self.interval_start, end, self.corrected[tag])
+            self.raw = {}
+            self.corrected = {}
+        self.interval_start = end
+
+    def close(self) -> None:
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        self._writers = None
+
+
+recorder = HdrRecorder()
+_flusher: Optional[gevent.Greenlet] = None
+
+
+def _flush_periodically() -> None:
+    while True:
+        gevent.sleep(HDR_LOG_INTERVAL)
+        recorder.flush()
+
+
+@events.request.add_listener
+def _on_request(request_type, name, response_time, exception=None, context=None, **kwargs):
+    if response_time is not None:
+        # Sin coordinated omission que corregir en el modelo abierto
+        correct = not (context or {}).get("open_model")
+        recorder.record(request_type, name, response_time, correct=correct)
+
+
+@events.test_start.add_listener
+def _on_test_start(environment, **kwargs):
+    global _flusher
+    recorder.interval_start = time.time()
+    if _flusher is None:
+        _flusher = gevent.spawn(_flush_periodically)
+
+
+@events.test_stop.add_listener
+def _on_test_stop(environment, **kwargs):
+    global _flusher
+    if _flusher is not None:
+        _flusher.kill()
+        _flusher = None
+    recorder.close()
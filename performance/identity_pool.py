@@ -0,0 +1,173 @@
+"""
+Pool de identidades para las pruebas de carga.
+
+En lugar de que todos los usuarios virtuales inicien sesión como admin, se
+pre-crean N usuarios a través de /user-service/api/users, sus credenciales se
+guardan en una tabla CSV en disco (reutilizable entre ejecuciones) y se asignan
+a los usuarios virtuales en round-robin o al azar.
+
+Configuración por entorno:
+- IDENTITY_POOL_SIZE: número de identidades (0 = desactivado, todos usan admin)
+- IDENTITY_POOL_MODE: "round_robin" o "random"
+- IDENTITY_POOL_PATH: ruta de la tabla de credenciales (por defecto, una por host
+  en el directorio temporal, fuera de los artefactos de reports/)
+"""
+import csv
+import hashlib
+import itertools
+import os
+import random
+import tempfile
+import threading
+from typing import List, Optional, Tuple
+
+import requests
+from locust import events
+from locust.runners import MasterRunner
+
+from utils.helpers import generate_user_data
+from utils.token_cache import get_token
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock entre procesos
+    fcntl = None
+
+
+IDENTITY_POOL_SIZE = int(os.getenv("IDENTITY_POOL_SIZE", "0"))
+IDENTITY_POOL_MODE = os.getenv("IDENTITY_POOL_MODE", "round_robin")
+IDENTITY_POOL_PATH = os.getenv("IDENTITY_POOL_PATH")
+
+ADMIN_USERNAME = os.getenv("DEFAULT_USERNAME", "admin")
+ADMIN_PASSWORD = os.getenv("DEFAULT_PASSWORD", "admin123")
+
+
+class IdentityPool:
+    """Tabla de credenciales en disco y asignación a usuarios virtuales."""
+
+    def __init__(self, path: Optional[str] = IDENTITY_POOL_PATH, mode: str = IDENTITY_POOL_MODE):
+        self.path = path
+        self.mode = mode
+        self.identities: List[Tuple[str, str]] = []
+        self._cycle = None
+        self._lock = threading.Lock()
+
+    def _read(self) -> List[Tuple[str, str]]:
+        """Leer la tabla de credenciales (username, password)."""
+        if not self.path or not os.path.exists(self.path):
+            return []
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return [(row["username"], row["password"]) for row in csv.DictReader(f)]
+
+    def load(self) -> List[Tuple[str, str]]:
+        """Cargar las identidades desde disco."""
+        with self._lock:
+            self.identities = self._read()
+            self._cycle = itertools.cycle(self.identities) if self.identities else None
+        return self.identities
+
+    def _create_identity(self, session: requests.Session, host: str, headers: dict) -> Optional[Tuple[str, str]]:
+        """Crear un usuario y retornar sus credenciales."""
+        user_data = generate_user_data()
+        credential = user_data["credential"]
+        try:
+            response = session.post(f"{host}/user-service/api/users", json=user_data, headers=headers, timeout=30)
+        except requests.exceptions.RequestException as e:
+            print(f"Error al crear identidad: {e}")
+            return None
+        if response.status_code not in [200, 201]:
+            print(f"Error al crear identidad (Status {response.status_code})")
+            return None
+        return credential["username"], credential["password"]
+
+    def provision(self, host: str, size: int) -> int:
+        """
+        Asegurar que la tabla tiene al menos `size` identidades.
+
+        El archivo se bloquea mientras se provisiona, de modo que varios procesos
+        de Locust en la misma máquina crean las identidades una sola vez.
+
+        Returns:
+            Número de identidades disponibles
+        """
+        host = host.rstrip("/")
+        if not self.path:
+            host_hash = hashlib.sha256(host.encode("utf-8")).hexdigest()[:12]
+            self.path = os.path.join(tempfile.gettempdir(), f"ecommerce_identity_pool_{host_hash}.csv")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(f"{self.path}.lock", "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                identities = self._read()
+                missing = size - len(identities)
+                if missing > 0:
+                    session = requests.Session()
+                    headers = {"Content-Type": "application/json"}
+                    token, _ = get_token(
+                        f"{host}/app/api/authenticate", ADMIN_USERNAME, ADMIN_PASSWORD,
+                        lambda: _admin_login(session, host)
+                    )
+                    if token:
+                        headers["Authorization"] = f"Bearer {token}"
+
+                    created = []
+                    for _ in range(missing):
+                        identity = self._create_identity(session, host, headers)
+                        if identity:
+                            created.append(identity)
+
+                    write_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+                    # Credenciales de prueba: legibles solo por el usuario actual
+                    fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                    with os.fdopen(fd, "a", newline="", encoding="utf-8") as f:
+                        writer = csv.writer(f)
+                        if write_header:
+                            writer.writerow(["username", "password"])
+                        writer.writerows(created)
+                    print(f"Identidades creadas: {len(created)}/{missing}")
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        return len(self.load())
+
+    def next_identity(self) -> Optional[Tuple[str, str]]:
+        """Asignar una identidad (None si el pool está vacío)."""
+        with self._lock:
+            if not self.identities:
+                return None
+            if self.mode == "random":
+                return random.choice(self.identities)
+            return next(self._cycle)
+
+
+def _admin_login(session: requests.Session, host: str) -> Optional[str]:
+    """Login como admin para poder crear las identidades."""
+    try:
+        response = session.post(
+            f"{host}/app/api/authenticate",
+            json={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD},
+            timeout=30
+        )
+        if response.status_code in [200, 201]:
+            return response.json().get("jwtToken")
+    except (requests.exceptions.RequestException, ValueError):
+        pass
+    return None
+
+
+identity_pool = IdentityPool()
+
+
+@events.test_start.add_listener
+def _provision_identity_pool(environment, **kwargs):
+    """Provisionar el pool antes de que arranquen los usuarios virtuales."""
+    if IDENTITY_POOL_SIZE <= 0 or isinstance(environment.runner, MasterRunner):
+        return
+    host = environment.host or "http://localhost:8080"
+    available = identity_pool.provision(host, IDENTITY_POOL_SIZE)
+    print(f"Pool de identidades: {available} disponibles ({identity_pool.mode})")
@@ -0,0 +1,118 @@
+"""
+Formas de carga personalizadas para Locust.
+
+StepLoadShape sube los usuarios por escalones y detiene la prueba en cuanto el
+p95 o la tasa de errores de un escalón supera su umbral. El número de usuarios
+del último escalón sano (el "knee") es la capacidad que se reporta en cada
+release; se guarda en un JSON junto con las métricas de todos los escalones.
+
+Configuración por entorno:
+- STEP_USERS: usuarios que se añaden en cada escalón (default: 10)
+- STEP_TIME: duración de cada escalón en segundos (default: 30)
+- STEP_MAX_USERS: usuarios máximos (default: 200)
+- STEP_SPAWN_RATE: usuarios por segundo al subir de escalón (default: 10)
+- STEP_P95_THRESHOLD_MS: p95 máximo aceptable en ms (default: 1000)
+- STEP_ERROR_RATE_THRESHOLD: tasa de errores máxima aceptable (default: 0.05)
+- STEP_RESULT_PATH: JSON de resultados
+  (default: reports/load_tests/step_load_knee.json)
+"""
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from locust import LoadTestShape
+
+
+STEP_USERS = int(os.getenv("STEP_USERS", "10"))
+STEP_TIME = int(os.getenv("STEP_TIME", "30"))
+STEP_MAX_USERS = int(os.getenv("STEP_MAX_USERS", "200"))
+STEP_SPAWN_RATE = float(os.getenv("STEP_SPAWN_RATE", "10"))
+STEP_P95_THRESHOLD_MS = float(os.getenv("STEP_P95_THRESHOLD_MS", "1000"))
+STEP_ERROR_RATE_THRESHOLD = float(os.getenv("STEP_ERROR_RATE_THRESHOLD", "0.05"))
+STEP_RESULT_PATH = os.getenv("STEP_RESULT_PATH", "reports/load_tests/step_load_knee.json")
+
+
+class StepLoadShape(LoadTestShape):
+    """Carga escalonada con parada automática al cruzar los umbrales."""
+
+    step_users = STEP_USERS
+    step_time = STEP_TIME
+    max_users = STEP_MAX_USERS
+    spawn_rate = STEP_SPAWN_RATE
+    p95_threshold_ms = STEP_P95_THRESHOLD_MS
+    error_rate_threshold = STEP_ERROR_RATE_THRESHOLD
+    result_path = STEP_RESULT_PATH
+
+    def __init__(self):
+        super().__init__()
+        self.steps: List[Dict[str, Any]] = []
+        self._step = 0
+        self._step_start: Tuple[int, int] = (0, 0)
+        self._finished = False
+
+    def _users_at(self, step: int) -> int:
+        return min(self.step_users * (step + 1), self.max_users)
+
+    def _close_step(self, step: int) -> Dict[str, Any]:
+        """Métricas del escalón que acaba de terminar."""
+        total = self.runner.stats.total
+        requests = total.num_requests - self._step_start[0]
+        failures = total.num_failures - self._step_start[1]
+        self._step_start = (total.num_requests, total.num_failures)
+        # p95 de la ventana reciente (últimos segundos del escalón, ya estabilizado)
+        p95 = total.get_current_response_time_percentile(0.95) or 0
+        result = {
+            "users": self._users_at(step),
+            "requests": requests,
+            "rps": round(requests / self.step_time, 2),
+            "p95_ms": p95,
+            "error_rate": round(failures / requests, 4) if requests else 0.0,
+        }
+        self.steps.append(result)
+        return result
+
+    def _breach(self, step: Dict[str, Any]) -> Optional[str]:
+        if step["p95_ms"] > self.p95_threshold_ms:
+            return f"p95 {step['p95_ms']}ms > {self.p95_threshold_ms:g}ms"
+        if step["error_rate"] > self.error_rate_threshold:
+            return f"error rate {step['error_rate']:.2%} > {self.error_rate_threshold:.2%}"
+        return None
+
+    def _finish(self, reason: str, breached: Optional[Dict[str, Any]]) -> None:
+        """Registrar el knee y los escalones medidos."""
+        self._finished = True
+        healthy = [s for s in self.steps if s is not breached]
+        result = {
+            "knee_users": healthy[-1]["users"] if healthy else 0,
+            "breached_at_users": breached["users"] if breached else None,
+            "reason": reason,
+            "thresholds": {
+                "p95_ms": self.p95_threshold_ms,
+                "error_rate": self.error_rate_threshold,
+            },
+            "steps": self.steps,
+        }
+        directory = os.path.dirname(self.result_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.result_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Step load terminado ({reason}): knee en {result['knee_users']} usuarios -> {self.result_path}")
+
+    def tick(self) -> Optional[Tuple[int, float]]:
+        if self._finished:
+            return None
+
+        step = int(self.get_run_time() // self.step_time)
+        if step > self._step:
+            finished = self._close_step(self._step)
+            reason = self._breach(finished)
+            if reason:
+                self._finish(reason, finished)
+                return None
+            if finished["users"] >= self.max_users:
+                self._finish("max users reached", None)
+                return None
+            self._step = step
+
+        return self._users_at(self._step), self.spawn_rate
@@ -2,12 +2,13 @@
 Pruebas de rendimiento para API Gateway (endpoints principales).
 """
 from locust import task, between
-from performance.locust_base import BaseLocustUser
+from performance.locust_base import LocustUser
+from performance.entity_index import entity_index, user_keys, category_keys
 from utils.helpers import generate_user_data, generate_category_data, generate_product_data
 import random
 
 
-class APIGatewayUser(BaseLocustUser):
+class APIGatewayUser(LocustUser):
     """Usuario virtual para pruebas de rendimiento del API Gateway."""
     
     host = "http://localhost:8080"
@@ -62,6 +63,7 @@ class APIGatewayUser(BaseLocustUser):
                 data = response.json()
                 if "userId" in data:
                     self.created_resources["user_ids"].append(data["userId"])
+                    entity_index.add("user", user_keys(user_data), data["userId"])
                 response.success()
             elif response.status_code == 409:
                 response.success()
@@ -71,7 +73,7 @@ class APIGatewayUser(BaseLocustUser):
     @task(2)
     def create_product(self):
         """Crear producto a través del API Gateway."""
-        if not self.created_resources["category_ids"]:
+        if not self.resource_ids("category_ids"):
             category_data = generate_category_data()
             headers = self.get_headers()
             cat_response = self.client.post(
@@ -84,27 +86,14 @@ class APIGatewayUser(BaseLocustUser):
                 cat_data = cat_response.json()
                 if "categoryId" in cat_data:
                     self.created_resources["category_ids"].append(cat_data["categoryId"])
+                    entity_index.add("category", category_keys(category_data), cat_data["categoryId"])
             elif cat_response.status_code == 409:
-                get_cats = self.client.get(
-                    "/product-service/api/categories",
-                    headers=headers,
-                    name="API Gateway - Get Categories After Conflict"
-                )
-                if get_cats.status_code == 200:
-                    cats_data = get_cats.json()
-                    if isinstance(cats_data, dict) and "collection" in cats_data:
-                        cats = cats_data["collection"]
-                    elif isinstance(cats_data, list):
-                        cats = cats_data
-                    else:
-                        cats = []
-                    if cats and len(cats) > 0:
-                        cat_id = cats[0].get("categoryId")
-                        if cat_id:
-                            self.created_resources["category_ids"].append(cat_id)
+                cat_id = entity_index.resolve("category", category_keys(category_data))
+                if cat_id:
+                    self.borrowed_resources["category_ids"].append(cat_id)
         
-        if self.created_resources["category_ids"]:
-            category_id = random.choice(self.created_resources["category_ids"])
+        if self.resource_ids("category_ids"):
+            category_id = random.choice(self.resource_ids("category_ids"))
             product_data = generate_product_data(category_id)
             headers = self.get_headers()
             
@@ -1,23 +1,47 @@
 """
-Clase base para pruebas de rendimiento con Locust.
+Clases base para pruebas de rendimiento con Locust.
+
+Hay dos motores HTTP con la misma interfaz (get_headers, authenticate,
+created_resources y limpieza al detenerse):
+- BaseLocustUser: HttpUser (python-requests), el motor por defecto
+- FastBaseLocustUser: FastHttpUser (geventhttpclient), varias veces más RPS por
+  núcleo, para llevar el gateway a su punto de quiebre desde una sola máquina
+
+Los usuarios de cada servicio heredan de LocustUser, que es uno u otro según
+LOCUST_ENGINE ("http" o "fast").
 """
-from locust import HttpUser, between
-from typing import Dict, Any
+from locust import HttpUser, FastHttpUser, between
+from typing import Dict, Any, Optional
 import sys
 import os
+import time
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from performance.cleanup import CleanupEngine, CLEANUP_CONCURRENCY
+from performance.entity_index import entity_index
+# Histogramas HDR de todas las peticiones de los usuarios basados en esta clase
+import performance.hdr_recorder  # noqa: F401
+from performance.identity_pool import identity_pool
+from utils.token_cache import get_token, TOKEN_REFRESH_MARGIN
+
+
+LOCUST_ENGINE = os.getenv("LOCUST_ENGINE", "http")
+# Conexiones por usuario virtual con FastHttpUser (al menos las del motor de limpieza)
+FAST_HTTP_CONCURRENCY = int(os.getenv("FAST_HTTP_CONCURRENCY", str(max(CLEANUP_CONCURRENCY, 10))))
 
-class BaseLocustUser(HttpUser):
-    """Clase base para usuarios de Locust con utilidades comunes."""
+
+class LocustUserMixin:
+    """Utilidades comunes a los usuarios de Locust, independientes del motor HTTP."""
     
-    abstract = True
     wait_time = between(1, 3)
+    auth_username = "admin"
+    auth_password = "admin123"
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.jwt_token = None
+        self.jwt_token_exp = 0.0
         self.created_resources = {
             "user_ids": [],
             "product_ids": [],
@@ -27,80 +51,100 @@ class BaseLocustUser(HttpUser):
             "payment_ids": [],
             "address_ids": [],
         }
+        # IDs de entidades de otros usuarios virtuales (conflictos 409): no se limpian
+        self.borrowed_resources = {
+            "user_ids": [],
+            "category_ids": [],
+        }
+    
+    def resource_ids(self, key: str) -> list:
+        """IDs utilizables de un tipo: los creados y los tomados prestados."""
+        return self.created_resources[key] + self.borrowed_resources.get(key, [])
     
     def on_start(self):
         """Ejecutado al inicio de cada usuario virtual."""
+        identity = identity_pool.next_identity()
+        if identity:
+            self.auth_username, self.auth_password = identity
         self.authenticate()
     
-    def authenticate(self):
-        """Autenticar y obtener token JWT."""
+    def _login(self) -> Optional[str]:
+        """Hacer login contra el proxy-client y retornar el token JWT."""
         try:
             auth_data = {
-                "username": "admin",
-                "password": "admin123"
+                "username": self.auth_username,
+                "password": self.auth_password
             }
             response = self.client.post("/app/api/authenticate", json=auth_data, name="Authenticate")
             if response.status_code in [200, 201]:
                 data = response.json()
                 if isinstance(data, dict) and "jwtToken" in data:
-                    self.jwt_token = data["jwtToken"]
+                    return data["jwtToken"]
                 elif isinstance(data, dict) and "token" in data:
-                    self.jwt_token = data["token"]
+                    return data["token"]
                 elif isinstance(data, str):
-                    self.jwt_token = data
+                    return data
+        except Exception:
+            pass
+        return None
+    
+    def authenticate(self):
+        """Autenticar y obtener token JWT (compartido entre usuarios y procesos)."""
+        try:
+            self.jwt_token, self.jwt_token_exp = get_token(
+                f"{self.host}/app/api/authenticate",
+                self.auth_username,
+                self.auth_password,
+                self._login
+            )
         except Exception:
             self.jwt_token = None
+            self.jwt_token_exp = 0.0
     
     def get_headers(self) -> Dict[str, str]:
         """Obtener headers con autenticación."""
+        # Renovar el token antes de que expire (sin cortes por 401 en pruebas largas)
+        if self.jwt_token and self.jwt_token_exp - TOKEN_REFRESH_MARGIN <= time.time():
+            self.authenticate()
         headers = {"Content-Type": "application/json"}
         if self.jwt_token:
             headers["Authorization"] = f"Bearer {self.jwt_token}"
         return headers
     
+    def on_stop(self):
+        """Ejecutado al detener cada usuario virtual."""
+        self.cleanup_resources()
+    
     def cleanup_resources(self):
-        """Limpiar recursos creados durante las pruebas."""
-        headers = self.get_headers()
-        
-        for payment_id in self.created_resources["payment_ids"]:
-            try:
-                self.client.delete(f"/payment-service/api/payments/{payment_id}", headers=headers, name="Cleanup Payment")
-            except:
-                pass
-        
-        for order_id in self.created_resources["order_ids"]:
-            try:
-                self.client.delete(f"/order-service/api/orders/{order_id}", headers=headers, name="Cleanup Order")
-            except:
-                pass
-        
-        for cart_id in self.created_resources["cart_ids"]:
-            try:
-                self.client.delete(f"/order-service/api/carts/{cart_id}", headers=headers, name="Cleanup Cart")
-            except:
-                pass
-        
-        for product_id in self.created_resources["product_ids"]:
-            try:
-                self.client.delete(f"/product-service/api/products/{product_id}", headers=headers, name="Cleanup Product")
-            except:
-                pass
-        
-        for category_id in self.created_resources["category_ids"]:
-            try:
-                self.client.delete(f"/product-service/api/categories/{category_id}", headers=headers, name="Cleanup Category")
-            except:
-                pass
-        
-        for address_id in self.created_resources["address_ids"]:
-            try:
-                self.client.delete(f"/user-service/api/address/{address_id}", headers=headers, name="Cleanup Address")
-            except:
-                pass
-        
-        for user_id in self.created_resources["user_ids"]:
-            try:
-                self.client.delete(f"/user-service/api/users/{user_id}", headers=headers, name="Cleanup User")
-            except:
-                pass
+        """Limpiar recursos creados durante las pruebas (por niveles y en paralelo)."""
+        entity_index.discard("user", self.created_resources["user_ids"])
+        entity_index.discard("category", self.created_resources["category_ids"])
+        engine = CleanupEngine(self.client, self.get_headers())
+        engine.run(self.created_resources)
+        for resource_ids in list(self.created_resources.values()) + list(self.borrowed_resources.values()):
+            resource_ids.clear()
+
+
+class BaseLocustUser(LocustUserMixin, HttpUser):
+    """Clase base para usuarios de Locust sobre python-requests."""
+    
+    abstract = True
+
+
+class FastBaseLocustUser(LocustUserMixin, FastHttpUser):
+    """Clase base para usuarios de Locust sobre geventhttpclient (alto RPS)."""
+    
+    abstract = True
+    concurrency = FAST_HTTP_CONCURRENCY
+
+
+_ENGINES = {
+    "http": BaseLocustUser,
+    "fast": FastBaseLocustUser,
+}
+
+if LOCUST_ENGINE not in _ENGINES:
+    raise ValueError(f"Unknown LOCUST_ENGINE: {LOCUST_ENGINE} (expected one of {', '.join(_ENGINES)})")
 
+# Clase base de los usuarios de cada servicio según el motor elegido
+LocustUser = _ENGINES[LOCUST_ENGINE]
@@ -2,12 +2,13 @@
 Pruebas de rendimiento para Order Service.
 """
 from locust import task, between
-from performance.locust_base import BaseLocustUser
+from performance.locust_base import LocustUser
+from performance.entity_index import entity_index, user_keys
 from utils.helpers import generate_user_data, generate_cart_data, generate_order_data
 import random
 
 
-class OrderServiceUser(BaseLocustUser):
+class OrderServiceUser(LocustUser):
     """Usuario virtual para pruebas de rendimiento del Order Service."""
     
     host = "http://localhost:8080"
@@ -15,7 +16,7 @@ class OrderServiceUser(BaseLocustUser):
     
     def ensure_user_exists(self):
         """Asegurar que existe un usuario."""
-        if not self.created_resources["user_ids"]:
+        if not self.resource_ids("user_ids"):
             user_data = generate_user_data()
             headers = self.get_headers()
             response = self.client.post(
@@ -28,33 +29,20 @@ class OrderServiceUser(BaseLocustUser):
                 data = response.json()
                 if "userId" in data:
                     self.created_resources["user_ids"].append(data["userId"])
+                    entity_index.add("user", user_keys(user_data), data["userId"])
             elif response.status_code == 409:
-                get_users = self.client.get(
-                    "/user-service/api/users",
-                    headers=headers,
-                    name="Get Users After Conflict"
-                )
-                if get_users.status_code == 200:
-                    users_data = get_users.json()
-                    if isinstance(users_data, dict) and "collection" in users_data:
-                        users = users_data["collection"]
-                    elif isinstance(users_data, list):
-                        users = users_data
-                    else:
-                        users = []
-                    if users and len(users) > 0:
-                        user_id = users[0].get("userId")
-                        if user_id:
-                            self.created_resources["user_ids"].append(user_id)
+                user_id = entity_index.resolve("user", user_keys(user_data))
+                if user_id:
+                    self.borrowed_resources["user_ids"].append(user_id)
     
     @task(3)
     def create_cart(self):
         """Crear carrito."""
         self.ensure_user_exists()
-        if not self.created_resources["user_ids"]:
+        if not self.resource_ids("user_ids"):
             return
         
-        user_id = random.choice(self.created_resources["user_ids"])
+        user_id = random.choice(self.resource_ids("user_ids"))
         cart_data = generate_cart_data(user_id)
         headers = self.get_headers()
         
@@ -2,12 +2,13 @@
 Pruebas de rendimiento para Payment Service.
 """
 from locust import task, between
-from performance.locust_base import BaseLocustUser
+from performance.locust_base import LocustUser
+from performance.entity_index import entity_index, user_keys
 from utils.helpers import generate_payment_data
 import random
 
 
-class PaymentServiceUser(BaseLocustUser):
+class PaymentServiceUser(LocustUser):
     """Usuario virtual para pruebas de rendimiento del Payment Service."""
     
     host = "http://localhost:8080"
@@ -32,24 +33,11 @@ class PaymentServiceUser(BaseLocustUser):
                 user_id = user_response.json().get("userId")
                 if user_id:
                     self.created_resources["user_ids"].append(user_id)
+                    entity_index.add("user", user_keys(user_data), user_id)
             elif user_response.status_code == 409:
-                get_users = self.client.get(
-                    "/user-service/api/users",
-                    headers=headers,
-                    name="Get Users For Payment After Conflict"
-                )
-                if get_users.status_code == 200:
-                    users_data = get_users.json()
-                    if isinstance(users_data, dict) and "collection" in users_data:
-                        users = users_data["collection"]
-                    elif isinstance(users_data, list):
-                        users = users_data
-                    else:
-                        users = []
-                    if users and len(users) > 0:
-                        user_id = users[0].get("userId")
-                        if user_id:
-                            self.created_resources["user_ids"].append(user_id)
+                user_id = entity_index.resolve("user", user_keys(user_data))
+                if user_id:
+                    self.borrowed_resources["user_ids"].append(user_id)
             
             if not user_id:
                 return None
@@ -106,6 +94,7 @@ class PaymentServiceUser(BaseLocustUser):
         user_id = user_response.json().get("userId")
         if not user_id:
             return
+        entity_index.add("user", user_keys(user_data), user_id)
         
         cart_data = generate_cart_data(user_id)
         cart_response = self.client.post(
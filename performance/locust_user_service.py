@@ -2,12 +2,13 @@
 Pruebas de rendimiento para User Service.
 """
 from locust import task, between
-from performance.locust_base import BaseLocustUser
+from performance.locust_base import LocustUser
+from performance.entity_index import entity_index, user_keys
 from utils.helpers import generate_user_data, generate_address_data
 import random
 
 
-class UserServiceUser(BaseLocustUser):
+class UserServiceUser(LocustUser):
     """Usuario virtual para pruebas de rendimiento del User Service."""
     
     host = "http://localhost:8080"
@@ -29,6 +30,7 @@ class UserServiceUser(BaseLocustUser):
                 data = response.json()
                 if "userId" in data:
                     self.created_resources["user_ids"].append(data["userId"])
+                    entity_index.add("user", user_keys(user_data), data["userId"])
                 response.success()
             elif response.status_code == 409:
                 response.success()
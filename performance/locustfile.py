@@ -1,5 +1,9 @@
 """
 Archivo principal de Locust para ejecutar todas las pruebas de rendimiento.
+
+El motor HTTP se elige con LOCUST_ENGINE: "http" (python-requests, por defecto)
+o "fast" (geventhttpclient, para alto RPS desde una sola máquina):
+    LOCUST_ENGINE=fast locust -f performance/locustfile.py --host=http://localhost:8080
 """
 from performance.locust_user_service import UserServiceUser
 from performance.locust_product_service import ProductServiceUser
@@ -7,3 +11,6 @@ from performance.locust_order_service import OrderServiceUser
 from performance.locust_payment_service import PaymentServiceUser
 from performance.locust_api_gateway import APIGatewayUser
 
+# Estadísticas por worker en ejecuciones distribuidas (performance.distributed)
+import performance.worker_stats  # noqa: F401
+
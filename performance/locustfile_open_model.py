@@ -0,0 +1,17 @@
+"""
+Archivo de Locust con modelo abierto (tasa de llegadas).
+Las peticiones se lanzan a una tasa objetivo independiente de los tiempos de
+respuesta, para medir el p99 bajo saturación sin coordinated omission
+(ver performance/open_model.py).
+"""
+from performance.open_model import OpenModelUser
+
+# Estadísticas por worker en ejecuciones distribuidas (performance.distributed)
+import performance.worker_stats  # noqa: F401
+
+# Tasa constante de 200 peticiones/s durante 2 minutos:
+# OPEN_MODEL_RATE=200 locust -f performance/locustfile_open_model.py --host=http://localhost:8080 \
+#     --headless --users 1 --spawn-rate 1 --run-time 120s
+# Llegadas de Poisson o reproducidas de una traza:
+# OPEN_MODEL_SCHEDULE=poisson OPEN_MODEL_RATE=200 locust -f performance/locustfile_open_model.py ...
+# OPEN_MODEL_SCHEDULE=trace OPEN_MODEL_TRACE=data/arrivals.csv locust -f performance/locustfile_open_model.py ...
@@ -1,15 +1,24 @@
 """
 Archivo de Locust con carga escalonada (step load).
-Aumenta gradualmente el número de usuarios para encontrar el punto de quiebre.
+Aumenta gradualmente el número de usuarios para encontrar el punto de quiebre:
+la prueba se detiene sola cuando el p95 o la tasa de errores cruzan su umbral y
+el número de usuarios del knee se guarda en STEP_RESULT_PATH
+(ver performance/load_shapes.py).
 """
 from performance.locust_user_service import UserServiceUser
 from performance.locust_product_service import ProductServiceUser
 from performance.locust_order_service import OrderServiceUser
 from performance.locust_payment_service import PaymentServiceUser
 from performance.locust_api_gateway import APIGatewayUser
+from performance.load_shapes import StepLoadShape
+
+# Estadísticas por worker en ejecuciones distribuidas (performance.distributed)
+import performance.worker_stats  # noqa: F401
 
 # Para usar step load, ejecuta:
-# locust -f performance/locustfile_step_load.py --host=http://localhost:8080 --step-load
+# locust -f performance/locustfile_step_load.py --host=http://localhost:8080 --headless
 # O con parámetros específicos:
-# locust -f performance/locustfile_step_load.py --host=http://localhost:8080 --step-load --step-users=10 --step-time=30s
-
+# STEP_USERS=10 STEP_TIME=30 STEP_MAX_USERS=500 STEP_P95_THRESHOLD_MS=800 \
+#     locust -f performance/locustfile_step_load.py --host=http://localhost:8080 --headless
+# Para buscar el punto de quiebre real del gateway, usar el motor rápido (geventhttpclient):
+# LOCUST_ENGINE=fast locust -f performance/locustfile_step_load.py --host=http://localhost:8080 --headless
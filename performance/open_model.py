@@ -0,0 +1,205 @@
+"""
+Generador de carga de modelo abierto (tasa de llegadas).
+
+Los usuarios de Locust siguen un modelo cerrado: cada usuario espera a su
+respuesta y a wait_time antes de la siguiente petición, así que cuando el
+gateway se degrada la carga ofrecida baja y el p99 sale artificialmente bajo
+(coordinated omission). Aquí las peticiones se lanzan en instantes planificados
+de antemano, a una tasa objetivo que no depende de los tiempos de respuesta, y
+se registra con cuánto retraso arrancó cada una respecto a su instante previsto.
+
+Planificaciones (OPEN_MODEL_SCHEDULE):
+- constant: llegadas equiespaciadas a OPEN_MODEL_RATE por segundo
+- poisson: llegadas de Poisson con tasa media OPEN_MODEL_RATE
+- trace: instantes (segundos desde el inicio, uno por línea) leídos de
+  OPEN_MODEL_TRACE, por ejemplo exportados de los logs de producción
+
+Configuración por entorno:
+- OPEN_MODEL_RATE: llegadas por segundo (default: 50)
+- OPEN_MODEL_MAX_IN_FLIGHT: peticiones simultáneas máximas (default: 1000);
+  si se alcanza, las llegadas esperan y su retraso queda registrado. El cliente
+  HTTP (concurrency de FastHttpUser o pool de requests) se dimensiona igual, para
+  que ninguna petición espere conexión después de registrar su retraso
+- OPEN_MODEL_SEED: semilla para la planificación de Poisson (opcional)
+- OPEN_MODEL_LATENESS_PATH: JSON con el resumen de retrasos
+  (default: reports/load_tests/open_model_lateness.json)
+
+Uso:
+    OPEN_MODEL_SCHEDULE=poisson OPEN_MODEL_RATE=200 \\
+        locust -f performance/locustfile_open_model.py --host=http://localhost:8080 \\
+        --headless --users 1 --run-time 120s
+"""
+import json
+import os
+import random
+import time
+from array import array
+from typing import Any, Dict, Iterator, Optional
+
+import gevent
+import requests
+from gevent.pool import Pool
+from locust import constant, events, task
+from locust.exception import StopUser
+
+from performance.locust_base import LocustUser
+
+
+OPEN_MODEL_SCHEDULE = os.getenv("OPEN_MODEL_SCHEDULE", "constant")
+OPEN_MODEL_RATE = float(os.getenv("OPEN_MODEL_RATE", "50"))
+OPEN_MODEL_TRACE = os.getenv("OPEN_MODEL_TRACE")
+OPEN_MODEL_SEED = os.getenv("OPEN_MODEL_SEED")
+OPEN_MODEL_MAX_IN_FLIGHT = int(os.getenv("OPEN_MODEL_MAX_IN_FLIGHT", "1000"))
+OPEN_MODEL_LATENESS_PATH = os.getenv("OPEN_MODEL_LATENESS_PATH", "reports/load_tests/open_model_lateness.json")
+
+# Mezcla de peticiones: (nombre en las estadísticas, endpoint, peso)
+OPEN_MODEL_REQUESTS = [
+    ("Open Model - Get All Users", "/user-service/api/users", 5),
+    ("Open Model - Get All Products", "/product-service/api/products", 4),
+    ("Open Model - Get All Orders", "/order-service/api/orders", 3),
+    ("Open Model - Get All Categories", "/product-service/api/categories", 2),
+]
+
+
+def constant_arrivals(rate: float) -> Iterator[float]:
+    """Instantes equiespaciados a `rate` llegadas por segundo."""
+    index = 0
+    while True:
+        yield index / rate
+        index += 1
+
+
+def poisson_arrivals(rate: float, seed: Optional[int] = None) -> Iterator[float]:
+    """Instantes de un proceso de Poisson de tasa `rate`."""
+    rng = random.Random(seed)
+    offset = 0.0
+    while True:
+        offset += rng.expovariate(rate)
+        yield offset
+
+
+def trace_arrivals(path: str) -> Iterator[float]:
+    """Instantes leídos de un archivo (primera columna, segundos desde el inicio)."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            yield float(line.split(",")[0])
+
+
+def build_schedule(
+    schedule: str = OPEN_MODEL_SCHEDULE,
+    rate: float = OPEN_MODEL_RATE,
+    trace: Optional[str] = OPEN_MODEL_TRACE,
+    seed: Optional[str] = OPEN_MODEL_SEED
+) -> Iterator[float]:
+    """Planificación de llegadas según la configuración."""
+    if schedule == "constant":
+        return constant_arrivals(rate)
+    if schedule == "poisson":
+        return poisson_arrivals(rate, int(seed) if seed is not None else None)
+    if schedule == "trace":
+        if not trace:
+            raise ValueError("OPEN_MODEL_TRACE is required for the trace schedule")
+        return trace_arrivals(trace)
+    raise ValueError(f"Unknown OPEN_MODEL_SCHEDULE: {schedule} (expected constant, poisson or trace)")
+
+
+class LatenessRecorder:
+    """Retrasos de arranque (ms) respecto al instante planificado."""
+
+    def __init__(self):
+        self.samples = array("d")
+
+    def record(self, lateness_ms: float) -> None:
+        self.samples.append(lateness_ms)
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.samples:
+            return {"count": 0}
+        ordered = sorted(self.samples)
+        count = len(ordered)
+
+        def percentile(q: float) -> float:
+            return round(ordered[min(int(q * count), count - 1)], 3)
+
+        return {
+            "count": count,
+            "mean_ms": round(sum(ordered) / count, 3),
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(ordered[-1], 3),
+            "late_over_10ms": sum(1 for s in ordered if s > 10),
+        }
+
+
+lateness = LatenessRecorder()
+
+
+class OpenModelUser(LocustUser):
+    """
+    Despachador de modelo abierto: un único usuario que lanza cada petición en
+    su instante planificado, sin esperar a las respuestas anteriores.
+    """
+
+    host = "http://localhost:8080"
+    fixed_count = 1
+    wait_time = constant(0)
+    # Conexiones de FastHttpUser: tantas como peticiones en curso
+    concurrency = OPEN_MODEL_MAX_IN_FLIGHT
+
+    def context(self) -> Dict[str, Any]:
+        """Marcar las peticiones para que hdr_recorder no las corrija por coordinated omission."""
+        return {**super().context(), "open_model": True}
+
+    def on_start(self):
+        super().on_start()
+        if isinstance(self.client, requests.Session):
+            # HttpUser: pool de conexiones del mismo tamaño que el de greenlets
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=OPEN_MODEL_MAX_IN_FLIGHT, pool_block=False)
+            self.client.mount("http://", adapter)
+            self.client.mount("https://", adapter)
+
+    @task
+    def dispatch(self):
+        """Recorrer la planificación lanzando cada llegada en un greenlet."""
+        weights = [weight for _, _, weight in OPEN_MODEL_REQUESTS]
+        pool = Pool(OPEN_MODEL_MAX_IN_FLIGHT)
+        started_at = time.monotonic()
+
+        for offset in build_schedule():
+            intended = started_at + offset
+            delay = intended - time.monotonic()
+            if delay > 0:
+                gevent.sleep(delay)
+            name, path, _ = random.choices(OPEN_MODEL_REQUESTS, weights=weights)[0]
+            # Si el pool está lleno, spawn bloquea: ese retraso también se registra
+            pool.spawn(self._send, name, path, intended)
+
+        # Planificación agotada (solo con trace)
+        pool.join()
+        raise StopUser()
+
+    def _send(self, name: str, path: str, intended: float) -> None:
+        lateness.record((time.monotonic() - intended) * 1000)
+        self.client.get(path, headers=self.get_headers(), name=name)
+
+
+@events.test_stop.add_listener
+def _write_lateness(environment, **kwargs):
+    """Guardar el resumen de retrasos de este proceso."""
+    if not lateness.samples:
+        return
+    result = {
+        "schedule": OPEN_MODEL_SCHEDULE,
+        "target_rate": OPEN_MODEL_RATE if OPEN_MODEL_SCHEDULE != "trace" else None,
+        "lateness": lateness.summary(),
+    }
+    directory = os.path.dirname(OPEN_MODEL_LATENESS_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(OPEN_MODEL_LATENESS_PATH, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"Retrasos del modelo abierto: {result['lateness']} -> {OPEN_MODEL_LATENESS_PATH}")
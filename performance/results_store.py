@@ -0,0 +1,349 @@
+"""
+Almacén local de resultados de pruebas de carga y detección de regresiones.
+
+Cada ejecución se guarda como un archivo columnar compacto (por endpoint y por
+segundo: RPS, fallos/s, p50, p95, p99) a partir del stats_history.csv de Locust
+(--csv ... --csv-full-history). El almacén es de solo adición: cada ejecución es
+un archivo inmutable y el índice (index.jsonl) solo crece.
+
+`compare` contrasta la última ejecución de una etiqueta (ej: load_50users)
+contra una línea base móvil formada por las N ejecuciones anteriores: para cada
+endpoint y métrica aplica una prueba de Mann-Whitney unilateral y marca
+regresión si es significativa y además supera el umbral de cambio relativo de la
+mediana. Las muestras por segundo están autocorrelacionadas (Locust calcula los
+percentiles sobre una ventana móvil de 10 s), así que la prueba no se aplica a
+ellas sino a las medianas de bloques consecutivos de esa duración, dentro de
+cada ejecución.
+
+Formato del archivo de una ejecución:
+    MAGIC (4 bytes) | longitud de la cabecera (uint32) | cabecera JSON | columnas
+    (arrays little-endian; endpoint es un índice a la lista de la cabecera)
+
+Uso:
+    python -m performance.results_store ingest reports/load_tests/load_50users_stats_history.csv --label load_50users
+    python -m performance.results_store compare --label load_50users --baseline-runs 5 --block-seconds 10
+
+Configuración por entorno:
+- RESULTS_STORE_DIR: directorio del almacén (default: reports/results_store)
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+
+RESULTS_STORE_DIR = os.getenv("RESULTS_STORE_DIR", "reports/results_store")
+MAGIC = b"LTR1"
+
+# Columna -> (typecode de array, columna en stats_history.csv)
+COLUMNS: Dict[str, Tuple[str, Optional[str]]] = {
+    "endpoint": ("H", None),
+    "timestamp": ("q", "Timestamp"),
+    "user_count": ("q", "User Count"),
+    "rps": ("d", "Requests/s"),
+    "failures_per_s": ("d", "Failures/s"),
+    "p50": ("d", "50%"),
+    "p95": ("d", "95%"),
+    "p99": ("d", "99%"),
+}
+
+# Bloque de muestras por segundo para la comparación (ventana de percentiles de Locust)
+COMPARE_BLOCK_SECONDS = 10
+# Bloques mínimos por lado para aplicar la prueba
+MIN_BLOCKS = 4
+
+# Métricas comparadas: True si un valor mayor es peor
+REGRESSION_METRICS = {
+    "p50": True,
+    "p95": True,
+    "p99": True,
+    "failures_per_s": True,
+    "rps": False,
+}
+
+
+def _number(value: str) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class RunResults:
+    """Resultados columnares de una ejecución."""
+
+    def __init__(self, endpoints: List[str], columns: Dict[str, array], meta: Dict[str, Any]):
+        self.endpoints = endpoints
+        self.columns = columns
+        self.meta = meta
+
+    @classmethod
+    def from_stats_history(cls, path: str, meta: Dict[str, Any]) -> "RunResults":
+        """Leer el stats_history.csv de Locust."""
+        endpoints: List[str] = []
+        endpoint_ids: Dict[str, int] = {}
+        columns = {name: array(typecode) for name, (typecode, _) in COLUMNS.items()}
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                name = f"{row.get('Type') or ''} {row.get('Name') or ''}".strip()
+                if name not in endpoint_ids:
+                    endpoint_ids[name] = len(endpoints)
+                    endpoints.append(name)
+                columns["endpoint"].append(endpoint_ids[name])
+                for column, (typecode, source) in COLUMNS.items():
+                    if source is None:
+                        continue
+                    value = _number(row.get(source))
+                    if typecode == "d":
+                        columns[column].append(value)
+                    else:
+                        columns[column].append(0 if math.isnan(value) else int(value))
+        # Las filas sin peticiones todavía tienen percentiles a 0: no son muestras
+        for row in range(len(columns["endpoint"])):
+            if columns["rps"][row] == 0:
+                for column in ("p50", "p95", "p99"):
+                    columns[column][row] = math.nan
+        return cls(endpoints, columns, meta)
+
+    def write(self, path: str) -> None:
+        body = b""
+        layout = {}
+        for name, values in self.columns.items():
+            data = values.tobytes() if sys.byteorder == "little" else _swapped(values).tobytes()
+            layout[name] = {"type": values.typecode, "offset": len(body), "length": len(data)}
+            body += data
+        header = json.dumps({
+            "meta": self.meta,
+            "rows": len(self.columns["endpoint"]),
+            "endpoints": self.endpoints,
+            "columns": layout,
+        }).encode("utf-8")
+        # "x": una ejecución guardada nunca se sobrescribe
+        with open(path, "xb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            f.write(body)
+
+    @classmethod
+    def read(cls, path: str) -> "RunResults":
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:4] != MAGIC:
+            raise ValueError(f"Not a load-test results file: {path}")
+        header_len = struct.unpack_from("<I", data, 4)[0]
+        header = json.loads(data[8:8 + header_len])
+        base = 8 + header_len
+        columns = {}
+        for name, spec in header["columns"].items():
+            values = array(spec["type"])
+            values.frombytes(data[base + spec["offset"]:base + spec["offset"] + spec["length"]])
+            columns[name] = values if sys.byteorder == "little" else _swapped(values)
+        return cls(header["endpoints"], columns, header["meta"])
+
+    def samples(self, endpoint: str, metric: str) -> List[float]:
+        """Valores por segundo de una métrica para un endpoint (sin NaN)."""
+        if endpoint not in self.endpoints:
+            return []
+        endpoint_id = self.endpoints.index(endpoint)
+        values = self.columns[metric]
+        return [
+            values[row] for row, e in enumerate(self.columns["endpoint"])
+            if e == endpoint_id and not math.isnan(values[row])
+        ]
+
+
+def _swapped(values: array) -> array:
+    copy = array(values.typecode, values)
+    copy.byteswap()
+    return copy
+
+
+# --- Almacén ------------------------------------------------------------------
+
+class ResultsStore:
+    """Directorio de ejecuciones inmutables más un índice de solo adición."""
+
+    def __init__(self, directory: str = RESULTS_STORE_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.jsonl")
+
+    def runs(self, label: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Ejecuciones registradas, de la más antigua a la más reciente."""
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        return [e for e in entries if label is None or e["label"] == label]
+
+    def ingest(self, stats_history: str, label: str, **meta: Any) -> Dict[str, Any]:
+        """Guardar una ejecución a partir de su stats_history.csv."""
+        os.makedirs(self.directory, exist_ok=True)
+        started = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        run_id = f"{started}_{label}"
+        suffix = 1
+        while os.path.exists(os.path.join(self.directory, f"{run_id}.ltr")):
+            suffix += 1
+            run_id = f"{started}_{label}_{suffix}"
+        entry = {"run_id": run_id, "label": label, "ingested_at": started, "file": f"{run_id}.ltr", **meta}
+
+        results = RunResults.from_stats_history(stats_history, entry)
+        if not any(rps > 0 for rps in results.columns["rps"]):
+            raise ValueError(f"No requests in {stats_history}")
+        results.write(os.path.join(self.directory, entry["file"]))
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        return entry
+
+    def load(self, entry: Dict[str, Any]) -> RunResults:
+        return RunResults.read(os.path.join(self.directory, entry["file"]))
+
+
+# --- Comparación --------------------------------------------------------------
+
+def _median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def block_medians(values: List[float], block: int) -> List[float]:
+    """Medianas de bloques consecutivos de `block` muestras (sin el bloque incompleto final)."""
+    if block <= 1:
+        return list(values)
+    return [_median(values[i:i + block]) for i in range(0, len(values) - block + 1, block)]
+
+
+def mann_whitney_greater(current: List[float], baseline: List[float]) -> float:
+    """
+    p-valor unilateral de que `current` tienda a ser mayor que `baseline`
+    (Mann-Whitney U con aproximación normal y corrección por empates).
+    """
+    n1, n2 = len(current), len(baseline)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    ranked = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(ranked)
+    ties = 0.0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        size = j - i + 1
+        ties += size ** 3 - size
+        i = j + 1
+
+    rank_sum = sum(r for r, (_, group) in zip(ranks, ranked) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0
+    if variance <= 0:
+        return 1.0
+    # Corrección de continuidad
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(
+    current: RunResults,
+    baseline: List[RunResults],
+    alpha: float = 0.01,
+    threshold: float = 0.10,
+    block: int = COMPARE_BLOCK_SECONDS
+) -> List[Dict[str, Any]]:
+    """Regresiones de `current` frente a la línea base (lista vacía si no hay)."""
+    regressions = []
+    for endpoint in current.endpoints:
+        for metric, higher_is_worse in REGRESSION_METRICS.items():
+            now = block_medians(current.samples(endpoint, metric), block)
+            before = [v for run in baseline for v in block_medians(run.samples(endpoint, metric), block)]
+            if len(now) < MIN_BLOCKS or len(before) < MIN_BLOCKS:
+                continue
+            if not higher_is_worse:
+                now = [-v for v in now]
+                before = [-v for v in before]
+            p_value = mann_whitney_greater(now, before)
+            median_now, median_before = _median(now), _median(before)
+            # Empeoramiento relativo (positivo = peor, en ambos sentidos de métrica)
+            if median_before == 0:
+                worsening = math.inf if median_now > 0 else 0.0
+            else:
+                worsening = (median_now - median_before) / abs(median_before)
+            if p_value < alpha and worsening > threshold:
+                baseline_value, current_value = abs(median_before), abs(median_now)
+                regressions.append({
+                    "endpoint": endpoint,
+                    "metric": metric,
+                    "baseline": baseline_value,
+                    "current": current_value,
+                    "change": (current_value - baseline_value) / baseline_value if baseline_value else math.inf,
+                    "p_value": p_value,
+                })
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Almacén de resultados de carga y detección de regresiones")
+    parser.add_argument("--store", default=RESULTS_STORE_DIR, help=f"Directorio del almacén (default: {RESULTS_STORE_DIR})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="Guardar una ejecución desde su stats_history.csv")
+    ingest.add_argument("stats_history", help="CSV generado con --csv ... --csv-full-history")
+    ingest.add_argument("--label", required=True, help="Etiqueta comparable entre ejecuciones (ej: load_50users)")
+
+    comparison = subparsers.add_parser("compare", help="Comparar la última ejecución con la línea base")
+    comparison.add_argument("--label", required=True, help="Etiqueta de las ejecuciones a comparar")
+    comparison.add_argument("--baseline-runs", type=int, default=5, help="Ejecuciones anteriores en la línea base (default: 5)")
+    comparison.add_argument("--alpha", type=float, default=0.01, help="Nivel de significancia (default: 0.01)")
+    comparison.add_argument("--threshold", type=float, default=0.10, help="Cambio relativo mínimo de la mediana (default: 0.10)")
+    comparison.add_argument(
+        "--block-seconds", type=int, default=COMPARE_BLOCK_SECONDS,
+        help=f"Segundos por bloque de muestras comparado (default: {COMPARE_BLOCK_SECONDS})"
+    )
+
+    args = parser.parse_args()
+    store = ResultsStore(args.store)
+
+    if args.command == "ingest":
+        meta = {"git_sha": os.getenv("GITHUB_SHA"), "host": os.getenv("HOST")}
+        try:
+            entry = store.ingest(args.stats_history, args.label, **{k: v for k, v in meta.items() if v})
+        except (OSError, ValueError) as e:
+            print(f"Ejecución no guardada: {e}")
+            sys.exit(2)
+        print(f"Ejecución guardada: {entry['run_id']}")
+        return
+
+    runs = store.runs(args.label)
+    if len(runs) < 2:
+        print(f"Sin línea base para {args.label} ({len(runs)} ejecuciones)")
+        return
+    current = store.load(runs[-1])
+    baseline = [store.load(entry) for entry in runs[-1 - args.baseline_runs:-1]]
+    regressions = compare(current, baseline, args.alpha, args.threshold, args.block_seconds)
+
+    print(f"{args.label}: {runs[-1]['run_id']} frente a {len(baseline)} ejecuciones anteriores")
+    if not regressions:
+        print("Sin regresiones significativas")
+        return
+    for r in regressions:
+        print(
+            f"REGRESIÓN {r['endpoint']} {r['metric']}: {r['baseline']:.2f} -> {r['current']:.2f} "
+            f"({r['change']:+.0%}, p={r['p_value']:.2g})"
+        )
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,8 @@ HOST="${HOST:-http://localhost:8080}"
 SPAWN_RATE="${SPAWN_RATE:-5}"
 DURATION="${DURATION:-60}"
 MODE="${MODE:-multiple}"
+# Motor HTTP de Locust: "http" (requests) o "fast" (geventhttpclient)
+export LOCUST_ENGINE="${LOCUST_ENGINE:-http}"
 
 if [ -n "$USER_LEVELS" ]; then
     MODE="multiple"
@@ -53,6 +55,7 @@ if [ "$MODE" = "single" ] || [ "$MODE" = "interactive" ]; then
     
     echo -e "${GREEN}=== Pruebas de Rendimiento con Locust ===${NC}"
     echo -e "Host: ${HOST}"
+    echo -e "Motor: ${LOCUST_ENGINE}"
     echo -e "Usuarios: ${USERS}"
     echo -e "Tasa de spawn: ${SPAWN_RATE}/s"
     echo -e "Duración: ${DURATION}s"
@@ -77,12 +80,15 @@ if [ "$MODE" = "single" ] || [ "$MODE" = "interactive" ]; then
 
 elif [ "$MODE" = "multiple" ] || [ "$MODE" = "stress" ]; then
     USER_LEVELS=($USER_LEVELS)
+    INGESTED_LEVELS=()
     
     REPORTS_DIR="${REPORTS_DIR:-reports/load_tests}"
     mkdir -p "$REPORTS_DIR"
     
     echo -e "${GREEN}=== Pruebas de Carga con Múltiples Niveles ===${NC}"
     echo -e "Host: ${HOST}"
+    echo -e "Motor: ${LOCUST_ENGINE}"
+    echo -e "Workers: ${WORKERS:-1 (sin modo distribuido)}"
     echo -e "Tasa de spawn: ${SPAWN_RATE}/s"
     echo -e "Duración por prueba: ${DURATION}s"
     echo -e "Niveles: ${USER_LEVELS[*]}"
@@ -96,14 +102,27 @@ elif [ "$MODE" = "multiple" ] || [ "$MODE" = "stress" ]; then
         
         REPORT_PREFIX="${REPORTS_DIR}/load_${USERS}users"
         
-        locust -f performance/locustfile.py \
-            --host="${HOST}" \
-            --users="${USERS}" \
-            --spawn-rate="${SPAWN_RATE}" \
-            --run-time="${DURATION}s" \
-            --headless \
-            --html="${REPORT_PREFIX}.html" \
-            --loglevel=INFO
+        if [ -n "$WORKERS" ]; then
+            # Modo distribuido: un master y WORKERS workers locales
+            python -m performance.distributed \
+                --workers="${WORKERS}" \
+                --host="${HOST}" \
+                --users="${USERS}" \
+                --spawn-rate="${SPAWN_RATE}" \
+                --run-time="${DURATION}" \
+                --report-prefix="${REPORT_PREFIX}"
+        else
+            locust -f performance/locustfile.py \
+                --host="${HOST}" \
+                --users="${USERS}" \
+                --spawn-rate="${SPAWN_RATE}" \
+                --run-time="${DURATION}s" \
+                --headless \
+                --html="${REPORT_PREFIX}.html" \
+                --csv="${REPORT_PREFIX}" \
+                --csv-full-history \
+                --loglevel=INFO
+        fi
         
         LOCUST_EXIT_CODE=$?
         
@@ -138,6 +157,10 @@ PYEOF
             
             echo -e "${GREEN}✓ Prueba con ${USERS} usuarios completada${NC}"
             echo -e "  Reporte: ${REPORT_PREFIX}.html"
+            if [ -f "${REPORT_PREFIX}_stats_history.csv" ] && \
+                python -m performance.results_store ingest "${REPORT_PREFIX}_stats_history.csv" --label "load_${USERS}users"; then
+                INGESTED_LEVELS+=("$USERS")
+            fi
             if [ $LOCUST_EXIT_CODE -ne 0 ]; then
                 echo -e "${YELLOW}  Nota: Algunos errores ocurrieron durante la prueba${NC}"
             fi
@@ -158,6 +181,19 @@ PYEOF
     echo -e "${GREEN}Reportes disponibles en: ${REPORTS_DIR}${NC}"
     echo ""
 
+    echo -e "${YELLOW}Comparando con las ejecuciones anteriores...${NC}"
+    REGRESSION_FOUND=0
+    # Solo los niveles con una ejecución nueva (si no, se compararía una ejecución antigua)
+    for USERS in "${INGESTED_LEVELS[@]}"; do
+        if ! python -m performance.results_store compare --label "load_${USERS}users"; then
+            REGRESSION_FOUND=1
+        fi
+    done
+    if [ $REGRESSION_FOUND -ne 0 ]; then
+        echo -e "${RED}✗ Regresiones de rendimiento detectadas frente a la línea base${NC}"
+        exit 1
+    fi
+
 else
     echo -e "${RED}Error: Modo desconocido '${MODE}'. Usa 'single', 'multiple', 'interactive' o 'stress'${NC}"
     exit 1
@@ -0,0 +1,119 @@
+"""
+Estadísticas por worker en ejecuciones distribuidas de Locust.
+
+El master de Locust solo conserva las estadísticas agregadas de todos los
+workers. Este módulo escucha los reportes que envía cada worker, mantiene una
+copia de sus estadísticas por endpoint junto con su uso de CPU y, al terminar,
+las escribe en un JSON junto a las agregadas. Así se distingue si un pico de
+p99 viene del gateway (todos los workers lo ven) o de un generador saturado
+(un worker con CPU al límite).
+
+Configuración por entorno:
+- WORKER_STATS_PATH: archivo JSON de salida
+  (default: reports/load_tests/worker_stats.json)
+"""
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from locust import events
+from locust.runners import MasterRunner
+from locust.stats import RequestStats, StatsEntry
+
+
+WORKER_STATS_PATH = os.getenv("WORKER_STATS_PATH", "reports/load_tests/worker_stats.json")
+# Uso de CPU a partir del cual Locust considera saturado un generador
+CPU_SATURATION_THRESHOLD = 90.0
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+class WorkerStats:
+    """Estadísticas acumuladas de un worker."""
+
+    def __init__(self, client_id: str):
+        self.client_id = client_id
+        self.stats = RequestStats()
+        self.cpu_samples: List[float] = []
+        self.user_count = 0
+
+    def add_report(self, data: Dict[str, Any], cpu_usage: Optional[float] = None) -> None:
+        """Incorporar un reporte (delta) enviado por el worker al master."""
+        for serialized in data.get("stats", []):
+            entry = StatsEntry.unserialize(serialized)
+            self.stats.get(entry.name, entry.method).extend(entry)
+        if data.get("stats_total"):
+            self.stats.total.extend(StatsEntry.unserialize(data["stats_total"]))
+        self.user_count = data.get("user_count", self.user_count)
+        if cpu_usage is not None:
+            self.cpu_samples.append(cpu_usage)
+
+    def summary(self) -> Dict[str, Any]:
+        cpu_max = max(self.cpu_samples, default=0.0)
+        return {
+            "client_id": self.client_id,
+            "user_count": self.user_count,
+            "cpu": {
+                "mean": round(sum(self.cpu_samples) / len(self.cpu_samples), 1) if self.cpu_samples else 0.0,
+                "max": round(cpu_max, 1),
+                "saturated": cpu_max >= CPU_SATURATION_THRESHOLD,
+            },
+            "total": entry_summary(self.stats.total),
+            "endpoints": [entry_summary(e) for e in self.stats.entries.values()],
+        }
+
+
+def entry_summary(entry: StatsEntry) -> Dict[str, Any]:
+    """Resumen serializable de una entrada de estadísticas."""
+    summary = {
+        "name": entry.name,
+        "method": entry.method,
+        "num_requests": entry.num_requests,
+        "num_failures": entry.num_failures,
+        "fail_ratio": round(entry.fail_ratio, 4),
+        "avg_response_time": round(entry.avg_response_time, 2),
+        "max_response_time": entry.max_response_time,
+    }
+    for percentile in PERCENTILES:
+        key = f"p{int(percentile * 100)}"
+        summary[key] = entry.get_response_time_percentile(percentile) if entry.num_requests else 0
+    return summary
+
+
+_workers: Dict[str, WorkerStats] = {}
+
+
+def write_report(environment, path: str = WORKER_STATS_PATH) -> Dict[str, Any]:
+    """Escribir las estadísticas por worker y las agregadas del master."""
+    report = {
+        "workers": [w.summary() for w in _workers.values()],
+        "merged": {
+            "total": entry_summary(environment.stats.total),
+            "endpoints": [entry_summary(e) for e in environment.stats.entries.values()],
+        },
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+@events.init.add_listener
+def _on_init(environment, **kwargs):
+    """Registrar los listeners solo en el master."""
+    if not isinstance(environment.runner, MasterRunner):
+        return
+
+    @environment.events.worker_report.add_listener
+    def _on_worker_report(client_id, data):
+        node = environment.runner.clients.get(client_id)
+        worker = _workers.setdefault(client_id, WorkerStats(client_id))
+        worker.add_report(data, node.cpu_usage if node is not None else None)
+
+    @environment.events.quitting.add_listener
+    def _on_quitting(environment, **kwargs):
+        if _workers:
+            write_report(environment)
+            print(f"Estadísticas por worker: {WORKER_STATS_PATH}")
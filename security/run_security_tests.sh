@@ -66,8 +66,9 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname("${TESTS_DIR}"))
 
-from security.zap_scanner import ZAPScanner
+from security.zap_scanner import ZAPScanner, AlertsReport
 from security.zap_config import SERVICE_URLS, API_ENDPOINTS, MIN_ALERT_LEVEL
+from security.scan_cache import ScanCache, ZAP_SCAN_CACHE
 import json
 
 zap = ZAPScanner()
@@ -97,31 +98,32 @@ else:
     services_to_scan = {target_service: SERVICE_URLS[target_service]}
     print(f"Escaneando servicio: {target_service}")
 
-all_alerts = []
-for service_name, service_url in services_to_scan.items():
-    print(f"\n{'='*60}")
-    print(f"Escaneando: {service_name} ({service_url})")
-    print(f"{'='*60}")
-    
-    known_endpoints = API_ENDPOINTS.get(service_name, [])
-    if known_endpoints:
-        print(f"Endpoints conocidos: {len(known_endpoints)}")
-    
-    results = zap.scan_url(service_url, scan_type, known_endpoints)
-    all_alerts.extend(results.get("alerts", []))
-
-alerts = all_alerts
+# Solo se escanean los endpoints nuevos o modificados (ZAP_SCAN_CACHE=0 para escanear todo)
+cache = ScanCache() if ZAP_SCAN_CACHE else None
+
+# Los servicios se escanean a la vez (ZAP_MAX_CONCURRENT_SCANS escaneos en curso) y
+# sus alertas se escriben una a una en el reporte (sin repetidas); solo se guardan los conteos
+alerts_report = "${REPORT_PREFIX}_alerts.json"
+with AlertsReport(alerts_report) as report:
+    scan_results = zap.scan_services(services_to_scan, scan_type, API_ENDPOINTS, cache=cache, report=report)
+counts = report.counts
+if cache is not None:
+    cache.save()
+    cached = [name for name, results in scan_results.items() if results.get("status") == "cached"]
+    if cached:
+        print(f"Servicios sin cambios (alertas de la caché): {', '.join(cached)}")
+        print("  Los reportes HTML/JSON de ZAP no los incluyen; sus alertas están en el reporte de alertas")
+
+incomplete = [name for name, results in scan_results.items() if results.get("error")]
+high_count = counts.get("High", 0) + counts.get("Critical", 0)
+
 print(f"\n{'='*60}")
-print(f"Resumen de alertas encontradas: {len(alerts)}")
+print(f"Resumen de alertas encontradas: {sum(counts.values())}")
 print(f"{'='*60}")
 
-high_alerts = [a for a in alerts if a.get("risk") in ["High", "Critical"]]
-medium_alerts = [a for a in alerts if a.get("risk") == "Medium"]
-low_alerts = [a for a in alerts if a.get("risk") == "Low"]
-
-print(f"  - High/Critical: {len(high_alerts)}")
-print(f"  - Medium: {len(medium_alerts)}")
-print(f"  - Low: {len(low_alerts)}")
+print(f"  - High/Critical: {high_count}")
+print(f"  - Medium: {counts.get('Medium', 0)}")
+print(f"  - Low: {counts.get('Low', 0)}")
 
 html_report = "${REPORT_PREFIX}.html"
 json_report = "${REPORT_PREFIX}.json"
@@ -132,13 +134,13 @@ if zap.generate_report(html_report, "HTML"):
 if zap.generate_report(json_report, "JSON"):
     print(f"Reporte JSON generado: {json_report}")
 
-with open("${REPORT_PREFIX}_alerts.json", "w") as f:
-    json.dump(alerts, f, indent=2)
-
-print(f"\nAlertas guardadas en: ${REPORT_PREFIX}_alerts.json")
+print(f"\nAlertas guardadas en: {alerts_report}")
 
-if high_alerts:
+if incomplete:
+    print(f"\n⚠️  Reporte incompleto: falló la lectura de alertas de {', '.join(incomplete)}")
+if high_count:
     print("\n⚠️  Se encontraron alertas de alta prioridad!")
+if incomplete or high_count:
     sys.exit(1)
 else:
     print("\n✓ Escaneo completado")
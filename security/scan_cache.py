@@ -0,0 +1,237 @@
+"""
+Caché de escaneos por huella de endpoint, para escanear solo lo que cambió.
+
+La huella de un endpoint de API_ENDPOINTS combina su plantilla de URL, el método
+y un hash de la forma de su respuesta (status, cabeceras relevantes para
+seguridad y esquema del JSON, sin los valores), obtenida con una petición
+directa al servicio, sin pasar por ZAP. Para cada huella se guardan las alertas
+del último escaneo:
+- endpoints con la misma huella (y entrada no caducada): se reutilizan sus
+  alertas y no se escanean
+- endpoints nuevos, modificados o que no respondieron: se escanean y se
+  actualiza su entrada
+Si ningún endpoint de un servicio cambió, el servicio no se escanea. Las
+alertas de URLs fuera de los endpoints conocidos se guardan por servicio, con
+la combinación de todas sus huellas.
+
+Configuración por entorno:
+- ZAP_SCAN_CACHE: 0 para escanear siempre todo (default: 1)
+- ZAP_SCAN_CACHE_PATH: archivo de la caché (default: reports/security/scan_cache.json)
+- ZAP_SCAN_CACHE_MAX_AGE_DAYS: antigüedad máxima de una entrada; pasado ese
+  tiempo el endpoint se vuelve a escanear aunque no cambie, para aplicar las
+  reglas nuevas de ZAP (default: 7)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import requests
+
+
+ZAP_SCAN_CACHE = os.getenv("ZAP_SCAN_CACHE", "1").lower() not in ("0", "false", "no")
+ZAP_SCAN_CACHE_PATH = os.getenv("ZAP_SCAN_CACHE_PATH", "reports/security/scan_cache.json")
+ZAP_SCAN_CACHE_MAX_AGE_DAYS = float(os.getenv("ZAP_SCAN_CACHE_MAX_AGE_DAYS", "7"))
+
+CACHE_VERSION = 1
+FINGERPRINT_TIMEOUT = 10
+
+# Cabeceras cuyo valor afecta a las alertas de ZAP
+_SECURITY_HEADERS = (
+    "access-control-allow-credentials",
+    "access-control-allow-origin",
+    "cache-control",
+    "content-security-policy",
+    "content-type",
+    "server",
+    "strict-transport-security",
+    "x-content-type-options",
+    "x-frame-options",
+    "x-powered-by",
+    "x-xss-protection",
+)
+# Elementos de una lista que se miran para su esquema
+_LIST_SAMPLE = 5
+
+
+def _shape(value: Any) -> Any:
+    """Esquema de un valor JSON: claves y tipos, sin valores."""
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in sorted(value.items())}
+    if isinstance(value, list):
+        shapes = {json.dumps(_shape(item), sort_keys=True) for item in value[:_LIST_SAMPLE]}
+        return sorted(shapes)
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if value is None:
+        return "null"
+    return "string"
+
+
+def response_signature(response: requests.Response) -> Dict[str, Any]:
+    """Forma de una respuesta: status, cabeceras de seguridad y esquema del cuerpo."""
+    headers = {name: response.headers[name] for name in _SECURITY_HEADERS if name in response.headers}
+    cookies = sorted(cookie.name for cookie in response.cookies)
+    try:
+        schema = _shape(response.json())
+    except ValueError:
+        schema = None
+    return {"status": response.status_code, "headers": headers, "cookies": cookies, "schema": schema}
+
+
+def fingerprint_endpoint(session: requests.Session, base_url: str, template: str, method: str = "GET") -> Optional[str]:
+    """Huella de un endpoint (None si no responde: se escanea siempre)."""
+    try:
+        response = session.request(method, f"{base_url.rstrip('/')}{template}", timeout=FINGERPRINT_TIMEOUT)
+    except requests.exceptions.RequestException:
+        return None
+    payload = {"method": method, "template": template, "response": response_signature(response)}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def url_matches(url: str, prefix: str) -> bool:
+    """La URL es el endpoint `prefix` o cuelga de él."""
+    return url.startswith(prefix) and url[len(prefix):len(prefix) + 1] in ("", "/", "?")
+
+
+@dataclass
+class ScanPlan:
+    """Qué escanear de un servicio y qué reutilizar."""
+    service: str
+    base_url: str
+    scan_type: str
+    fingerprints: Dict[str, Optional[str]]
+    changed: List[str] = field(default_factory=list)
+    cached: Dict[str, List[Dict]] = field(default_factory=dict)
+    # Alertas de URLs fuera de los endpoints (solo si no cambió nada)
+    other: Optional[List[Dict]] = None
+
+    @property
+    def service_fingerprint(self) -> Optional[str]:
+        if any(fp is None for fp in self.fingerprints.values()):
+            return None
+        combined = json.dumps(sorted(self.fingerprints.items()))
+        return hashlib.sha256(combined.encode("utf-8")).hexdigest()
+
+    def is_cached(self, url: str) -> bool:
+        """La URL pertenece a un endpoint cuyas alertas se reutilizan."""
+        base = self.base_url.rstrip('/')
+        return any(url_matches(url, f"{base}{endpoint}") for endpoint in self.cached)
+
+    def cached_alerts(self) -> List[Dict]:
+        alerts = [alert for endpoint_alerts in self.cached.values() for alert in endpoint_alerts]
+        return alerts + (self.other or [])
+
+
+class ScanCache:
+    """Alertas del último escaneo por huella de endpoint, en un archivo JSON."""
+
+    def __init__(self, path: str = ZAP_SCAN_CACHE_PATH, max_age_days: float = ZAP_SCAN_CACHE_MAX_AGE_DAYS):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data.get("entries", {})
+
+    @staticmethod
+    def _key(scan_type: str, base_url: str, endpoint: str, method: str = "GET") -> str:
+        return f"{scan_type} {method} {base_url.rstrip('/')}{endpoint}"
+
+    def _lookup(self, key: str, fingerprint: Optional[str]) -> Optional[List[Dict]]:
+        entry = self.entries.get(key)
+        if fingerprint is None or entry is None or entry["fingerprint"] != fingerprint:
+            return None
+        if time.time() - entry["scanned_at"] > self.max_age:
+            return None
+        return entry["alerts"]
+
+    def plan(self, service: str, base_url: str, endpoints: List[str], scan_type: str = "both") -> ScanPlan:
+        """Huellas actuales de los endpoints y alertas reutilizables."""
+        fingerprints = {endpoint: fingerprint_endpoint(self._session, base_url, endpoint) for endpoint in endpoints}
+        plan = ScanPlan(service, base_url, scan_type, fingerprints)
+        with self._lock:
+            for endpoint, fingerprint in fingerprints.items():
+                alerts = self._lookup(self._key(scan_type, base_url, endpoint), fingerprint)
+                if alerts is None:
+                    plan.changed.append(endpoint)
+                else:
+                    plan.cached[endpoint] = alerts
+            if not plan.changed:
+                plan.other = self._lookup(self._key(scan_type, base_url, " *"), plan.service_fingerprint)
+                if plan.other is None:
+                    # Sin las alertas del resto del servicio no se puede saltar el escaneo
+                    plan.changed = list(endpoints)
+                    plan.cached = {}
+        return plan
+
+    def recorder(self, plan: ScanPlan) -> "ScanRecord":
+        """Acumulador de las alertas del escaneo de un plan."""
+        return ScanRecord(self, plan)
+
+    def _store(self, plan: ScanPlan, by_endpoint: Dict[str, List[Dict]], other: List[Dict]) -> None:
+        base = plan.base_url.rstrip('/')
+        now = time.time()
+        with self._lock:
+            for endpoint, endpoint_alerts in by_endpoint.items():
+                fingerprint = plan.fingerprints.get(endpoint)
+                if fingerprint is not None:
+                    self.entries[self._key(plan.scan_type, base, endpoint)] = {
+                        "fingerprint": fingerprint, "scanned_at": now, "alerts": endpoint_alerts
+                    }
+            if plan.service_fingerprint is not None:
+                self.entries[self._key(plan.scan_type, base, " *")] = {
+                    "fingerprint": plan.service_fingerprint, "scanned_at": now, "alerts": other
+                }
+
+    def save(self) -> None:
+        """Escribir la caché de forma atómica."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with self._lock, open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+
+class ScanRecord:
+    """
+    Alertas de un escaneo clasificadas según llegan: por endpoint modificado o
+    fuera de los endpoints conocidos. Las de endpoints sin cambios se descartan
+    (valen las de la caché). La caché solo se actualiza con commit().
+    """
+
+    def __init__(self, cache: ScanCache, plan: ScanPlan):
+        self.cache = cache
+        self.plan = plan
+        self._base = plan.base_url.rstrip('/')
+        # Plantillas más largas primero: cada alerta va a su endpoint más específico
+        self._templates = sorted(plan.fingerprints, key=len, reverse=True)
+        self.by_endpoint: Dict[str, List[Dict]] = {endpoint: [] for endpoint in plan.changed}
+        self.other: List[Dict] = []
+
+    def add(self, alert: Dict) -> bool:
+        """Clasificar una alerta (False si es de un endpoint sin cambios)."""
+        url = alert.get("url", "")
+        endpoint = next((t for t in self._templates if url_matches(url, f"{self._base}{t}")), None)
+        if endpoint is None:
+            self.other.append(alert)
+        elif endpoint in self.by_endpoint:
+            self.by_endpoint[endpoint].append(alert)
+        else:
+            return False
+        return True
+
+    def commit(self) -> None:
+        """Guardar las alertas de los endpoints escaneados."""
+        self.cache._store(self.plan, self.by_endpoint, self.other)
@@ -0,0 +1,365 @@
+"""
+Planificador de escaneos de ZAP para varios servicios a la vez.
+
+Cada servicio recorre su flujo (inyección de endpoints conocidos, spider, active
+scans y alertas) en su propio hilo, sin pausas fijas: entre fases se espera a
+que ZAP vacíe la cola del escáner pasivo, y todos comparten:
+- un límite de escaneos en curso en ZAP (ZAP_MAX_CONCURRENT_SCANS), para no
+  repartir el pool de hilos de escaneo de ZAP entre más escaneos de la cuenta
+- el sondeador de progreso del scanner (ScanPoller), uno para todos los escaneos
+- un deadline por escaneo: al vencer, el escaneo se detiene en ZAP y libera
+  su hueco
+Con una ScanCache (security.scan_cache) solo se escanean los endpoints nuevos o
+modificados; el resto conserva las alertas de su último escaneo. La caché solo
+se actualiza si todos los escaneos del servicio terminaron y se leyeron todas
+sus alertas; si no, se conservan las entradas anteriores. Con un
+AlertsReport las alertas se escriben en él según se leen de ZAP, sin acumular
+las de todos los servicios en memoria.
+
+Configuración por entorno:
+- ZAP_MAX_CONCURRENT_SCANS: escaneos simultáneos; por defecto ZAP_SCAN_THREADS
+  entre los hilos por host que usa cada active scan en ZAP
+- ZAP_SCAN_THREADS: hilos de escaneo a repartir (default: 20)
+- ZAP_SPIDER_TIMEOUT: deadline de cada spider en segundos (default: 300)
+- ZAP_ACTIVE_SCAN_TIMEOUT: deadline de cada active scan en segundos (default: 600)
+- ZAP_MAX_ACTIVE_SCANS_PER_TARGET: URLs con active scan por servicio (default: 20)
+- ZAP_POLL_MIN_INTERVAL / ZAP_POLL_MAX_INTERVAL: límites del intervalo de
+  sondeo en segundos (default: 0.25 / 1.0)
+- ZAP_POLL_MAX_ERRORS: rondas de sondeo fallidas seguidas antes de dar los
+  escaneos por fallidos (default: 5)
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+ZAP_MAX_CONCURRENT_SCANS = int(os.getenv("ZAP_MAX_CONCURRENT_SCANS", "0"))
+ZAP_SCAN_THREADS = int(os.getenv("ZAP_SCAN_THREADS", "20"))
+ZAP_SPIDER_TIMEOUT = float(os.getenv("ZAP_SPIDER_TIMEOUT", "300"))
+ZAP_ACTIVE_SCAN_TIMEOUT = float(os.getenv("ZAP_ACTIVE_SCAN_TIMEOUT", "600"))
+ZAP_MAX_ACTIVE_SCANS_PER_TARGET = int(os.getenv("ZAP_MAX_ACTIVE_SCANS_PER_TARGET", "20"))
+
+ZAP_POLL_MIN_INTERVAL = float(os.getenv("ZAP_POLL_MIN_INTERVAL", "0.25"))
+ZAP_POLL_MAX_INTERVAL = float(os.getenv("ZAP_POLL_MAX_INTERVAL", "1.0"))
+ZAP_POLL_MAX_ERRORS = int(os.getenv("ZAP_POLL_MAX_ERRORS", "5"))
+
+
+@dataclass
+class Scan:
+    """Escaneo en curso en ZAP."""
+    scan_type: str
+    scan_id: str
+    target: str
+    deadline: float
+    # Al vencer el deadline, detener el escaneo en ZAP
+    stop_on_timeout: bool = True
+    progress: int = 0
+    # Progreso por segundo (media móvil), para estimar cuánto falta
+    rate: Optional[float] = None
+    polled_at: float = field(default_factory=time.monotonic)
+    timed_out: bool = False
+    error: Optional[str] = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def completed(self) -> bool:
+        return self.done.is_set() and not self.timed_out and self.error is None
+
+    def eta(self) -> Optional[float]:
+        """Segundos estimados hasta el 100% (None si aún no hay ritmo)."""
+        return (100 - self.progress) / self.rate if self.rate else None
+
+
+class ScanPoller:
+    """
+    Un hilo que sondea todos los escaneos registrados.
+
+    Cada ronda pide las vistas `scans` de spider y ascan (una petición por tipo,
+    no una por escaneo) a través de la sesión del scanner. El intervalo se adapta
+    al ritmo de progreso: la mitad del tiempo estimado para que termine el
+    escaneo más próximo, entre ZAP_POLL_MIN_INTERVAL y ZAP_POLL_MAX_INTERVAL, de
+    modo que el final se detecta en menos de ZAP_POLL_MAX_INTERVAL. Los errores
+    de la API se reintentan con backoff; los escaneos solo se dan por fallidos
+    tras ZAP_POLL_MAX_ERRORS rondas fallidas seguidas.
+    """
+
+    def __init__(self, scanner, min_interval: float = ZAP_POLL_MIN_INTERVAL, max_interval: float = ZAP_POLL_MAX_INTERVAL):
+        self.scanner = scanner
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.requests = 0
+        self._scans: Dict[Tuple[str, str], Scan] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, scan: Scan) -> Scan:
+        """Registrar un escaneo; `scan.done` se activa al terminar o vencer."""
+        with self._lock:
+            self._scans[(scan.scan_type, scan.scan_id)] = scan
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="zap-scan-poller", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return scan
+
+    def wait(self, scan: Scan) -> Scan:
+        """Registrar un escaneo y esperar a que termine o venza."""
+        self.track(scan).done.wait()
+        return scan
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _finish(self, scan: Scan) -> None:
+        with self._lock:
+            self._scans.pop((scan.scan_type, scan.scan_id), None)
+        scan.done.set()
+
+    def _run(self) -> None:
+        errors = 0
+        while not self._stop.is_set():
+            with self._lock:
+                scans = list(self._scans.values())
+            if not scans:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            try:
+                views = {}
+                for scan_type in {scan.scan_type for scan in scans}:
+                    self.requests += 1
+                    views[scan_type] = self.scanner.scan_progress(scan_type)
+                errors = 0
+            except Exception as e:
+                errors += 1
+                self._expire(scans)
+                if errors >= ZAP_POLL_MAX_ERRORS:
+                    print(f"Error al sondear los escaneos ({errors} seguidos), se dan por fallidos: {e}")
+                    for scan in scans:
+                        scan.error = str(e)
+                        self._finish(scan)
+                    errors = 0
+                    continue
+                print(f"Error al sondear los escaneos (intento {errors}/{ZAP_POLL_MAX_ERRORS}): {e}")
+                self._stop.wait(min(self.max_interval * 2 ** errors, 30))
+                continue
+
+            now = time.monotonic()
+            for scan in scans:
+                self._update(scan, views[scan.scan_type].get(scan.scan_id), now)
+            self._expire(scans)
+            self._stop.wait(self._next_interval(scans, now))
+
+    def _update(self, scan: Scan, status: Optional[Tuple[int, str]], now: float) -> None:
+        if status is None:
+            scan.error = f"ZAP no conoce el {scan.scan_type} scan {scan.scan_id}"
+            self._finish(scan)
+            return
+        progress, state = status
+        if progress > scan.progress and now > scan.polled_at:
+            rate = (progress - scan.progress) / (now - scan.polled_at)
+            scan.rate = rate if scan.rate is None else (scan.rate + rate) / 2
+        scan.progress = progress
+        scan.polled_at = now
+        if progress >= 100 or state == "FINISHED":
+            self._finish(scan)
+
+    def _expire(self, scans: List[Scan]) -> None:
+        now = time.monotonic()
+        for scan in scans:
+            if not scan.done.is_set() and now > scan.deadline:
+                scan.timed_out = True
+                if scan.stop_on_timeout:
+                    self.scanner.stop_scan(scan.scan_type, scan.scan_id)
+                self._finish(scan)
+
+    def _next_interval(self, scans: List[Scan], now: float) -> float:
+        pending = [scan for scan in scans if not scan.done.is_set()]
+        waits = [scan.eta() / 2 for scan in pending if scan.eta() is not None]
+        waits += [scan.deadline - now for scan in pending]
+        if not waits:
+            return self.min_interval
+        return min(max(min(waits), self.min_interval), self.max_interval)
+
+
+class ScanScheduler:
+    """Escaneo concurrente de varios servicios con un límite de escaneos en ZAP."""
+
+    def __init__(self, scanner, max_concurrent: Optional[int] = None, cache=None, report=None):
+        self.scanner = scanner
+        # ScanCache opcional: solo se escanean los endpoints nuevos o modificados
+        self.cache = cache
+        # AlertsReport opcional: destino de las alertas (si no, la lista "alerts" de cada resultado)
+        self.report = report
+        self.max_concurrent = max_concurrent or ZAP_MAX_CONCURRENT_SCANS or self._slots_from_zap()
+        # Cada hilo de este pool ocupa un hueco mientras su escaneo sigue en ZAP
+        self._scans = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="zap-scan")
+
+    def _slots_from_zap(self) -> int:
+        """Escaneos que caben en ZAP_SCAN_THREADS según los hilos por host de ZAP."""
+        try:
+            result = self.scanner._request("/JSON/ascan/view/optionThreadPerHost/")
+            threads_per_scan = int(result.get("ThreadPerHost", 2))
+        except Exception:
+            threads_per_scan = 2
+        return max(1, ZAP_SCAN_THREADS // max(threads_per_scan, 1))
+
+    def _scan(self, scan_type: str, target: str, start: Callable[[], Optional[str]], timeout: float) -> Optional[Scan]:
+        scan_id = start()
+        if not scan_id:
+            return None
+        return self.scanner.poller.wait(Scan(scan_type, scan_id, target, time.monotonic() + timeout))
+
+    def submit(self, scan_type: str, target: str, start: Callable[[], Optional[str]], timeout: float) -> "Future[Optional[Scan]]":
+        """Encolar un escaneo: `start` lo lanza en ZAP cuando hay hueco y devuelve su ID."""
+        return self._scans.submit(self._scan, scan_type, target, start, timeout)
+
+    def scan_target(self, name: str, target_url: str, scan_type: str = "both", known_endpoints: Optional[List[str]] = None) -> Dict:
+        """Flujo completo de un servicio (spider + active scans + alertas)."""
+        results = {
+            "url": target_url,
+            "spider_scan": None,
+            "active_scan": None,
+            "alerts": [],
+            "alert_count": 0,
+            "status": "failed"
+        }
+
+        def log(message: str) -> None:
+            print(f"[{name}] {message}")
+
+        def emit(alert: Dict) -> None:
+            if self.report is None:
+                results["alerts"].append(alert)
+            elif not self.report.write(alert):
+                return
+            results["alert_count"] += 1
+
+        plan = None
+        if self.cache is not None and known_endpoints:
+            plan = self.cache.plan(name, target_url, known_endpoints, scan_type)
+            for alert in plan.cached_alerts():
+                emit(alert)
+            if not plan.changed:
+                results["status"] = "cached"
+                log(f"Sin cambios en {len(known_endpoints)} endpoints: {results['alert_count']} alertas de la caché")
+                return results
+            if plan.cached:
+                log(f"Endpoints sin cambios: {len(plan.cached)}; a escanear: {', '.join(plan.changed)}")
+            known_endpoints = plan.changed
+
+        # Algún escaneo sin terminar: sus alertas no son fiables para la caché
+        incomplete: List[str] = []
+
+        # Inyectar endpoints conocidos antes del spider scan
+        if known_endpoints:
+            full_urls = [f"{target_url.rstrip('/')}{endpoint}" for endpoint in known_endpoints]
+            injected = self.scanner.inject_urls(full_urls)
+            log(f"Inyectados {injected} de {len(known_endpoints)} endpoints conocidos en ZAP")
+            if not self.scanner.wait_for_passive_scan():
+                incomplete.append("passive scan")
+
+        if scan_type in ["spider", "both"]:
+            log("Iniciando spider scan...")
+            scan = self.submit(
+                "spider", target_url,
+                lambda: self.scanner.spider_scan(target_url, max_children=100),
+                ZAP_SPIDER_TIMEOUT
+            ).result()
+            if scan:
+                results["spider_scan"] = scan.scan_id
+                if scan.completed:
+                    log("Spider scan completado")
+                    try:
+                        spider_results = self.scanner._request("/JSON/spider/view/results/", {"scanId": scan.scan_id})
+                        self.scanner.inject_urls(spider_results.get("results", []))
+                    except Exception:
+                        incomplete.append("resultados del spider")
+                    if not self.scanner.wait_for_passive_scan():
+                        incomplete.append("passive scan")
+                else:
+                    incomplete.append("spider scan")
+                    log(f"Spider scan timeout ({scan.error or f'{scan.progress}%'})")
+            else:
+                incomplete.append("spider scan")
+
+        if scan_type in ["active", "both"]:
+            urls_to_scan = self.scanner.known_urls(target_url) or [target_url]
+            if plan is not None:
+                urls_to_scan = [url for url in urls_to_scan if not plan.is_cached(url)]
+            urls_to_scan = urls_to_scan[:ZAP_MAX_ACTIVE_SCANS_PER_TARGET]
+            log(f"Encolando active scan de {len(urls_to_scan)} URLs...")
+
+            futures = [
+                self.submit("active", url, lambda url=url: self.scanner.start_active_scan(url), ZAP_ACTIVE_SCAN_TIMEOUT)
+                for url in urls_to_scan
+            ]
+            scans = [scan for scan in (future.result() for future in futures) if scan]
+            if scans:
+                results["active_scan"] = scans[0].scan_id
+                completed = sum(1 for scan in scans if scan.completed)
+                log(f"Active scans completados: {completed}/{len(scans)}")
+                if completed < len(urls_to_scan):
+                    incomplete.append("active scan")
+            elif urls_to_scan:
+                incomplete.append("active scan")
+                log("Advertencia: No se pudo iniciar active scan")
+
+        # Las alertas pasivas aparecen cuando ZAP termina de procesar su cola
+        if not self.scanner.wait_for_passive_scan():
+            incomplete.append("passive scan")
+        record = self.cache.recorder(plan) if plan is not None else None
+        try:
+            for alert in self.scanner.iter_alerts(target_url):
+                if record is None or record.add(alert):
+                    emit(alert)
+        except Exception as e:
+            results["error"] = str(e)
+            log(f"Alertas incompletas ({results['alert_count']} leídas): {e}")
+            return results
+        if record is not None:
+            if incomplete:
+                log(f"Caché sin actualizar por escaneos incompletos: {', '.join(sorted(set(incomplete)))}")
+            else:
+                record.commit()
+        results["status"] = "completed"
+        log(f"Escaneo terminado: {results['alert_count']} alertas")
+        return results
+
+    def run(self, targets: Dict[str, str], scan_type: str = "both",
+            endpoints: Optional[Dict[str, List[str]]] = None) -> Dict[str, Dict]:
+        """
+        Escanear varios servicios a la vez.
+
+        Args:
+            targets: Nombre del servicio -> URL base
+            scan_type: spider, active o both
+            endpoints: Nombre del servicio -> endpoints conocidos a inyectar
+
+        Returns:
+            Nombre del servicio -> resultados de scan_target
+        """
+        endpoints = endpoints or {}
+        print(f"Escaneando {len(targets)} servicios con hasta {self.max_concurrent} escaneos simultáneos en ZAP")
+        if scan_type in ["active", "both"]:
+            self.scanner.configure_scan_policy()
+        try:
+            with ThreadPoolExecutor(max_workers=max(len(targets), 1), thread_name_prefix="zap-target") as pipelines:
+                futures = {
+                    name: pipelines.submit(self.scan_target, name, url, scan_type, endpoints.get(name, []))
+                    for name, url in targets.items()
+                }
+                return {name: future.result() for name, future in futures.items()}
+        finally:
+            self._scans.shutdown(wait=False, cancel_futures=True)
@@ -71,6 +71,18 @@ AUTH_CONTEXTS = {
 # Reglas de ZAP a desactivar (si causan falsos positivos)
 DISABLED_RULES = []
 
+# Conexiones HTTP simultáneas a la API de ZAP (hilos del scheduler + poller)
+ZAP_HTTP_POOL_MAXSIZE = int(os.getenv("ZAP_HTTP_POOL_MAXSIZE", "32"))
+
+# Inyección de URLs a través del proxy de ZAP
+ZAP_INJECT_WORKERS = int(os.getenv("ZAP_INJECT_WORKERS", "16"))
+ZAP_INJECT_TIMEOUT = float(os.getenv("ZAP_INJECT_TIMEOUT", "5"))
+# Espera máxima a que ZAP vacíe la cola del escáner pasivo (segundos)
+ZAP_PSCAN_TIMEOUT = float(os.getenv("ZAP_PSCAN_TIMEOUT", "60"))
+
+# Alertas por página al consultarlas a ZAP
+ZAP_ALERTS_PAGE_SIZE = int(os.getenv("ZAP_ALERTS_PAGE_SIZE", "500"))
+
 # Nivel de alerta mínimo a reportar
 MIN_ALERT_LEVEL = "Low"  # Low, Medium, High, Informational
 
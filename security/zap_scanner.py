@@ -3,10 +3,62 @@ Scanner de seguridad usando OWASP ZAP API.
 """
 import time
 import json
+import textwrap
+import threading
 import requests
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
-from security.zap_config import SERVICE_URLS, API_ENDPOINTS, AUTH_CONTEXTS, MIN_ALERT_LEVEL
+from security.zap_config import (
+    SERVICE_URLS, API_ENDPOINTS, AUTH_CONTEXTS, MIN_ALERT_LEVEL, ZAP_HTTP_POOL_MAXSIZE,
+    ZAP_INJECT_WORKERS, ZAP_INJECT_TIMEOUT, ZAP_PSCAN_TIMEOUT, ZAP_ALERTS_PAGE_SIZE
+)
+from security.scan_cache import ScanCache
+from security.scan_scheduler import Scan, ScanPoller, ScanScheduler
+
+
+def alert_key(alert: Dict) -> Tuple[str, str, str]:
+    """Identidad de una alerta: regla, URL y parámetro."""
+    return alert.get("pluginId", ""), alert.get("url", ""), alert.get("param", "")
+
+
+class AlertsReport:
+    """
+    Array JSON de alertas que se escribe a medida que llegan, sin repetidas.
+    
+    Solo se guardan las claves de las alertas escritas y los conteos por nivel
+    de riesgo. Lo comparten los hilos de los servicios que se escanean a la vez.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.counts: Dict[str, int] = {}
+        self._seen: Set[Tuple[str, str, str]] = set()
+        self._lock = threading.Lock()
+        self._file = None
+    
+    def __enter__(self) -> "AlertsReport":
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write("[")
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._file.write("\n]" if self._seen else "]")
+        self._file.close()
+    
+    def write(self, alert: Dict) -> bool:
+        """Añadir una alerta (False si ya estaba en el reporte)."""
+        key = alert_key(alert)
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._file.write(",\n" if self._seen else "\n")
+            self._seen.add(key)
+            self._file.write(textwrap.indent(json.dumps(alert, indent=2), "  "))
+            risk = alert.get("risk", "")
+            self.counts[risk] = self.counts.get(risk, 0) + 1
+        return True
 
 
 class ZAPScanner:
@@ -24,6 +76,20 @@ class ZAPScanner:
         self.api_key = os.getenv("ZAP_API_KEY")
         self.session_id = None
         
+        # Sesión con pool para la API de ZAP (la comparten los hilos del scheduler)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=ZAP_HTTP_POOL_MAXSIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Sesión keep-alive a través del proxy de ZAP para inyectar URLs
+        self.proxy_session = requests.Session()
+        self.proxy_session.proxies = {"http": self.zap_url, "https": self.zap_url}
+        proxy_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=ZAP_INJECT_WORKERS)
+        self.proxy_session.mount("http://", proxy_adapter)
+        self.proxy_session.mount("https://", proxy_adapter)
+        # Sondeador único de los escaneos en curso
+        self.poller = ScanPoller(self)
+        
     def _request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """Hacer petición a la API de ZAP."""
         url = f"{self.zap_url}{endpoint}"
@@ -33,7 +99,7 @@ class ZAPScanner:
             params["apikey"] = self.api_key
         
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = self.session.get(url, params=params, timeout=30)
             response.raise_for_status()
             
             try:
@@ -52,7 +118,7 @@ class ZAPScanner:
             params["apikey"] = self.api_key
         
         try:
-            response = requests.post(url, params=params, json=data, timeout=30)
+            response = self.session.post(url, params=params, json=data, timeout=30)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -79,14 +145,51 @@ class ZAPScanner:
             print(f"Error al iniciar sesión: {e}")
             return False
     
-    def inject_urls(self, urls: List[str]) -> None:
-        """Inyectar URLs en ZAP haciendo requests a través del proxy."""
-        zap_proxy = f"http://127.0.0.1:{self.zap_port}"
-        for url in urls:
+    def inject_urls(self, urls: List[str]) -> int:
+        """
+        Inyectar URLs en ZAP haciendo requests a través del proxy.
+        
+        Las peticiones se envían en paralelo (ZAP_INJECT_WORKERS) por conexiones
+        keep-alive al proxy; se omiten las URLs repetidas y las que ZAP ya conoce.
+        Retorna el número de URLs enviadas.
+        """
+        known = self._zap_urls()
+        pending = [url for url in dict.fromkeys(urls) if url not in known]
+        if not pending:
+            return 0
+        
+        def send(url: str) -> None:
             try:
-                requests.get(url, proxies={"http": zap_proxy, "https": zap_proxy}, timeout=5)
-            except:
+                self.proxy_session.get(url, timeout=ZAP_INJECT_TIMEOUT)
+            except requests.exceptions.RequestException:
                 pass
+        
+        with ThreadPoolExecutor(max_workers=min(ZAP_INJECT_WORKERS, len(pending)), thread_name_prefix="zap-inject") as pool:
+            list(pool.map(send, pending))
+        return len(pending)
+    
+    def _zap_urls(self) -> Set[str]:
+        """URLs que ZAP ya tiene en su árbol de sitios."""
+        try:
+            return set(self._request("/JSON/core/view/urls/").get("urls", []))
+        except Exception:
+            return set()
+    
+    def wait_for_passive_scan(self, timeout: float = ZAP_PSCAN_TIMEOUT) -> bool:
+        """Esperar a que ZAP vacíe la cola del escáner pasivo (recordsToScan = 0)."""
+        deadline = time.monotonic() + timeout
+        interval = 0.1
+        while True:
+            try:
+                result = self._request("/JSON/pscan/view/recordsToScan/")
+                if int(result.get("recordsToScan", 0)) == 0:
+                    return True
+            except Exception as e:
+                print(f"Error al consultar el escáner pasivo: {e}")
+            if time.monotonic() + interval > deadline:
+                return False
+            time.sleep(interval)
+            interval = min(interval * 2, 1.0)
     
     def spider_scan(self, target_url: str, max_children: int = 10) -> Optional[str]:
         """Iniciar escaneo spider (crawling)."""
@@ -128,24 +231,35 @@ class ZAPScanner:
                         scan_url = url
                         break
             
-            try:
-                policies = self._request("/JSON/ascan/view/policies/")
-                for policy in policies.get("policies", []):
-                    policy_id = policy.get("id")
-                    if policy_id:
-                        self._request("/JSON/ascan/action/setPolicyAttackStrength/", {
-                            "id": policy_id,
-                            "attackStrength": "HIGH"
-                        })
-                        self._request("/JSON/ascan/action/setPolicyAlertThreshold/", {
-                            "id": policy_id,
-                            "alertThreshold": "LOW"
-                        })
-            except:
-                pass
-            
+            self.configure_scan_policy()
+            return self.start_active_scan(scan_url)
+        except Exception as e:
+            print(f"Error al iniciar active scan: {e}")
+            return None
+    
+    def configure_scan_policy(self) -> None:
+        """Subir la intensidad de ataque y bajar el umbral de alerta de todas las políticas."""
+        try:
+            policies = self._request("/JSON/ascan/view/policies/")
+            for policy in policies.get("policies", []):
+                policy_id = policy.get("id")
+                if policy_id:
+                    self._request("/JSON/ascan/action/setPolicyAttackStrength/", {
+                        "id": policy_id,
+                        "attackStrength": "HIGH"
+                    })
+                    self._request("/JSON/ascan/action/setPolicyAlertThreshold/", {
+                        "id": policy_id,
+                        "alertThreshold": "LOW"
+                    })
+        except:
+            pass
+    
+    def start_active_scan(self, url: str) -> Optional[str]:
+        """Lanzar un active scan sobre una URL (sin configurar políticas)."""
+        try:
             result = self._request("/JSON/ascan/action/scan/", {
-                "url": scan_url,
+                "url": url,
                 "recurse": "True",
                 "inScopeOnly": "False"
             })
@@ -154,49 +268,83 @@ class ZAPScanner:
             print(f"Error al iniciar active scan: {e}")
             return None
     
-    def wait_for_scan(self, scan_id: str, scan_type: str = "spider", timeout: int = 300) -> bool:
-        """Esperar a que termine un escaneo."""
-        endpoint_map = {
-            "spider": "/JSON/spider/view/status/",
-            "active": "/JSON/ascan/view/status/"
+    def known_urls(self, target_url: str) -> List[str]:
+        """URLs que ZAP conoce bajo una URL base."""
+        try:
+            urls_result = self._request("/JSON/core/view/urls/")
+            return [url for url in urls_result.get("urls", []) if target_url.rstrip('/') in url]
+        except Exception:
+            return []
+    
+    def scan_status(self, scan_type: str, scan_id: str) -> int:
+        """Progreso (0-100) de un escaneo spider o active."""
+        endpoint = "/JSON/ascan/view/status/" if scan_type == "active" else "/JSON/spider/view/status/"
+        result = self._request(endpoint, {"scanId": scan_id})
+        return int(result.get("status", 100))
+    
+    def scan_progress(self, scan_type: str) -> Dict[str, Tuple[int, str]]:
+        """Progreso y estado de todos los escaneos de un tipo (una sola petición)."""
+        endpoint = "/JSON/ascan/view/scans/" if scan_type == "active" else "/JSON/spider/view/scans/"
+        result = self._request(endpoint)
+        return {
+            str(scan["id"]): (int(scan.get("progress", 0)), scan.get("state", ""))
+            for scan in result.get("scans", [])
         }
-        
-        endpoint = endpoint_map.get(scan_type, endpoint_map["spider"])
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            try:
-                result = self._request(endpoint, {"scanId": scan_id})
-                status = int(result.get("status", 100))
-                
-                if status == 100:
-                    return True
-                
-                time.sleep(2)
-            except Exception as e:
-                print(f"Error al verificar estado: {e}")
-                return False
-        
-        return False
     
-    def get_alerts(self, base_url: Optional[str] = None, risk_level: Optional[str] = None) -> List[Dict]:
-        """Obtener alertas de seguridad."""
-        params = {}
+    def stop_scan(self, scan_type: str, scan_id: str) -> None:
+        """Detener un escaneo en ZAP (libera sus hilos)."""
+        endpoint = "/JSON/ascan/action/stop/" if scan_type == "active" else "/JSON/spider/action/stop/"
+        try:
+            self._request(endpoint, {"scanId": scan_id})
+        except Exception as e:
+            print(f"Error al detener {scan_type} scan {scan_id}: {e}")
+    
+    def wait_for_scan(self, scan_id: str, scan_type: str = "spider", timeout: int = 300) -> bool:
+        """Esperar a que termine un escaneo (lo sondea el poller compartido)."""
+        scan = Scan(scan_type, scan_id, scan_id, time.monotonic() + timeout, stop_on_timeout=False)
+        return self.poller.wait(scan).completed
+    
+    def iter_alerts(
+        self,
+        base_url: Optional[str] = None,
+        risk_level: Optional[str] = None,
+        page_size: int = ZAP_ALERTS_PAGE_SIZE
+    ) -> Iterator[Dict]:
+        """
+        Recorrer las alertas de seguridad página a página.
+        
+        El filtro de riesgo lo aplica ZAP (riskId) y las alertas repetidas (mismo
+        pluginId, url y param) se devuelven una sola vez. Si falla una página se
+        lanza una excepción: las alertas recibidas hasta entonces están incompletas.
+        """
+        params = {"count": page_size}
         if base_url:
             params["baseurl"] = base_url
         if risk_level:
             params["riskId"] = self._risk_level_to_id(risk_level)
         
+        seen: Set[Tuple[str, str, str]] = set()
+        start = 0
+        while True:
+            try:
+                page = self._request("/JSON/core/view/alerts/", {**params, "start": start}).get("alerts", [])
+            except Exception as e:
+                raise Exception(f"Error al obtener alertas (a partir de la alerta {start}): {e}")
+            for alert in page:
+                key = alert_key(alert)
+                if key not in seen:
+                    seen.add(key)
+                    yield alert
+            if len(page) < page_size:
+                return
+            start += page_size
+    
+    def get_alerts(self, base_url: Optional[str] = None, risk_level: Optional[str] = None) -> List[Dict]:
+        """Obtener alertas de seguridad (paginadas y sin repetidas, ver iter_alerts)."""
         try:
-            result = self._request("/JSON/core/view/alerts/", params)
-            alerts = result.get("alerts", [])
-            
-            if risk_level:
-                alerts = [a for a in alerts if a.get("risk") == risk_level]
-            
-            return alerts
+            return list(self.iter_alerts(base_url, risk_level))
         except Exception as e:
-            print(f"Error al obtener alertas: {e}")
+            print(e)
             return []
     
     def _risk_level_to_id(self, risk_level: str) -> int:
@@ -219,7 +367,7 @@ class ZAPScanner:
                 if self.api_key:
                     params["apikey"] = self.api_key
                 
-                response = requests.get(url, params=params, timeout=60)
+                response = self.session.get(url, params=params, timeout=60)
                 response.raise_for_status()
                 with open(output_path, "w", encoding="utf-8") as f:
                     f.write(response.text)
@@ -235,7 +383,7 @@ class ZAPScanner:
                 if self.api_key:
                     params["apikey"] = self.api_key
                 
-                response = requests.get(url, params=params, timeout=60)
+                response = self.session.get(url, params=params, timeout=60)
                 response.raise_for_status()
                 with open(output_path, "w", encoding="utf-8") as f:
                     f.write(response.text)
@@ -249,96 +397,30 @@ class ZAPScanner:
     
     def scan_url(self, target_url: str, scan_type: str = "both", known_endpoints: Optional[List[str]] = None) -> Dict:
         """Escanear una URL completa (spider + active scan)."""
-        results = {
-            "url": target_url,
-            "spider_scan": None,
-            "active_scan": None,
-            "alerts": [],
-            "status": "failed"
-        }
-        
-        # Inyectar endpoints conocidos antes del spider scan
-        if known_endpoints:
-            print(f"Inyectando {len(known_endpoints)} endpoints conocidos en ZAP...")
-            full_urls = [f"{target_url.rstrip('/')}{endpoint}" for endpoint in known_endpoints]
-            self.inject_urls(full_urls)
-            time.sleep(2)
-        
-        spider_scan_id = None
-        if scan_type in ["spider", "both"]:
-            print(f"Iniciando spider scan para {target_url}...")
-            scan_id = self.spider_scan(target_url, max_children=100)
-            if scan_id:
-                results["spider_scan"] = scan_id
-                spider_scan_id = scan_id
-                if self.wait_for_scan(scan_id, "spider"):
-                    print(f"Spider scan completado para {target_url}")
-                    time.sleep(5)
-                    
-                    try:
-                        spider_results = self._request("/JSON/spider/view/results/", {
-                            "scanId": scan_id
-                        })
-                        urls = spider_results.get("results", [])
-                        for url in urls:
-                            try:
-                                self.inject_urls([url])
-                            except:
-                                pass
-                        time.sleep(3)
-                    except:
-                        pass
-                else:
-                    print(f"Spider scan timeout para {target_url}")
-        
-        if scan_type in ["active", "both"]:
-            print(f"Iniciando active scan para {target_url}...")
-            
-            urls_to_scan = []
-            try:
-                urls_result = self._request("/JSON/core/view/urls/")
-                all_urls = urls_result.get("urls", [])
-                urls_to_scan = [url for url in all_urls if target_url.rstrip('/') in url]
-            except:
-                pass
-            
-            if not urls_to_scan:
-                urls_to_scan = [target_url]
-            
-            print(f"Escaneando {len(urls_to_scan)} URLs...")
-            
-            scan_ids = []
-            for url in urls_to_scan[:20]:
-                try:
-                    scan_id = self.active_scan(url, spider_scan_id)
-                    if scan_id:
-                        scan_ids.append(scan_id)
-                except:
-                    pass
-            
-            if scan_ids:
-                results["active_scan"] = scan_ids[0]
-                print(f"Active scans iniciados: {len(scan_ids)}")
-                
-                for i, scan_id in enumerate(scan_ids):
-                    if self.wait_for_scan(scan_id, "active", timeout=600):
-                        print(f"Active scan {i+1}/{len(scan_ids)} completado")
-                    else:
-                        print(f"Active scan {i+1}/{len(scan_ids)} timeout")
-            else:
-                scan_id = self.active_scan(target_url, spider_scan_id)
-                if scan_id:
-                    results["active_scan"] = scan_id
-                    if self.wait_for_scan(scan_id, "active", timeout=600):
-                        print(f"Active scan completado para {target_url}")
-                    else:
-                        print(f"Active scan timeout para {target_url}")
-                else:
-                    print(f"Advertencia: No se pudo iniciar active scan para {target_url}")
+        return self.scan_services({target_url: target_url}, scan_type, {target_url: known_endpoints or []})[target_url]
+    
+    def scan_services(
+        self,
+        services: Dict[str, str],
+        scan_type: str = "both",
+        endpoints: Optional[Dict[str, List[str]]] = None,
+        max_concurrent: Optional[int] = None,
+        cache: Optional[ScanCache] = None,
+        report: Optional[AlertsReport] = None
+    ) -> Dict[str, Dict]:
+        """
+        Escanear varios servicios a la vez (ver security.scan_scheduler).
         
-        time.sleep(5)
-        results["alerts"] = self.get_alerts(target_url)
-        results["status"] = "completed"
+        Args:
+            services: Nombre del servicio -> URL base (ej: SERVICE_URLS)
+            scan_type: spider, active o both
+            endpoints: Nombre del servicio -> endpoints conocidos (ej: API_ENDPOINTS)
+            max_concurrent: Escaneos simultáneos en ZAP (default: ZAP_MAX_CONCURRENT_SCANS)
+            cache: Caché de escaneos por huella de endpoint (opcional, ver security.scan_cache)
+            report: Reporte al que se escriben las alertas según llegan; sin él
+                quedan en la lista "alerts" de los resultados
         
-        return results
-
+        Returns:
+            Nombre del servicio -> resultados del escaneo
+        """
+        return ScanScheduler(self, max_concurrent, cache, report).run(services, scan_type, endpoints)
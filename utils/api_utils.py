@@ -4,13 +4,21 @@ Utilidades para hacer peticiones HTTP en los tests.
 import os
 import time
 import requests
-from typing import Dict, Any, Optional
+from dataclasses import replace
+from typing import Callable, Dict, Any, List, Optional
 from utils.helpers import build_integration_url, SERVICE_CONTEXT_PATHS
+from utils.retry_policy import RetryPolicy, DEFAULT_RETRY_POLICY
+from utils import request_timing
+from utils.session_pool import get_session
 
 
 # Variable global para el servicio actual
 _current_service: Optional[str] = None
 
+# Observadores de cada llamada: (method, url, latency_ms, total_ms, attempts, status)
+RequestObserver = Callable[[str, str, float, float, int, Optional[int]], None]
+_request_observers: List[RequestObserver] = []
+
 
 def set_current_service(service_name: str) -> None:
     """Configurar el servicio actual para las pruebas."""
@@ -28,6 +36,118 @@ def _normalize_service_name(service_name: str) -> str:
     return service_name
 
 
+def add_request_observer(observer: RequestObserver) -> None:
+    """Registrar un observador de las llamadas de make_request / make_e2e_request."""
+    _request_observers.append(observer)
+
+
+def remove_request_observer(observer: RequestObserver) -> None:
+    """Quitar un observador registrado con add_request_observer."""
+    if observer in _request_observers:
+        _request_observers.remove(observer)
+
+
+def _notify(method: str, full_url: str, attempt_started: float, started_at: float, attempts: int, status: Optional[int]) -> None:
+    """Notificar la llamada: latencia del último intento y tiempo total con reintentos."""
+    now = time.monotonic()
+    for observer in _request_observers:
+        observer(method, full_url, (now - attempt_started) * 1000, (now - started_at) * 1000, attempts, status)
+
+
+def _send(
+    session: requests.Session,
+    method: str,
+    full_url: str,
+    headers: Dict[str, str],
+    data: Optional[Dict[str, Any]],
+    timeout: int,
+    stream: bool = False,
+    trace_id: Optional[str] = None,
+    resend_count: int = 0
+) -> requests.Response:
+    """
+    Enviar la petición usando la sesión compartida (conexiones keep-alive).
+
+    Con trace_id (REQUEST_TIMING activo) el intento se mide y se exporta como span.
+    """
+    if method in ("GET", "DELETE"):
+        body = {}
+    elif method in ("POST", "PUT", "PATCH"):
+        body = {"json": data}
+    else:
+        raise ValueError(f"Unsupported HTTP method: {method}")
+    if trace_id is not None:
+        return request_timing.timed_request(
+            session, method, full_url, trace_id, resend_count,
+            stream=stream, headers=headers, timeout=timeout, **body
+        )
+    return session.request(method, full_url, headers=headers, timeout=timeout, stream=stream, **body)
+
+
+def _request_with_retries(
+    session: requests.Session,
+    method: str,
+    full_url: str,
+    headers: Dict[str, str],
+    data: Optional[Dict[str, Any]],
+    timeout: int,
+    policy: RetryPolicy,
+    error_prefix: str = "",
+    stream: bool = False
+) -> requests.Response:
+    """
+    Enviar la petición reintentando según la política.
+
+    Se reintenta ante timeouts, errores de conexión y (si la política lo permite)
+    404 por consistencia eventual. Con deadline, el timeout de cada intento se
+    recorta al tiempo restante.
+    """
+    started_at = time.monotonic()
+    attempt = 0
+    # Los intentos de una llamada comparten trace id
+    trace_id = request_timing.new_trace_id() if request_timing.REQUEST_TIMING else None
+
+    while True:
+        attempt += 1
+        attempt_timeout = timeout
+        remaining = policy.remaining(started_at)
+        if remaining is not None:
+            attempt_timeout = max(min(timeout, remaining), 0.1)
+
+        attempt_started = time.monotonic()
+        try:
+            response = _send(session, method, full_url, headers, data, attempt_timeout, stream, trace_id, attempt - 1)
+
+            # Retry on 404 for dependency creation (eventual consistency)
+            if response.status_code == 404 and policy.retry_on_404:
+                delay = policy.delay(attempt)
+                if policy.can_retry(attempt, started_at, delay):
+                    # Devolver la conexión al pool antes de reintentar
+                    response.close()
+                    time.sleep(delay)
+                    continue
+
+            if _request_observers:
+                _notify(method, full_url, attempt_started, started_at, attempt, response.status_code)
+            return response
+        except requests.exceptions.Timeout:
+            delay = policy.delay(attempt)
+            if policy.can_retry(attempt, started_at, delay):
+                time.sleep(delay)
+                continue
+            if _request_observers:
+                _notify(method, full_url, attempt_started, started_at, attempt, None)
+            raise AssertionError(f"{error_prefix}Request timeout after {timeout}s: {method} {full_url}")
+        except requests.exceptions.ConnectionError as e:
+            delay = policy.delay(attempt)
+            if policy.can_retry(attempt, started_at, delay):
+                time.sleep(delay)
+                continue
+            if _request_observers:
+                _notify(method, full_url, attempt_started, started_at, attempt, None)
+            raise AssertionError(f"{error_prefix}Connection error to {full_url}: {str(e)}")
+
+
 def get_base_url(service_name: Optional[str] = None) -> str:
     """Obtener la URL base del servicio."""
     service_name = service_name or _current_service
@@ -68,7 +188,10 @@ def make_request(
     endpoint: str,
     data: Optional[Dict[str, Any]] = None,
     service_name: Optional[str] = None,
-    timeout: int = 30
+    timeout: int = 30,
+    expect_404: bool = False,
+    retry_policy: Optional[RetryPolicy] = None,
+    stream: bool = False
 ) -> requests.Response:
     """
     Hacer una petición HTTP simplificada.
@@ -79,6 +202,9 @@ def make_request(
         data: Datos para enviar en el body (opcional)
         service_name: Nombre del servicio (opcional, usa el actual si no se especifica)
         timeout: Timeout en segundos (default: 30)
+        expect_404: El test espera un 404, no reintentar (default: False)
+        retry_policy: Política de reintentos (default: DEFAULT_RETRY_POLICY)
+        stream: No descargar el cuerpo por adelantado (para CollectionStream)
 
     Returns:
         Response object de requests
@@ -105,42 +231,21 @@ def make_request(
 
     # Hacer la petición según el método con timeout y retry logic
     method = method.upper()
-    max_retries = 5
-    retry_delay = 0.8
+    session = get_session(base_url)
 
-    for attempt in range(max_retries):
-        try:
-            if method == "GET":
-                response = requests.get(full_url, headers=headers, timeout=timeout)
-            elif method == "POST":
-                response = requests.post(full_url, headers=headers, json=data, timeout=timeout)
-            elif method == "PUT":
-                response = requests.put(full_url, headers=headers, json=data, timeout=timeout)
-            elif method == "DELETE":
-                response = requests.delete(full_url, headers=headers, timeout=timeout)
-            elif method == "PATCH":
-                response = requests.patch(full_url, headers=headers, json=data, timeout=timeout)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+    policy = retry_policy or DEFAULT_RETRY_POLICY
+    if expect_404:
+        policy = replace(policy, retry_on_404=False)
 
-            # Retry on 404 for dependency creation (eventual consistency)
-            if response.status_code == 404 and attempt < max_retries - 1:
-                time.sleep(retry_delay)
-                continue
+    return _request_with_retries(session, method, full_url, headers, data, timeout, policy, stream=stream)
 
-            return response
-        except requests.exceptions.Timeout:
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-                continue
-            raise AssertionError(f"Request timeout after {timeout}s: {method} {full_url}")
-        except requests.exceptions.ConnectionError as e:
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-                continue
-            raise AssertionError(f"Connection error to {full_url}: {str(e)}")
 
-    return response
+def get_gateway_url() -> str:
+    """URL base del API Gateway (tests E2E)."""
+    # API Gateway está en el puerto 8080
+    # BASE_HOST can be set dynamically (e.g., LoadBalancer IP in CI/CD)
+    base_host = os.getenv("BASE_HOST", "localhost")
+    return f"http://{base_host}:8080"
 
 
 def make_e2e_request(
@@ -149,7 +254,10 @@ def make_e2e_request(
     data: Optional[Dict[str, Any]] = None,
     service_name: Optional[str] = None,
     jwt_token: Optional[str] = None,
-    timeout: int = 60
+    timeout: int = 60,
+    expect_404: bool = False,
+    retry_policy: Optional[RetryPolicy] = None,
+    stream: bool = False
 ) -> requests.Response:
     """
     Hacer una petición HTTP a través del API Gateway (para tests E2E).
@@ -161,14 +269,14 @@ def make_e2e_request(
         service_name: Nombre del servicio (ej: "user", "product", "order")
         jwt_token: Token JWT para autenticación (opcional)
         timeout: Timeout en segundos (default: 60)
+        expect_404: El test espera un 404, no reintentar (default: False)
+        retry_policy: Política de reintentos (default: DEFAULT_RETRY_POLICY)
+        stream: No descargar el cuerpo por adelantado (para CollectionStream)
 
     Returns:
         Response object de requests
     """
-    # API Gateway está en el puerto 8080
-    # BASE_HOST can be set dynamically (e.g., LoadBalancer IP in CI/CD)
-    base_host = os.getenv("BASE_HOST", "localhost")
-    base_url = f"http://{base_host}:8080"
+    base_url = get_gateway_url()
 
     # Si el endpoint ya tiene un prefijo (ej: "/app/"), usarlo directamente
     # Si no, construir endpoint con el prefijo del servicio
@@ -187,40 +295,112 @@ def make_e2e_request(
 
     # Hacer la petición según el método con timeout y retry logic
     method = method.upper()
-    max_retries = 5
-    retry_delay = 0.8
+    session = get_session(base_url)
 
-    for attempt in range(max_retries):
-        try:
-            if method == "GET":
-                response = requests.get(full_url, headers=headers, timeout=timeout)
-            elif method == "POST":
-                response = requests.post(full_url, headers=headers, json=data, timeout=timeout)
-            elif method == "PUT":
-                response = requests.put(full_url, headers=headers, json=data, timeout=timeout)
-            elif method == "DELETE":
-                response = requests.delete(full_url, headers=headers, timeout=timeout)
-            elif method == "PATCH":
-                response = requests.patch(full_url, headers=headers, json=data, timeout=timeout)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+    policy = retry_policy or DEFAULT_RETRY_POLICY
+    if expect_404:
+        policy = replace(policy, retry_on_404=False)
 
-            # Retry on 404 for dependency creation (eventual consistency)
-            if response.status_code == 404 and attempt < max_retries - 1:
-                time.sleep(retry_delay)
-                continue
+    return _request_with_retries(session, method, full_url, headers, data, timeout, policy, "E2E ", stream)
+
+
+
+# Latencias de propagación medidas por wait_until_visible
+_propagation_log: List[Dict[str, Any]] = []
 
-            return response
-        except requests.exceptions.Timeout:
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-                continue
-            raise AssertionError(f"E2E Request timeout after {timeout}s: {method} {full_url}")
-        except requests.exceptions.ConnectionError as e:
-            if attempt < max_retries - 1:
-                time.sleep(retry_delay)
-                continue
-            raise AssertionError(f"E2E Connection error to {full_url}: {str(e)}")
 
+def wait_until_visible(
+    service: str,
+    endpoint: str,
+    predicate: Optional[Callable[[requests.Response], bool]] = None,
+    timeout: float = 5.0,
+    jwt_token: Optional[str] = None,
+    initial_interval: float = 0.05,
+    max_interval: float = 0.5,
+    raise_on_timeout: bool = True
+) -> Optional[requests.Response]:
+    """
+    Esperar a que un recurso recién creado sea legible.
+
+    Sondea el endpoint con intervalos cortos y crecientes y retorna en cuanto el
+    predicado se cumple, en lugar de dormir un tiempo fijo. El tiempo medido se
+    registra en el log de propagación (ver get_propagation_latencies()).
+
+    Args:
+        service: Nombre del servicio (ej: "user-service" o "user")
+        endpoint: Endpoint relativo del recurso (ej: "/api/users/1")
+        predicate: Condición sobre la respuesta (default: status 200)
+        timeout: Tiempo máximo de espera en segundos (default: 5.0)
+        jwt_token: Si se indica, la petición pasa por el API Gateway (E2E)
+        initial_interval: Primer intervalo entre sondeos en segundos
+        max_interval: Intervalo máximo entre sondeos en segundos
+        raise_on_timeout: Fallar (AssertionError) si el predicado no se cumple a
+            tiempo; con False se retorna la última respuesta igualmente
+
+    Returns:
+        Última respuesta obtenida (cumple el predicado salvo timeout con raise_on_timeout=False)
+    """
+    if predicate is None:
+        predicate = lambda r: r.status_code == 200
+
+    started_at = time.monotonic()
+    interval = initial_interval
+    polls = 0
+    response = None
+    visible = False
+
+    while True:
+        polls += 1
+        if jwt_token is not None:
+            response = make_e2e_request("GET", endpoint, service_name=service, jwt_token=jwt_token, expect_404=True)
+        else:
+            response = make_request("GET", endpoint, service_name=service, expect_404=True)
+
+        try:
+            visible = bool(predicate(response))
+        except ValueError:
+            # Cuerpo no JSON todavía: el recurso no está listo
+            visible = False
+
+        elapsed = time.monotonic() - started_at
+        if visible or elapsed + interval > timeout:
+            break
+
+        time.sleep(interval)
+        interval = min(interval * 2, max_interval)
+
+    _propagation_log.append({
+        "service": service,
+        "endpoint": endpoint,
+        "elapsed": round(time.monotonic() - started_at, 4),
+        "polls": polls,
+        "visible": visible,
+    })
+    if not visible and raise_on_timeout:
+        status = response.status_code if response is not None else None
+        raise AssertionError(f"Resource not visible after {timeout}s ({polls} polls, last status {status}): {service} {endpoint}")
     return response
 
+
+def status_changed(previous: requests.Response) -> Callable[[requests.Response], bool]:
+    """
+    Predicado para wait_until_visible tras un cambio de estado (ej: PATCH .../status).
+
+    Se cumple cuando los campos de estado de primer nivel (los que contienen
+    "status" en el nombre, o el cuerpo entero si no hay ninguno) difieren de los
+    de `previous`, la respuesta previa al cambio.
+    """
+    def state(body: Any) -> Any:
+        if isinstance(body, dict):
+            fields = {key: value for key, value in body.items() if "status" in key.lower()}
+            if fields:
+                return fields
+        return body
+
+    before = state(previous.json())
+    return lambda r: r.status_code == 200 and state(r.json()) != before
+
+
+def get_propagation_latencies() -> List[Dict[str, Any]]:
+    """Obtener las latencias de propagación registradas en este proceso."""
+    return list(_propagation_log)
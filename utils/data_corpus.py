@@ -0,0 +1,242 @@
+"""
+Corpus de datos de prueba pre-generado.
+
+Genera por adelantado millones de valores de Faker en un archivo columnar que se
+abre con mmap, de modo que los generadores de utils.helpers obtienen cada valor
+con acceso O(1) por índice en lugar de llamar a Faker en el camino caliente
+(tareas de Locust, cuerpos de tests). Cuando el corpus se agota o no existe,
+los generadores vuelven a usar Faker.
+
+Formato del archivo:
+    MAGIC (4 bytes) | longitud de la cabecera (uint32) | cabecera JSON | columnas
+    - Columnas "str": offsets uint64 (rows + 1) seguidos de los bytes UTF-8
+    - Columnas "f64"/"i64": rows valores de 8 bytes
+
+Construir un corpus:
+    python -m utils.data_corpus --rows 1000000 --output data/test_data_corpus.bin
+"""
+import argparse
+import itertools
+import json
+import mmap
+import os
+import random
+import struct
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from faker import Faker
+
+
+MAGIC = b"TDC1"
+DATA_CORPUS_PATH = os.getenv("DATA_CORPUS_PATH", "data/test_data_corpus.bin")
+
+# Columna -> (tipo, generador a partir de una instancia de Faker)
+CORPUS_COLUMNS: Dict[str, Any] = {
+    "first_name": ("str", lambda f: f.first_name()),
+    "last_name": ("str", lambda f: f.last_name()),
+    "image_url": ("str", lambda f: f.image_url()),
+    "domain_name": ("str", lambda f: f.domain_name()),
+    "address": ("str", lambda f: f.address()),
+    "postcode": ("str", lambda f: f.postcode()),
+    "city": ("str", lambda f: f.city()),
+    "password": ("str", lambda f: f.password(length=12)),
+    "word": ("str", lambda f: f.word()),
+    "catch_phrase": ("str", lambda f: f.catch_phrase()),
+    "sentence": ("str", lambda f: f.sentence()),
+    "sku_number": ("i64", lambda f: f.random_int(min=1000, max=9999)),
+    "quantity": ("i64", lambda f: f.random_int(min=1, max=100)),
+    "price": ("f64", lambda f: round(f.pyfloat(left_digits=3, right_digits=2, positive=True), 2)),
+    "order_fee": ("f64", lambda f: round(f.pyfloat(left_digits=2, right_digits=2, positive=True), 2)),
+}
+
+_NUMERIC_FORMATS = {"i64": "<q", "f64": "<d"}
+
+
+class DataCorpus:
+    """Lectura O(1) de un corpus columnar mapeado en memoria."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mm[:4] != MAGIC:
+            raise ValueError(f"Not a test data corpus: {path}")
+        header_len = struct.unpack_from("<I", self._mm, 4)[0]
+        header = json.loads(self._mm[8:8 + header_len])
+        self.rows: int = header["rows"]
+        self.columns: Dict[str, Dict[str, Any]] = header["columns"]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def get(self, column: str, index: int) -> Any:
+        """Obtener el valor de `column` en la fila `index`."""
+        spec = self.columns[column]
+        if spec["type"] == "str":
+            start, end = struct.unpack_from("<QQ", self._mm, spec["offsets"] + 8 * index)
+            return self._mm[spec["data"] + start:spec["data"] + end].decode("utf-8")
+        return struct.unpack_from(_NUMERIC_FORMATS[spec["type"]], self._mm, spec["data"] + 8 * index)[0]
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+
+class CorpusRow:
+    """Vista perezosa de una fila: solo decodifica las columnas que se leen."""
+
+    __slots__ = ("_corpus", "_index")
+
+    def __init__(self, corpus: DataCorpus, index: int):
+        self._corpus = corpus
+        self._index = index
+
+    def __getitem__(self, column: str) -> Any:
+        return self._corpus.get(column, self._index)
+
+
+_corpus: Optional[DataCorpus] = None
+_counter = None
+_start = 0
+_loaded = False
+_load_lock = threading.Lock()
+
+
+def _load() -> Optional[DataCorpus]:
+    """Abrir el corpus una sola vez por proceso (None si no existe)."""
+    global _corpus, _counter, _start, _loaded
+    if _loaded:
+        return _corpus
+    with _load_lock:
+        if not _loaded:
+            if os.path.exists(DATA_CORPUS_PATH):
+                try:
+                    _corpus = DataCorpus(DATA_CORPUS_PATH)
+                    # Cada proceso empieza en un punto distinto del corpus
+                    _start = random.randrange(len(_corpus)) if len(_corpus) else 0
+                    _counter = itertools.count()
+                except (OSError, ValueError) as e:
+                    print(f"Advertencia: no se pudo abrir el corpus de datos: {e}")
+                    _corpus = None
+            _loaded = True
+    return _corpus
+
+
+def next_row() -> Optional[CorpusRow]:
+    """
+    Obtener la siguiente fila del corpus.
+
+    Returns:
+        Fila del corpus, o None si no hay corpus o ya se consumió entero
+        (en ese caso el llamador debe usar Faker)
+    """
+    corpus = _load()
+    if corpus is None:
+        return None
+    consumed = next(_counter)
+    if consumed >= len(corpus):
+        return None
+    return CorpusRow(corpus, (_start + consumed) % len(corpus))
+
+
+def value(row: Optional[CorpusRow], column: str, fallback: Callable[[], Any]) -> Any:
+    """Valor de la columna en la fila, o el de `fallback` (Faker) si no hay fila."""
+    return row[column] if row is not None else fallback()
+
+
+def build_corpus(output: str, rows: int, seed: Optional[int] = None) -> None:
+    """
+    Generar un corpus de `rows` filas en `output`.
+
+    Cada columna se escribe en streaming a un archivo temporal para no mantener
+    el corpus completo en memoria.
+    """
+    fake = Faker()
+    if seed is not None:
+        Faker.seed(seed)
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=directory or None) as tmp:
+        data_files = {name: open(os.path.join(tmp, f"{name}.data"), "wb") for name in CORPUS_COLUMNS}
+        offset_files = {
+            name: open(os.path.join(tmp, f"{name}.offsets"), "wb")
+            for name, (kind, _) in CORPUS_COLUMNS.items() if kind == "str"
+        }
+        positions = {name: 0 for name in offset_files}
+        for f in offset_files.values():
+            f.write(struct.pack("<Q", 0))
+
+        for _ in range(rows):
+            for name, (kind, generate) in CORPUS_COLUMNS.items():
+                generated = generate(fake)
+                if kind == "str":
+                    encoded = generated.encode("utf-8")
+                    data_files[name].write(encoded)
+                    positions[name] += len(encoded)
+                    offset_files[name].write(struct.pack("<Q", positions[name]))
+                else:
+                    data_files[name].write(struct.pack(_NUMERIC_FORMATS[kind], generated))
+
+        for f in list(data_files.values()) + list(offset_files.values()):
+            f.close()
+
+        # Calcular la posición de cada sección tras la cabecera
+        columns: Dict[str, Dict[str, Any]] = {}
+        sections = []
+        position = 0
+        for name, (kind, _) in CORPUS_COLUMNS.items():
+            spec: Dict[str, Any] = {"type": kind}
+            if kind == "str":
+                spec["offsets"] = position
+                sections.append(os.path.join(tmp, f"{name}.offsets"))
+                position += 8 * (rows + 1)
+            spec["data"] = position
+            sections.append(os.path.join(tmp, f"{name}.data"))
+            position += os.path.getsize(sections[-1])
+            columns[name] = spec
+
+        # Las posiciones son relativas: se desplazan por el tamaño de la cabecera.
+        # La cabecera se recalcula hasta que su longitud es estable.
+        base = 0
+        while True:
+            shifted = {
+                name: {k: (v + base if k in ("offsets", "data") else v) for k, v in spec.items()}
+                for name, spec in columns.items()
+            }
+            header = json.dumps({"rows": rows, "columns": shifted}).encode("utf-8")
+            if 8 + len(header) == base:
+                break
+            base = 8 + len(header)
+
+        with open(output, "wb") as out:
+            out.write(MAGIC)
+            out.write(struct.pack("<I", len(header)))
+            out.write(header)
+            for section in sections:
+                with open(section, "rb") as f:
+                    while True:
+                        chunk = f.read(1 << 20)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generar el corpus de datos de prueba")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Número de filas (default: 1000000)")
+    parser.add_argument("--output", default=DATA_CORPUS_PATH, help=f"Archivo de salida (default: {DATA_CORPUS_PATH})")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla de Faker (opcional)")
+    args = parser.parse_args()
+
+    build_corpus(args.output, args.rows, args.seed)
+    print(f"Corpus generado: {args.output} ({args.rows} filas, {os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Creación concurrente de las cadenas de entidades de los tests E2E.
+
+Las cadenas usuario -> carrito -> orden y categoría -> producto no dependen entre
+sí: se crean a la vez a través del API Gateway con AsyncAPIClient y
+asyncio.gather, en lugar de encadenar todos los viajes de ida y vuelta. Las
+entidades dependientes (carrito, orden, producto) reintentan los 404 por
+consistencia eventual con DEFAULT_RETRY_POLICY. Si alguna creación falla, se
+borra lo ya creado antes de propagar el error.
+
+Uso:
+    chain = create_e2e_chains(jwt_token, product=True, order=True)
+    user_id, product_id, order_id = chain["user_id"], chain["product_id"], chain["order_id"]
+"""
+import asyncio
+import time
+from typing import Any, Dict
+
+from utils.api_utils import get_gateway_url, make_e2e_request
+from utils.helpers import (
+    generate_user_data, generate_category_data, generate_product_data,
+    generate_cart_data, generate_order_data
+)
+from utils.http_client import AsyncAPIClient
+from utils.retry_policy import DEFAULT_RETRY_POLICY
+
+
+# Orden de borrado (dependientes primero): clave, servicio, endpoint
+CLEANUP_ORDER = [
+    ("order_id", "order", "/api/orders"),
+    ("cart_id", "order", "/api/carts"),
+    ("product_id", "product", "/api/products"),
+    ("category_id", "product", "/api/categories"),
+    ("user_id", "user", "/api/users"),
+]
+
+
+class _Chains:
+    """Creaciones de una llamada a create_e2e_chains."""
+
+    def __init__(self, client: AsyncAPIClient, jwt_token: str, created: Dict[str, Any]):
+        self.client = client
+        self.headers = {"Content-Type": "application/json", "Authorization": f"Bearer {jwt_token}"}
+        self.created = created
+
+    async def create(
+        self, key: str, service: str, endpoint: str, payload: Dict[str, Any], id_field: str,
+        dependent: bool = False
+    ) -> Any:
+        """Crear la entidad; si depende de otra recién creada, reintentar los 404 como make_e2e_request."""
+        policy = DEFAULT_RETRY_POLICY
+        started_at = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            # El API Gateway enruta /service-name/** a los servicios
+            response = await self.client.post(f"/{service}-service{endpoint}", headers=self.headers, json=payload)
+            # Retry on 404 for dependency creation (eventual consistency)
+            if response.status_code == 404 and dependent and policy.retry_on_404:
+                delay = policy.delay(attempt)
+                if policy.can_retry(attempt, started_at, delay):
+                    await response.aclose()
+                    await asyncio.sleep(delay)
+                    continue
+            break
+        assert response.status_code in [200, 201], f"Error al crear {key[:-3]}: {response.text}"
+        self.created[key] = response.json()[id_field]
+        return self.created[key]
+
+    async def user_chain(self, order: bool) -> None:
+        user_id = await self.create("user_id", "user", "/api/users", generate_user_data(), "userId")
+        if order:
+            cart_id = await self.create("cart_id", "order", "/api/carts", generate_cart_data(user_id), "cartId", dependent=True)
+            await self.create("order_id", "order", "/api/orders", generate_order_data(cart_id), "orderId", dependent=True)
+
+    async def category_chain(self, product: bool) -> None:
+        category_id = await self.create("category_id", "product", "/api/categories", generate_category_data(), "categoryId")
+        if product:
+            await self.create("product_id", "product", "/api/products", generate_product_data(category_id), "productId", dependent=True)
+
+
+async def _create_chains(jwt_token: str, created: Dict[str, Any], product: bool, order: bool) -> None:
+    async with AsyncAPIClient(get_gateway_url(), timeout=60) as client:
+        chains = _Chains(client, jwt_token, created)
+        # Se espera a las dos cadenas aunque una falle, para saber todo lo creado
+        results = await asyncio.gather(
+            chains.user_chain(order),
+            chains.category_chain(product),
+            return_exceptions=True
+        )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+def create_e2e_chains(jwt_token: str, product: bool = True, order: bool = False) -> Dict[str, Any]:
+    """
+    Crear usuario y categoría (y opcionalmente producto, carrito y orden) a la vez.
+
+    Args:
+        jwt_token: Token JWT para el API Gateway
+        product: Crear un producto en la categoría
+        order: Crear un carrito del usuario y una orden de ese carrito
+
+    Returns:
+        IDs creados: user_id, category_id y, según los argumentos, product_id,
+        cart_id y order_id. El borrado queda a cargo del test.
+    """
+    created: Dict[str, Any] = {}
+    try:
+        asyncio.run(_create_chains(jwt_token, created, product, order))
+    except BaseException:
+        for key, service, endpoint in CLEANUP_ORDER:
+            if key in created:
+                # Un borrado fallido no debe ocultar el error original ni saltarse el resto
+                try:
+                    make_e2e_request("DELETE", f"{endpoint}/{created[key]}", service_name=service, jwt_token=jwt_token)
+                except Exception as e:
+                    print(f"Advertencia: no se pudo borrar {key[:-3]} {created[key]}: {e}")
+        raise
+    return created
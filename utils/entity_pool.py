@@ -0,0 +1,135 @@
+"""
+Pool de entidades compartidas para fixtures de solo lectura.
+
+Los tests que solo necesitan un usuario, categoría, producto, carrito u orden
+como dependencia (sin modificarlo) toman uno del pool en lugar de crear y borrar
+su propia cadena. El pool se llena bajo demanda hasta `size` entidades por tipo,
+las reparte en round-robin y las borra todas al final de la sesión.
+Los tests que modifican la entidad deben seguir creando una instancia propia.
+"""
+import copy
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.helpers import (
+    generate_user_data, generate_category_data, generate_product_data,
+    generate_cart_data, generate_order_data
+)
+
+
+# Tipo de entidad -> servicio, endpoint, campo ID, dependencia y generador de datos
+ENTITY_SPECS: Dict[str, Dict[str, Any]] = {
+    "user": {
+        "service": "user",
+        "endpoint": "/api/users",
+        "id_field": "userId",
+        "depends_on": None,
+        "generate": lambda dep: generate_user_data(),
+    },
+    "category": {
+        "service": "product",
+        "endpoint": "/api/categories",
+        "id_field": "categoryId",
+        "depends_on": None,
+        "generate": lambda dep: generate_category_data(),
+    },
+    "product": {
+        "service": "product",
+        "endpoint": "/api/products",
+        "id_field": "productId",
+        "depends_on": "category",
+        "generate": lambda dep: generate_product_data(dep["id"]),
+    },
+    "cart": {
+        "service": "order",
+        "endpoint": "/api/carts",
+        "id_field": "cartId",
+        "depends_on": "user",
+        "generate": lambda dep: generate_cart_data(dep["id"]),
+    },
+    "order": {
+        "service": "order",
+        "endpoint": "/api/orders",
+        "id_field": "orderId",
+        "depends_on": "cart",
+        "generate": lambda dep: generate_order_data(dep["id"]),
+    },
+}
+
+# Orden de borrado (dependientes primero)
+CLEANUP_ORDER = ["order", "cart", "product", "category", "user"]
+
+DEFAULT_POOL_SIZE = int(os.getenv("ENTITY_POOL_SIZE", "3"))
+
+# send(method, service, endpoint, data) -> Response
+SendFn = Callable[[str, str, str, Optional[Dict[str, Any]]], Any]
+# wait(service, endpoint) -> None
+WaitFn = Callable[[str, str], Any]
+
+
+class EntityPool:
+    """Pool de entidades de solo lectura, poblado de forma perezosa."""
+
+    def __init__(self, send: SendFn, size: int = DEFAULT_POOL_SIZE, wait: Optional[WaitFn] = None):
+        self.send = send
+        self.size = max(size, 1)
+        self.wait = wait
+        self._entities: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in ENTITY_SPECS}
+        self._next: Dict[str, int] = {kind: 0 for kind in ENTITY_SPECS}
+        self._lock = threading.RLock()
+
+    def _create(self, kind: str) -> Dict[str, Any]:
+        """Crear una entidad nueva (y su dependencia, tomada del pool)."""
+        spec = ENTITY_SPECS[kind]
+        dependency = self.get(spec["depends_on"]) if spec["depends_on"] else None
+
+        payload = spec["generate"](dependency)
+        response = self.send("POST", spec["service"], spec["endpoint"], payload)
+        assert response.status_code in [200, 201], \
+            f"Error al crear {kind} para el pool: {response.text}"
+
+        created = response.json()
+        entity_id = created.get(spec["id_field"])
+        if self.wait:
+            self.wait(spec["service"], f"{spec['endpoint']}/{entity_id}")
+
+        entity = {"id": entity_id, "data": created}
+        if dependency is not None:
+            entity[spec["depends_on"]] = dependency
+        return entity
+
+    def get(self, kind: str) -> Dict[str, Any]:
+        """
+        Obtener una entidad del tipo indicado.
+
+        Args:
+            kind: Tipo de entidad ("user", "category", "product", "cart", "order")
+
+        Returns:
+            Copia de la entidad: {"id": ..., "data": {...}, <dependencia>: {...}}
+        """
+        if kind not in ENTITY_SPECS:
+            raise ValueError(f"Unknown entity type: {kind}. Available: {list(ENTITY_SPECS.keys())}")
+
+        with self._lock:
+            entities = self._entities[kind]
+            if len(entities) < self.size:
+                entities.append(self._create(kind))
+                entity = entities[-1]
+            else:
+                entity = entities[self._next[kind] % len(entities)]
+                self._next[kind] += 1
+            return copy.deepcopy(entity)
+
+    def cleanup(self) -> None:
+        """Borrar todas las entidades del pool (dependientes primero)."""
+        with self._lock:
+            for kind in CLEANUP_ORDER:
+                spec = ENTITY_SPECS[kind]
+                for entity in self._entities[kind]:
+                    try:
+                        self.send("DELETE", spec["service"], f"{spec['endpoint']}/{entity['id']}", None)
+                    except Exception:
+                        pass
+                self._entities[kind] = []
@@ -4,38 +4,40 @@ Helper functions for tests
 import pytest
 from faker import Faker
 from typing import Dict, Any, Optional
-import random
 from datetime import datetime
+from utils.data_corpus import next_row, value
+from utils.unique_ids import next_id
 
 fake = Faker()
 
 
 def generate_user_data(user_id: Optional[int] = None) -> Dict[str, Any]:
     """Generate fake user data with unique IDs and username"""
-    import time
-
-    # Username único usando timestamp
-    unique_suffix = int(time.time() * 1000) % 1000000000 + random.randint(100, 999)
+    # Username único (prefijo del worker + contador, sin colisiones entre procesos)
+    unique_suffix = next_id()
     username = f"user_{unique_suffix}"
 
+    # Valores pre-generados del corpus (Faker solo si no hay corpus)
+    row = next_row()
+
     # Email único
-    email = f"user_{unique_suffix}@{fake.domain_name()}"
+    email = f"user_{unique_suffix}@{value(row, 'domain_name', fake.domain_name)}"
 
     user_data = {
-        "firstName": fake.first_name(),
-        "lastName": fake.last_name(),
-        "imageUrl": fake.image_url(),
+        "firstName": value(row, "first_name", fake.first_name),
+        "lastName": value(row, "last_name", fake.last_name),
+        "imageUrl": value(row, "image_url", fake.image_url),
         "email": email,
         "addressDtos": [
             {
-                "fullAddress": fake.address(),
-                "postalCode": fake.postcode(),
-                "city": fake.city()
+                "fullAddress": value(row, "address", fake.address),
+                "postalCode": value(row, "postcode", fake.postcode),
+                "city": value(row, "city", fake.city)
             }
         ],
         "credential": {
             "username": username,
-            "password": fake.password(length=12),
+            "password": value(row, "password", lambda: fake.password(length=12)),
             "roleBasedAuthority": "ROLE_USER",
             "isEnabled": True,
             "isAccountNonExpired": True,
@@ -53,23 +55,24 @@ def generate_user_data(user_id: Optional[int] = None) -> Dict[str, Any]:
 
 def generate_category_data() -> Dict[str, Any]:
     """Generate fake category data with unique name"""
-    import time
-    # Usar timestamp y random para garantizar unicidad
-    unique_id = int(time.time() * 1000000) + random.randint(1000, 9999)
+    # ID único por worker para que el título no colisione entre procesos
+    unique_id = next_id()
+    row = next_row()
     return {
-        "categoryTitle": f"{fake.word().capitalize()} Category {unique_id}",
-        "imageUrl": fake.image_url()
+        "categoryTitle": f"{value(row, 'word', fake.word).capitalize()} Category {unique_id}",
+        "imageUrl": value(row, "image_url", fake.image_url)
     }
 
 
 def generate_product_data(category_id: int) -> Dict[str, Any]:
     """Generate fake product data"""
+    row = next_row()
     return {
-        "productTitle": fake.catch_phrase(),
-        "imageUrl": fake.image_url(),
-        "sku": f"SKU-{fake.random_int(min=1000, max=9999)}",
-        "priceUnit": round(fake.pyfloat(left_digits=3, right_digits=2, positive=True), 2),
-        "quantity": fake.random_int(min=1, max=100),
+        "productTitle": value(row, "catch_phrase", fake.catch_phrase),
+        "imageUrl": value(row, "image_url", fake.image_url),
+        "sku": f"SKU-{value(row, 'sku_number', lambda: fake.random_int(min=1000, max=9999))}",
+        "priceUnit": value(row, "price", lambda: round(fake.pyfloat(left_digits=3, right_digits=2, positive=True), 2)),
+        "quantity": value(row, "quantity", lambda: fake.random_int(min=1, max=100)),
         "category": {
             "categoryId": category_id
         }
@@ -85,9 +88,10 @@ def generate_cart_data(user_id: int) -> Dict[str, Any]:
 
 def generate_order_data(cart_id: int) -> Dict[str, Any]:
     """Generate fake order data"""
+    row = next_row()
     return {
-        "orderDesc": fake.sentence(),
-        "orderFee": round(fake.pyfloat(left_digits=2, right_digits=2, positive=True), 2),
+        "orderDesc": value(row, "sentence", fake.sentence),
+        "orderFee": value(row, "order_fee", lambda: round(fake.pyfloat(left_digits=2, right_digits=2, positive=True), 2)),
         "cart": {
             "cartId": cart_id
         }
@@ -127,10 +131,11 @@ def generate_favourite_data(user_id: int, product_id: int) -> Dict[str, Any]:
 
 def generate_address_data(user_id: int) -> Dict[str, Any]:
     """Generate fake address data"""
+    row = next_row()
     return {
-        "fullAddress": fake.address(),
-        "postalCode": fake.postcode(),
-        "city": fake.city(),
+        "fullAddress": value(row, "address", fake.address),
+        "postalCode": value(row, "postcode", fake.postcode),
+        "city": value(row, "city", fake.city),
         "user": {
             "userId": user_id
         }
@@ -1,10 +1,12 @@
 """
 HTTP Client utility for making API requests
 """
+import asyncio
+import httpx
 import requests
 from typing import Dict, Optional, Any
-from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from utils import request_timing
 
 
 class APIClient:
@@ -23,7 +25,7 @@ class APIClient:
             allowed_methods=["HEAD", "GET", "OPTIONS", "POST", "PUT", "DELETE", "PATCH"]
         )
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = request_timing.adapter_class()(max_retries=retry_strategy)
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
     
@@ -43,6 +45,17 @@ class APIClient:
     ) -> requests.Response:
         """Make HTTP request"""
         url = self._build_url(endpoint)
+        if request_timing.REQUEST_TIMING:
+            return request_timing.timed_request(
+                self.session,
+                method,
+                url,
+                headers=headers,
+                json=json,
+                params=params,
+                timeout=self.timeout,
+                **kwargs
+            )
         response = self.session.request(
             method=method,
             url=url,
@@ -82,3 +95,136 @@ class APIClient:
         except Exception:
             return False
 
+
+
+class AsyncAPIClient:
+    """Async HTTP client with the same surface and retry policy as APIClient"""
+    
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = 30,
+        max_retries: int = 3,
+        max_concurrency: int = 10,
+        backoff_factor: float = 1
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        
+        # HTTP/1.1 connection pool sized to the concurrency limit
+        limits = httpx.Limits(
+            max_connections=max_concurrency,
+            max_keepalive_connections=max_concurrency
+        )
+        self.client = httpx.AsyncClient(timeout=timeout, limits=limits, http2=False)
+    
+    async def __aenter__(self) -> "AsyncAPIClient":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Close the underlying connection pool"""
+        await self.client.aclose()
+    
+    def _build_url(self, endpoint: str) -> str:
+        """Build full URL from endpoint"""
+        endpoint = endpoint.lstrip('/')
+        return f"{self.base_url}/{endpoint}"
+    
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Backoff before retry number `attempt` (mirrors urllib3's Retry)"""
+        if response is not None and response.status_code in (429, 503):
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        if attempt <= 1:
+            return 0
+        return min(self.backoff_factor * (2 ** (attempt - 1)), 120)
+    
+    async def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """Make HTTP request"""
+        url = self._build_url(endpoint)
+        attempt = 0
+        
+        trace_id = request_timing.new_trace_id() if request_timing.REQUEST_TIMING else None
+        
+        # The semaphore only covers each attempt, so a request waiting out its backoff doesn't hold a slot
+        while True:
+            timing = None
+            if trace_id is not None:
+                timing = request_timing.RequestTiming(method, url, trace_id, attempt)
+                kwargs["extensions"] = {**kwargs.get("extensions", {}), "trace": timing.httpx_trace}
+            try:
+                async with self._semaphore:
+                    response = await self.client.request(
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        json=json,
+                        params=params,
+                        **kwargs
+                    )
+            except httpx.TransportError as e:
+                if timing is not None:
+                    timing.finish_error(e)
+                    request_timing.export(timing)
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            
+            if timing is not None:
+                timing.finish_httpx(response)
+                request_timing.export(timing)
+            
+            if response.status_code in self.RETRY_STATUS_CODES and attempt < self.max_retries:
+                attempt += 1
+                await response.aclose()
+                await asyncio.sleep(self._backoff(attempt, response))
+                continue
+            
+            return response
+    
+    async def get(self, endpoint: str, headers: Optional[Dict] = None, params: Optional[Dict] = None, **kwargs) -> httpx.Response:
+        """GET request"""
+        return await self._make_request("GET", endpoint, headers=headers, params=params, **kwargs)
+    
+    async def post(self, endpoint: str, headers: Optional[Dict] = None, json: Optional[Dict] = None, **kwargs) -> httpx.Response:
+        """POST request"""
+        return await self._make_request("POST", endpoint, headers=headers, json=json, **kwargs)
+    
+    async def put(self, endpoint: str, headers: Optional[Dict] = None, json: Optional[Dict] = None, **kwargs) -> httpx.Response:
+        """PUT request"""
+        return await self._make_request("PUT", endpoint, headers=headers, json=json, **kwargs)
+    
+    async def patch(self, endpoint: str, headers: Optional[Dict] = None, json: Optional[Dict] = None, **kwargs) -> httpx.Response:
+        """PATCH request"""
+        return await self._make_request("PATCH", endpoint, headers=headers, json=json, **kwargs)
+    
+    async def delete(self, endpoint: str, headers: Optional[Dict] = None, **kwargs) -> httpx.Response:
+        """DELETE request"""
+        return await self._make_request("DELETE", endpoint, headers=headers, **kwargs)
+    
+    async def health_check(self, endpoint: str = "/actuator/health") -> bool:
+        """Check if service is healthy"""
+        try:
+            response = await self.get(endpoint)
+            return response.status_code == 200
+        except Exception:
+            return False
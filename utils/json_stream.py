@@ -0,0 +1,214 @@
+"""
+Lectura en streaming de respuestas de colección.
+
+Los endpoints de colección (/api/users, /api/products, /api/orders, /api/carts...)
+retornan `{"collection": [...]}` o directamente una lista. En lugar de cargar el
+cuerpo entero con response.json(), CollectionStream lee la respuesta por trozos
+y decodifica los elementos de la colección de uno en uno: en memoria solo queda
+el elemento actual, y la lectura se corta en cuanto se encuentra lo buscado.
+
+Uso:
+    response = make_e2e_request("GET", "/api/carts", service_name="order",
+                                jwt_token=jwt_token, stream=True)
+    cart = CollectionStream(response).find(lambda c: c.get("cartId") == cart_id)
+"""
+import codecs
+import json
+import os
+from typing import Any, Callable, Iterable, Iterator, Optional, Set
+
+
+JSON_STREAM_CHUNK_SIZE = int(os.getenv("JSON_STREAM_CHUNK_SIZE", "65536"))
+
+_WHITESPACE = " \t\r\n"
+# Strings, objetos y arrays marcan su propio final; números y literales no
+_SELF_DELIMITED = '"[{'
+_DELIMITERS = ",]}" + _WHITESPACE
+_decoder = json.JSONDecoder()
+
+
+class CollectionStream:
+    """
+    Iterador incremental sobre los elementos de una respuesta de colección.
+
+    Acepta una respuesta de requests (idealmente pedida con stream=True), una de
+    httpx o cualquier iterable de trozos de bytes.
+    """
+
+    def __init__(self, response: Any, key: str = "collection", chunk_size: int = JSON_STREAM_CHUNK_SIZE):
+        self.response = response
+        self.key = key
+        self.bytes_read = 0
+        self.items_read = 0
+        if hasattr(response, "iter_content"):
+            chunks = response.iter_content(chunk_size)
+        elif hasattr(response, "iter_bytes"):
+            chunks = response.iter_bytes(chunk_size)
+        else:
+            chunks = response
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._items: Optional[Iterator[Any]] = None
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._items is None:
+            self._items = self._iterate()
+        return self._items
+
+    def __enter__(self) -> "CollectionStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Liberar la conexión sin leer el resto del cuerpo."""
+        close = getattr(self.response, "close", None)
+        if callable(close):
+            close()
+
+    def find(self, predicate: Callable[[Any], bool]) -> Optional[Any]:
+        """Primer elemento que cumple el predicado (None si no hay); deja de leer al encontrarlo."""
+        try:
+            for item in self:
+                if predicate(item):
+                    return item
+            return None
+        finally:
+            self.close()
+
+    def missing(self, field: str, values: Iterable[Any]) -> Set[Any]:
+        """Valores de `field` que no aparecen en la colección; deja de leer cuando aparecen todos."""
+        pending = set(values)
+        try:
+            if pending:
+                for item in self:
+                    if isinstance(item, dict):
+                        pending.discard(item.get(field))
+                        if not pending:
+                            break
+            return pending
+        finally:
+            self.close()
+
+    def first(self) -> Optional[Any]:
+        """Primer elemento de la colección (None si está vacía)."""
+        return self.find(lambda item: True)
+
+    def count(self) -> int:
+        """Número de elementos de la colección (lee la respuesta entera)."""
+        try:
+            for _ in self:
+                pass
+            return self.items_read
+        finally:
+            self.close()
+
+    # --- Lectura del buffer -------------------------------------------------
+
+    def _fill(self) -> bool:
+        """Añadir el siguiente trozo al buffer (False al final del cuerpo)."""
+        if self._eof:
+            return False
+        for chunk in self._chunks:
+            if chunk:
+                self.bytes_read += len(chunk)
+                self._buffer += self._text.decode(chunk)
+                return True
+        self._buffer += self._text.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def _compact(self) -> None:
+        """Descartar el texto ya consumido para mantener la memoria acotada."""
+        # Solo cuando lo consumido domina el buffer: la copia queda amortizada
+        if self._pos and self._pos * 2 >= len(self._buffer):
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+
+    def _peek(self) -> Optional[str]:
+        """Siguiente carácter distinto de espacio (None al final del cuerpo)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            self._compact()
+            if not self._fill():
+                return None
+
+    def _expect(self, allowed: str) -> str:
+        token = self._peek()
+        if token is None or token not in allowed:
+            raise ValueError(f"Invalid JSON collection: expected one of {allowed!r}, got {token!r}")
+        self._pos += 1
+        return token
+
+    def _read_value(self) -> Any:
+        """
+        Decodificar el valor JSON que empieza en self._pos.
+
+        raw_decode (en C) hace el trabajo; si el valor está cortado por el final
+        del buffer se lee otro trozo y se reintenta. Un número o literal solo se
+        acepta si le sigue un delimitador (o es el final del cuerpo), para no
+        truncar números partidos entre dos trozos.
+        """
+        while True:
+            try:
+                item, end = _decoder.raw_decode(self._buffer, self._pos)
+                if self._eof or (end < len(self._buffer) and (
+                        self._buffer[self._pos] in _SELF_DELIMITED or self._buffer[end] in _DELIMITERS)):
+                    self._pos = end
+                    return item
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise ValueError("Invalid JSON collection: truncated or malformed value")
+            self._fill()
+
+    # --- Recorrido de la colección ------------------------------------------
+
+    def _iterate(self) -> Iterator[Any]:
+        start = self._peek()
+        if start is None:
+            return
+        if start == "{":
+            self._pos += 1
+            if not self._seek_key():
+                return
+        elif start != "[":
+            raise ValueError(f"Invalid JSON collection: unexpected {start!r}")
+
+        self._pos += 1
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            self._compact()
+            if self._peek() is None:
+                raise ValueError("Invalid JSON collection: truncated array")
+            item = self._read_value()
+            self.items_read += 1
+            yield item
+            if self._expect(",]") == "]":
+                return
+
+    def _seek_key(self) -> bool:
+        """Avanzar dentro del objeto raíz hasta el array de `key` (False si no está)."""
+        if self._peek() == "}":
+            return False
+        while True:
+            if self._peek() != '"':
+                raise ValueError("Invalid JSON collection: expected object key")
+            name = self._read_value()
+            self._expect(":")
+            if name == self.key:
+                return self._peek() == "["
+            if self._peek() is None:
+                raise ValueError("Invalid JSON collection: truncated object")
+            self._read_value()
+            if self._expect(",}") == "}":
+                return False
+
@@ -0,0 +1,121 @@
+"""
+Presupuestos de latencia para los tests de integración y E2E.
+
+make_request y make_e2e_request notifican cada llamada a los observadores
+registrados con add_request_observer (utils.api_utils). Durante cada test el
+fixture perf_budget (conftest.py) registra las llamadas en un PerfRecorder; los
+tests marcados con @pytest.mark.perf_budget fallan (o avisan) si una llamada o
+el tiempo HTTP total del test superan su presupuesto. Las latencias de todos los
+tests se guardan en perf_budget.json junto al reporte HTML.
+
+Uso:
+    @pytest.mark.perf_budget
+    @pytest.mark.perf_budget(call_ms=300, total_ms=2000)
+    @pytest.mark.perf_budget(endpoints={"GET /user-service/api/users/{id}": 150}, mode="warn")
+
+Configuración por entorno:
+- PERF_BUDGET_CALL_MS: presupuesto por llamada por defecto (default: 2000)
+- PERF_BUDGET_TOTAL_MS: presupuesto de tiempo HTTP total por test (default: 10000)
+- PERF_BUDGET_MODE: fail o warn; si se define, se impone al del marcador
+"""
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+
+PERF_BUDGET_CALL_MS = float(os.getenv("PERF_BUDGET_CALL_MS", "2000"))
+PERF_BUDGET_TOTAL_MS = float(os.getenv("PERF_BUDGET_TOTAL_MS", "10000"))
+PERF_BUDGET_MODE = os.getenv("PERF_BUDGET_MODE")
+
+_MODES = ("fail", "warn")
+# Segmentos numéricos de la ruta (IDs) -> {id}, para agrupar por endpoint
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """Clave de endpoint: método y ruta con los IDs normalizados."""
+    return f"{method} {_ID_SEGMENT.sub('/{id}', urlsplit(url).path)}"
+
+
+@dataclass(frozen=True)
+class PerfBudget:
+    """
+    Presupuesto de un test.
+
+    Attributes:
+        call_ms: Latencia máxima de cada llamada (último intento, sin reintentos)
+        total_ms: Tiempo HTTP total del test (incluye reintentos y sus esperas)
+        endpoints: Presupuestos por endpoint que sustituyen a call_ms
+        mode: "fail" marca el test como fallido, "warn" solo lo reporta
+    """
+    call_ms: float = PERF_BUDGET_CALL_MS
+    total_ms: float = PERF_BUDGET_TOTAL_MS
+    endpoints: Dict[str, float] = field(default_factory=dict)
+    mode: str = "fail"
+
+    @classmethod
+    def from_marker(cls, marker) -> "PerfBudget":
+        """Construir el presupuesto a partir de los argumentos del marcador."""
+        kwargs = dict(marker.kwargs)
+        if PERF_BUDGET_MODE:
+            kwargs["mode"] = PERF_BUDGET_MODE
+        budget = cls(**kwargs)
+        if budget.mode not in _MODES:
+            raise ValueError(f"Unknown perf_budget mode: {budget.mode} (expected fail or warn)")
+        return budget
+
+    def call_limit(self, endpoint: str) -> float:
+        return self.endpoints.get(endpoint, self.call_ms)
+
+
+class PerfRecorder:
+    """Llamadas HTTP de un test."""
+
+    def __init__(self):
+        self.calls: List[Dict[str, Any]] = []
+
+    def record(self, method: str, url: str, latency_ms: float, total_ms: float, attempts: int, status: Optional[int]) -> None:
+        self.calls.append({
+            "endpoint": endpoint_key(method, url),
+            "latency_ms": round(latency_ms, 3),
+            "total_ms": round(total_ms, 3),
+            "attempts": attempts,
+            "status": status,
+        })
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(call["total_ms"] for call in self.calls), 3)
+
+    def violations(self, budget: PerfBudget) -> List[str]:
+        """Mensajes de las llamadas y del total que superan el presupuesto."""
+        messages = []
+        for call in self.calls:
+            limit = budget.call_limit(call["endpoint"])
+            if call["latency_ms"] > limit:
+                messages.append(f"{call['endpoint']}: {call['latency_ms']:.0f} ms > {limit:.0f} ms")
+        if self.total_ms > budget.total_ms:
+            messages.append(f"tiempo HTTP total: {self.total_ms:.0f} ms > {budget.total_ms:.0f} ms")
+        return messages
+
+
+def summarize_endpoints(calls: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Latencias por endpoint de todas las llamadas de la sesión."""
+    grouped: Dict[str, List[float]] = {}
+    for call in calls:
+        grouped.setdefault(call["endpoint"], []).append(call["latency_ms"])
+
+    summary = {}
+    for endpoint, latencies in sorted(grouped.items()):
+        latencies.sort()
+        count = len(latencies)
+        summary[endpoint] = {
+            "count": count,
+            "mean_ms": round(sum(latencies) / count, 3),
+            "p50_ms": latencies[min(int(count * 0.5), count - 1)],
+            "p95_ms": latencies[min(int(count * 0.95), count - 1)],
+            "max_ms": latencies[-1],
+        }
+    return summary
@@ -0,0 +1,338 @@
+"""
+Desglose de tiempos por petición HTTP (DNS, conexión, TLS, TTFB y descarga).
+
+Con REQUEST_TIMING=1, APIClient, AsyncAPIClient, make_request y
+make_e2e_request registran para cada intento:
+- dns, connect y tls: solo si el intento abre una conexión nueva
+- ttfb: desde que hay conexión hasta recibir las cabeceras (incluye el salto
+  del API Gateway y el tiempo del backend)
+- download: lectura del cuerpo (no se mide con stream=True)
+además del número de reintento y los bytes enviados y recibidos.
+
+Con requests, las fases de conexión se miden con conexiones de urllib3 propias
+montadas por TimingHTTPAdapter; con httpx, con la extensión `trace` de httpcore
+(que no separa la resolución DNS de la conexión TCP). Desactivado (por defecto),
+el coste es comprobar REQUEST_TIMING en cada petición: los adaptadores y
+conexiones son los de siempre.
+
+Cada intento se exporta como un span de cliente de OpenTelemetry en OTLP/JSON
+(una línea por intento, con un span hijo por fase) en
+REQUEST_TIMING_DIR/spans_<pid>.jsonl, legible por el receptor otlpjsonfile del
+OpenTelemetry Collector. Los intentos de una misma llamada comparten trace id.
+
+Configuración por entorno:
+- REQUEST_TIMING: 1 para activar (default: desactivado)
+- REQUEST_TIMING_DIR: directorio de los spans (default: reports/request_timing)
+- OTEL_SERVICE_NAME: service.name de los spans (default: ecommerce-tests)
+"""
+import json
+import os
+import secrets
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.connection import allowed_gai_family
+
+
+REQUEST_TIMING = os.getenv("REQUEST_TIMING", "").lower() in ("1", "true", "yes")
+REQUEST_TIMING_DIR = os.getenv("REQUEST_TIMING_DIR", "reports/request_timing")
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "ecommerce-tests")
+
+# perf_counter_ns -> tiempo Unix en ns (los spans llevan tiempos absolutos)
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+# Intento en curso en cada hilo (lo leen las conexiones de urllib3)
+_local = threading.local()
+
+_SPAN_KIND_INTERNAL = 1
+_SPAN_KIND_CLIENT = 3
+_STATUS_ERROR = 2
+
+# Eventos de httpcore -> fase
+_HTTPX_PHASES = {
+    "connection.connect_tcp": "connect",
+    "connection.start_tls": "tls",
+}
+
+
+def new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+class RequestTiming:
+    """Fases de un intento, en ns de perf_counter."""
+
+    def __init__(self, method: str, url: str, trace_id: Optional[str] = None, resend_count: int = 0):
+        self.method = method
+        self.url = url
+        self.trace_id = trace_id or new_trace_id()
+        self.resend_count = resend_count
+        self.start = time.perf_counter_ns()
+        self.end: Optional[int] = None
+        self.headers: Optional[int] = None
+        self.body_end: Optional[int] = None
+        # Fases de preparación de la conexión: (nombre, inicio, fin)
+        self.phases: List[Tuple[str, int, int]] = []
+        self.status: Optional[int] = None
+        self.error: Optional[BaseException] = None
+        self.bytes_sent = 0
+        self.bytes_received: Optional[int] = None
+        self._started: Dict[str, int] = {}
+
+    def phase(self, name: str, start: int, end: Optional[int] = None) -> None:
+        self.phases.append((name, start, end if end is not None else time.perf_counter_ns()))
+
+    def breakdown(self) -> List[Tuple[str, int, int]]:
+        """Fases en orden: conexión (si la hubo), ttfb y download."""
+        phases = list(self.phases)
+        ready = phases[-1][2] if phases else self.start
+        if self.headers is not None:
+            phases.append(("ttfb", ready, self.headers))
+            if self.body_end is not None:
+                phases.append(("download", self.headers, self.body_end))
+        return phases
+
+    def durations_ms(self) -> Dict[str, float]:
+        """Milisegundos por fase (sumados si una fase se repite)."""
+        durations: Dict[str, float] = {}
+        for name, start, end in self.breakdown():
+            durations[name] = round(durations.get(name, 0) + (end - start) / 1e6, 3)
+        if self.end is not None:
+            durations["total"] = round((self.end - self.start) / 1e6, 3)
+        return durations
+
+    def finish_response(self, response: requests.Response, stream: bool) -> None:
+        """Cerrar el intento con una respuesta de requests."""
+        self.end = time.perf_counter_ns()
+        if self.headers is None:
+            # Sesión sin TimingHTTPAdapter: solo se conoce el tiempo hasta las cabeceras
+            self.headers = self.start + int(response.elapsed.total_seconds() * 1e9)
+        self.status = response.status_code
+        body = response.request.body
+        self.bytes_sent = len(body) if isinstance(body, (bytes, str)) else 0
+        retries = getattr(response.raw, "retries", None)
+        if retries is not None and retries.history:
+            self.resend_count += len(retries.history)
+        if not stream:
+            self.body_end = self.end
+            tell = getattr(response.raw, "tell", None)
+            self.bytes_received = tell() if tell else len(response.content)
+        elif response.headers.get("Content-Length", "").isdigit():
+            self.bytes_received = int(response.headers["Content-Length"])
+        response.timing = self
+
+    def finish_error(self, error: BaseException) -> None:
+        self.end = time.perf_counter_ns()
+        self.error = error
+
+    async def httpx_trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """Extensión `trace` de httpx: registra las fases de httpcore."""
+        now = time.perf_counter_ns()
+        event, _, stage = event_name.rpartition(".")
+        if stage == "started":
+            self._started[event] = now
+        elif stage == "complete":
+            if event in _HTTPX_PHASES:
+                self.phase(_HTTPX_PHASES[event], self._started.get(event, now), now)
+            elif event.endswith("receive_response_headers"):
+                self.headers = now
+            elif event.endswith("receive_response_body"):
+                self.body_end = now
+
+    def finish_httpx(self, response) -> None:
+        """Cerrar el intento con una respuesta de httpx."""
+        self.end = time.perf_counter_ns()
+        self.status = response.status_code
+        self.bytes_sent = len(response.request.content or b"")
+        self.bytes_received = response.num_bytes_downloaded
+
+
+# --- urllib3 ---------------------------------------------------------------
+
+class _TimedConnectionMixin:
+    """Mide la resolución DNS y la conexión TCP de las conexiones nuevas."""
+
+    def _new_conn(self):
+        timing = getattr(_local, "timing", None)
+        if timing is None:
+            return super()._new_conn()
+
+        started = time.perf_counter_ns()
+        dns_host = self._dns_host
+        try:
+            address = socket.getaddrinfo(dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)[0][4][0]
+        except OSError:
+            # urllib3 vuelve a resolver y reporta el error como siempre
+            address = None
+        resolved = time.perf_counter_ns()
+        timing.phase("dns", started, resolved)
+
+        if address:
+            self._dns_host = address
+        try:
+            conn = super()._new_conn()
+        finally:
+            self._dns_host = dns_host
+        timing.phase("connect", resolved)
+        return conn
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        timing = getattr(_local, "timing", None)
+        super().connect()
+        if timing is not None:
+            # Lo que sigue a la conexión TCP es el handshake TLS
+            tcp_done = timing.phases[-1][2] if timing.phases else timing.start
+            timing.phase("tls", tcp_done)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter con conexiones instrumentadas y marca de recepción de cabeceras."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        timing = getattr(_local, "timing", None)
+        if timing is not None:
+            timing.headers = time.perf_counter_ns()
+        return response
+
+
+def adapter_class() -> type:
+    """Clase de adaptador para las sesiones según REQUEST_TIMING."""
+    return TimingHTTPAdapter if REQUEST_TIMING else HTTPAdapter
+
+
+def timed_request(
+    session: requests.Session,
+    method: str,
+    url: str,
+    trace_id: Optional[str] = None,
+    resend_count: int = 0,
+    stream: bool = False,
+    **kwargs
+) -> requests.Response:
+    """session.request midiendo las fases y exportando el span del intento."""
+    timing = RequestTiming(method, url, trace_id, resend_count)
+    _local.timing = timing
+    try:
+        response = session.request(method, url, stream=stream, **kwargs)
+    except BaseException as e:
+        timing.finish_error(e)
+        raise
+    else:
+        timing.finish_response(response, stream)
+        return response
+    finally:
+        _local.timing = None
+        export(timing)
+
+
+# --- Exportación OTLP/JSON -------------------------------------------------
+
+_writer: Optional[TextIO] = None
+_writer_pid: Optional[int] = None
+_writer_lock = threading.Lock()
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        # OTLP/JSON codifica los enteros de 64 bits como string
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _span(trace_id: str, span_id: str, parent_id: str, name: str, kind: int, start: int, end: int,
+          attributes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "traceId": trace_id,
+        "spanId": span_id,
+        "parentSpanId": parent_id,
+        "name": name,
+        "kind": kind,
+        "startTimeUnixNano": str(start + _EPOCH_OFFSET_NS),
+        "endTimeUnixNano": str(end + _EPOCH_OFFSET_NS),
+        "attributes": attributes,
+    }
+
+
+def to_otlp(timing: RequestTiming) -> Dict[str, Any]:
+    """Span de cliente del intento y un span hijo por fase, en OTLP/JSON."""
+    parts = urlsplit(timing.url)
+    attributes = [
+        _attribute("http.request.method", timing.method),
+        _attribute("url.full", timing.url),
+        _attribute("server.address", parts.hostname or ""),
+        _attribute("server.port", parts.port or (443 if parts.scheme == "https" else 80)),
+        _attribute("http.request.resend_count", timing.resend_count),
+        _attribute("http.request.body.size", timing.bytes_sent),
+        _attribute("http.connection.reused", not timing.phases),
+    ]
+    if timing.status is not None:
+        attributes.append(_attribute("http.response.status_code", timing.status))
+    if timing.bytes_received is not None:
+        attributes.append(_attribute("http.response.body.size", timing.bytes_received))
+    for name, value in timing.durations_ms().items():
+        attributes.append(_attribute(f"http.timing.{name}_ms", value))
+
+    span_id = secrets.token_hex(8)
+    end = timing.end if timing.end is not None else time.perf_counter_ns()
+    root = _span(timing.trace_id, span_id, "", timing.method, _SPAN_KIND_CLIENT, timing.start, end, attributes)
+    if timing.error is not None:
+        attributes.append(_attribute("error.type", type(timing.error).__name__))
+        root["status"] = {"code": _STATUS_ERROR, "message": str(timing.error)}
+    elif timing.status is not None and timing.status >= 400:
+        root["status"] = {"code": _STATUS_ERROR}
+
+    spans = [root] + [
+        _span(timing.trace_id, secrets.token_hex(8), span_id, f"http.{name}", _SPAN_KIND_INTERNAL, start, phase_end, [])
+        for name, start, phase_end in timing.breakdown()
+    ]
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]
+    }
+
+
+def export(timing: RequestTiming) -> None:
+    """Añadir el span del intento al archivo del proceso."""
+    global _writer, _writer_pid
+    line = json.dumps(to_otlp(timing), separators=(",", ":"))
+    with _writer_lock:
+        if _writer is None or _writer_pid != os.getpid():
+            os.makedirs(REQUEST_TIMING_DIR, exist_ok=True)
+            _writer_pid = os.getpid()
+            _writer = open(os.path.join(REQUEST_TIMING_DIR, f"spans_{_writer_pid}.jsonl"), "a", encoding="utf-8")
+        _writer.write(line + "\n")
+        _writer.flush()
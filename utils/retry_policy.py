@@ -0,0 +1,69 @@
+"""
+Política de reintentos con backoff exponencial y jitter.
+
+Sustituye la espera fija entre reintentos: los primeros intentos esperan muy poco
+(un recurso que se propaga rápido se obtiene en cuanto aparece) y los siguientes
+crecen exponencialmente hasta un tope, limitados por un deadline opcional.
+"""
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Configuración de reintentos para make_request / make_e2e_request.
+
+    Attributes:
+        max_attempts: Número máximo de intentos (incluye el primero)
+        base_delay: Espera antes del primer reintento, en segundos
+        max_delay: Tope de la espera entre reintentos, en segundos
+        multiplier: Factor de crecimiento de la espera
+        jitter: Fracción aleatoria que se resta a cada espera (0 = sin jitter)
+        deadline: Tiempo total máximo de la llamada en segundos (None = sin límite)
+        retry_on_404: Reintentar los 404 (consistencia eventual entre servicios)
+    """
+    max_attempts: int = 6
+    base_delay: float = 0.1
+    max_delay: float = 1.6
+    multiplier: float = 2.0
+    jitter: float = 0.5
+    deadline: Optional[float] = None
+    retry_on_404: bool = True
+
+    def delay(self, attempt: int) -> float:
+        """Espera antes del reintento número `attempt` (empezando en 1)."""
+        delay = min(self.base_delay * (self.multiplier ** (attempt - 1)), self.max_delay)
+        if self.jitter:
+            delay *= 1 - random.uniform(0, self.jitter)
+        return delay
+
+    def remaining(self, started_at: float) -> Optional[float]:
+        """Segundos que quedan hasta el deadline (None si no hay deadline)."""
+        if self.deadline is None:
+            return None
+        return self.deadline - (time.monotonic() - started_at)
+
+    def can_retry(self, attempt: int, started_at: float, delay: float) -> bool:
+        """Indicar si queda margen para esperar `delay` y hacer el intento `attempt + 1`."""
+        if attempt >= self.max_attempts:
+            return False
+        remaining = self.remaining(started_at)
+        return remaining is None or remaining > delay
+
+
+def _env_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+# Política por defecto (configurable por entorno)
+DEFAULT_RETRY_POLICY = RetryPolicy(
+    max_attempts=int(os.getenv("RETRY_MAX_ATTEMPTS", "6")),
+    base_delay=float(os.getenv("RETRY_BASE_DELAY", "0.1")),
+    max_delay=float(os.getenv("RETRY_MAX_DELAY", "1.6")),
+    deadline=_env_float("RETRY_DEADLINE"),
+)
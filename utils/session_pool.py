@@ -0,0 +1,80 @@
+"""
+Registro de sesiones HTTP con pool de conexiones y keep-alive.
+
+Cada URL base (ej: http://localhost:8080) obtiene una única requests.Session
+con un HTTPAdapter dimensionado, de modo que las peticiones sucesivas reutilizan
+las conexiones TCP abiertas en lugar de pagar un handshake por llamada.
+"""
+import os
+import threading
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from utils.request_timing import adapter_class
+
+
+# Tamaño de los pools (configurable por entorno)
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))
+
+_sessions: Dict[Tuple[int, str], requests.Session] = {}
+_lock = threading.Lock()
+
+
+def _session_key(base_url: str) -> Tuple[int, str]:
+    """Clave del registro: PID del proceso + esquema y host de la URL base."""
+    parts = urlsplit(base_url)
+    origin = f"{parts.scheme}://{parts.netloc}" if parts.netloc else base_url.rstrip('/')
+    # El PID evita compartir sockets entre procesos tras un fork (workers de xdist)
+    return os.getpid(), origin
+
+
+def _build_session() -> requests.Session:
+    """Crear una sesión con pool de conexiones y keep-alive."""
+    session = requests.Session()
+    # Con REQUEST_TIMING, adaptador con conexiones instrumentadas
+    adapter = adapter_class()(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=False,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_session(base_url: str) -> requests.Session:
+    """
+    Obtener la sesión compartida para una URL base.
+
+    Args:
+        base_url: URL base del servicio (ej: "http://localhost:8700")
+
+    Returns:
+        requests.Session reutilizable y segura para usar desde varios hilos
+    """
+    key = _session_key(base_url)
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _build_session()
+            _sessions[key] = session
+        return session
+
+
+def close_all_sessions() -> None:
+    """Cerrar todas las sesiones del proceso actual y vaciar el registro."""
+    pid = os.getpid()
+    with _lock:
+        for key in [k for k in _sessions if k[0] == pid]:
+            try:
+                _sessions.pop(key).close()
+            except Exception:
+                pass
@@ -0,0 +1,158 @@
+"""
+Caché de tokens JWT compartida entre procesos.
+
+Evita que cada usuario virtual de Locust o cada worker de pytest-xdist haga su
+propio login: el token se guarda en un archivo protegido con un lock (fcntl),
+indexado por URL de autenticación y credenciales, y se renueva antes de que
+expire según el claim `exp` del propio token.
+"""
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock entre procesos
+    fcntl = None
+
+
+TOKEN_CACHE_PATH = os.getenv(
+    "TOKEN_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "ecommerce_tests_token_cache.json")
+)
+# Segundos antes de `exp` en los que el token se considera caducado
+TOKEN_REFRESH_MARGIN = int(os.getenv("TOKEN_REFRESH_MARGIN", "60"))
+# Vida asumida para tokens sin claim `exp`
+TOKEN_DEFAULT_TTL = int(os.getenv("TOKEN_DEFAULT_TTL", "3600"))
+
+# Caché en memoria del proceso: clave -> (token, exp)
+_memory_cache: Dict[str, Tuple[str, float]] = {}
+# Serializa los logins dentro del proceso (con gevent, lock cooperativo)
+_process_lock = threading.Lock()
+
+
+def _cache_key(auth_url: str, username: str, password: str) -> str:
+    """Clave de caché sin guardar la contraseña en claro."""
+    raw = f"{auth_url}|{username}|{password}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def token_expiry(token: str) -> float:
+    """
+    Leer el claim `exp` de un JWT (sin verificar la firma).
+
+    Returns:
+        Timestamp de expiración, o ahora + TOKEN_DEFAULT_TTL si no se puede leer
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time.time() + TOKEN_DEFAULT_TTL
+
+
+def _is_fresh(exp: float) -> bool:
+    return exp - TOKEN_REFRESH_MARGIN > time.time()
+
+
+def _read_file(f) -> Dict[str, Dict[str, float]]:
+    f.seek(0)
+    content = f.read()
+    if not content:
+        return {}
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        return {}
+
+
+def _open_cache():
+    """Abrir (o crear) el archivo de caché, legible solo por el usuario actual."""
+    fd = os.open(TOKEN_CACHE_PATH, os.O_RDWR | os.O_CREAT, 0o600)
+    return os.fdopen(fd, "r+", encoding="utf-8")
+
+
+def get_token(
+    auth_url: str,
+    username: str,
+    password: str,
+    login: Callable[[], Optional[str]]
+) -> Tuple[Optional[str], float]:
+    """
+    Obtener un token válido, haciendo login solo si no hay uno vigente.
+
+    Args:
+        auth_url: URL del endpoint de autenticación
+        username: Usuario
+        password: Contraseña
+        login: Función que hace el login y retorna el token (o None si falla)
+
+    Returns:
+        Tupla (token, exp); token es None si el login falló
+    """
+    key = _cache_key(auth_url, username, password)
+
+    cached = _memory_cache.get(key)
+    if cached and _is_fresh(cached[1]):
+        return cached
+
+    with _process_lock:
+        cached = _memory_cache.get(key)
+        if cached and _is_fresh(cached[1]):
+            return cached
+
+        with _open_cache() as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                entries = _read_file(f)
+                entry = entries.get(key)
+                if entry and _is_fresh(entry["exp"]):
+                    _memory_cache[key] = (entry["token"], entry["exp"])
+                    return _memory_cache[key]
+
+                token = login()
+                if not token:
+                    return None, 0.0
+
+                exp = token_expiry(token)
+                entries = {k: v for k, v in entries.items() if _is_fresh(v.get("exp", 0))}
+                entries[key] = {"token": token, "exp": exp}
+                f.seek(0)
+                f.truncate()
+                json.dump(entries, f)
+                f.flush()
+
+                _memory_cache[key] = (token, exp)
+                return token, exp
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def invalidate_token(auth_url: str, username: str, password: str) -> None:
+    """Descartar el token en caché (ej: tras recibir un 401)."""
+    key = _cache_key(auth_url, username, password)
+    with _process_lock:
+        _memory_cache.pop(key, None)
+        if not os.path.exists(TOKEN_CACHE_PATH):
+            return
+        with _open_cache() as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                entries = _read_file(f)
+                if entries.pop(key, None) is not None:
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(entries, f)
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
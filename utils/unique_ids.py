@@ -0,0 +1,65 @@
+"""
+Asignador de IDs únicos para usernames, emails y títulos de categoría.
+
+Cada ID es un prefijo fijo del proceso (worker) seguido de un contador monótono:
+- prefijo: instante de arranque del proceso en ms + PID + bits aleatorios
+  (o UNIQUE_ID_WORKER si se define), en base36 y de longitud fija
+- contador: itertools.count, atómico bajo el GIL
+
+Dos procesos solo podrían coincidir si arrancan en el mismo milisegundo con el
+mismo PID y los mismos bits aleatorios, así que los IDs no colisionan entre
+usuarios de Locust, workers de pytest-xdist ni máquinas distintas.
+"""
+import itertools
+import os
+import random
+import threading
+import time
+
+
+_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+_lock = threading.Lock()
+_pid = None
+_prefix = ""
+_counter = itertools.count()
+
+
+def _base36(number: int, width: int) -> str:
+    """Codificar en base36 con longitud fija (se queda con los dígitos bajos)."""
+    digits = []
+    for _ in range(width):
+        number, remainder = divmod(number, 36)
+        digits.append(_ALPHABET[remainder])
+    return "".join(reversed(digits))
+
+
+def _worker_prefix() -> str:
+    """Prefijo único del proceso actual (14 caracteres)."""
+    worker = os.getenv("UNIQUE_ID_WORKER")
+    if worker:
+        return _base36(int(time.time() * 1000), 8) + _base36(int(worker), 6)
+    return (
+        _base36(int(time.time() * 1000), 8)
+        + _base36(os.getpid(), 4)
+        + _base36(random.SystemRandom().randrange(36 ** 2), 2)
+    )
+
+
+def next_id() -> str:
+    """
+    Obtener un ID único (ej: "lq2x7k1c0a3f9z0").
+
+    Returns:
+        Cadena en minúsculas y dígitos, válida para usernames, emails y títulos
+    """
+    global _pid, _prefix, _counter
+    pid = os.getpid()
+    if pid != _pid:
+        # Primer uso, o proceso hijo tras un fork: nuevo prefijo y contador
+        with _lock:
+            if pid != _pid:
+                _prefix = _worker_prefix()
+                _counter = itertools.count()
+                _pid = pid
+    return f"{_prefix}{next(_counter):x}"